@@ -1,6 +1,20 @@
 import pandas as pd
 from datetime import datetime
 
+from id_resolver import IdResolver
+
+# Manually verified TO BE CREATED -> Arcadia matches
+MATCHES_TO_APPLY = [
+    {'unmapped_name': 'Apex Capital Partners', 'arcadia_id': 3575, 'ig_id': '2215'},
+    {'unmapped_name': 'Aleph VC', 'arcadia_id': 9956, 'ig_id': '4143'},
+    {'unmapped_name': 'Handelsbanken Fonder', 'arcadia_id': 8137, 'ig_id': '3023'},
+    {'unmapped_name': 'IDEO CoLab', 'arcadia_id': 8275, 'ig_id': '1254'},
+    {'unmapped_name': 'Lazarte Brothers', 'arcadia_id': 10755, 'ig_id': '453'},
+    {'unmapped_name': 'Meta (NASDAQ: META)', 'arcadia_id': 8531, 'ig_id': '2391'},
+    {'unmapped_name': 'NTT DOCOMO Ventures', 'arcadia_id': 3545, 'ig_id': '3230'},
+    {'unmapped_name': 'Third Wave', 'arcadia_id': 10497, 'ig_id': '3841'}
+]
+
 def apply_matches():
     print("=" * 80)
     print("APPLYING TO BE CREATED DUPLICATE MATCHES")
@@ -12,34 +26,23 @@ def apply_matches():
     unmapped_df = pd.read_csv('output/arcadia_company_unmapped.csv')
     arcadia_df = pd.read_csv('src/company-names-arcadia.csv')
     
-    # Define the matches to apply
-    matches_to_apply = [
-        {'unmapped_name': 'Apex Capital Partners', 'arcadia_id': 3575, 'ig_id': '2215'},
-        {'unmapped_name': 'Aleph VC', 'arcadia_id': 9956, 'ig_id': '4143'},
-        {'unmapped_name': 'Handelsbanken Fonder', 'arcadia_id': 8137, 'ig_id': '3023'},
-        {'unmapped_name': 'IDEO CoLab', 'arcadia_id': 8275, 'ig_id': '1254'},
-        {'unmapped_name': 'Lazarte Brothers', 'arcadia_id': 10755, 'ig_id': '453'},
-        {'unmapped_name': 'Meta (NASDAQ: META)', 'arcadia_id': 8531, 'ig_id': '2391'},
-        {'unmapped_name': 'NTT DOCOMO Ventures', 'arcadia_id': 3545, 'ig_id': '3230'},
-        {'unmapped_name': 'Third Wave', 'arcadia_id': 10497, 'ig_id': '3841'}
-    ]
-    
     updates_applied = []
     
     print("[INFO] Applying matches...")
     print()
     
-    for match in matches_to_apply:
+    # Resolve every match against both files up front
+    unmapped_rows = IdResolver(unmapped_df, 'name').take([m['unmapped_name'] for m in MATCHES_TO_APPLY])
+    unmapped_index = dict(zip(unmapped_rows['name'], unmapped_rows.index))
+    arcadia = IdResolver(arcadia_df, 'id')
+    arcadia_names = arcadia.lookup([m['arcadia_id'] for m in MATCHES_TO_APPLY], 'name', None)
+    
+    for match, arcadia_name in zip(MATCHES_TO_APPLY, arcadia_names):
         # Find the row in unmapped_df
-        mask = (unmapped_df['name'] == match['unmapped_name'])
+        idx = unmapped_index.get(match['unmapped_name'])
         
-        if mask.any():
-            idx = unmapped_df.index[mask].tolist()[0]
-            
-            # Get the Arcadia name
-            arc_row = arcadia_df[arcadia_df['id'] == match['arcadia_id']]
-            if not arc_row.empty:
-                arcadia_name = arc_row.iloc[0]['name']
+        if idx is not None:
+            if arcadia_name is not None:
                 
                 # Store original values for reporting
                 original_id = unmapped_df.loc[idx, 'id']
@@ -0,0 +1,109 @@
+"""
+Exact / normalized name index over the Arcadia company export
+Used by the import prep to emit real Arcadia IDs for investors and targets that
+already exist (BITKRAFT, a16z, ...) instead of creating TO BE CREATED cards.
+
+Keys come from name, also_known_as and aliases (whole value and each comma
+piece). A name is looked up exactly first (casefolded, whitespace collapsed),
+then by clean_key (case and punctuation dropped, whitespace collapsed - nothing else).
+Only these two tiers resolve automatically. normalize_for_matching also strips
+words like "group", "games", "studio", so 'Box Group' (a VC) would land on
+'Box game' (a CVC); its hits are only returned by candidate(), for review.
+Keys that point to more than one Arcadia company are ambiguous and never resolve.
+
+Usage:
+    index = ArcadiaNameIndex.from_csv('src/company-names-arcadia.csv')
+    match = index.resolve('a16z')   # NameMatch(id='17', name='Andreessen Horowitz', match_type='exact') or None
+    index.candidate('Box Group')    # NameMatch(..., match_type='candidate') - needs confirmation
+"""
+
+import os
+import re
+from collections import namedtuple
+
+import pandas as pd
+
+from fuzzy_match_companies import normalize_for_matching
+
+NAME_FIELDS = ('name', 'also_known_as', 'aliases')
+MIN_NORMALIZED_LENGTH = 3  # shorter normalized keys ("co", "ab") are too generic to trust
+
+NameMatch = namedtuple('NameMatch', ['id', 'name', 'match_type'])
+
+def exact_key(text):
+    return ' '.join(str(text).split()).casefold()
+
+def clean_key(text):
+    """
+    Casefolded, punctuation removed, whitespace collapsed ("That's No Moon" -> 'thats no moon')
+    Word boundaries are kept: 'Third Wave' and 'Thirdwave' are different companies in Arcadia.
+    """
+    return ' '.join(re.sub(r'[^\w\s]|_', '', str(text).casefold()).split())
+
+class ArcadiaNameIndex:
+    def __init__(self, arcadia_df):
+        entries = []
+        for field in NAME_FIELDS:
+            if field not in arcadia_df.columns:
+                continue
+            values = pd.DataFrame({'id': arcadia_df['id'], 'name': arcadia_df['name'], 'value': arcadia_df[field]})
+            values = values.dropna(subset=['value'])
+            pieces = values.assign(value=values['value'].str.split(',')).explode('value')
+            entries.extend([values, pieces])
+
+        entries = pd.concat(entries, ignore_index=True) if entries else pd.DataFrame(columns=['id', 'name', 'value'])
+        entries['value'] = entries['value'].astype(str).str.strip()
+        entries = entries[entries['value'] != '']
+        entries['id'] = entries['id'].astype('int64').astype(str)
+
+        self.exact, self.ambiguous_exact = self._build(entries, entries['value'].map(exact_key))
+        self.normalized, self.ambiguous_normalized = self._build(entries, self._min_length(entries['value'].map(clean_key)))
+        self.candidates, self.ambiguous_candidates = self._build(entries, self._min_length(entries['value'].map(normalize_for_matching)))
+        self._cache = {}
+
+    @staticmethod
+    def _min_length(keys):
+        return keys.where(keys.str.len() >= MIN_NORMALIZED_LENGTH, '')
+
+    @staticmethod
+    def _build(entries, keys):
+        """key -> (id, canonical name) for keys with a single Arcadia id; number of ambiguous keys"""
+        keyed = entries.assign(key=keys)
+        keyed = keyed[keyed['key'] != ''].drop_duplicates(['key', 'id'])
+        ids_per_key = keyed.groupby('key')['id'].transform('size')
+        unique = keyed[ids_per_key == 1]
+        index = dict(zip(unique['key'], zip(unique['id'], unique['name'])))
+        return index, keyed.loc[ids_per_key > 1, 'key'].nunique()
+
+    @classmethod
+    def from_csv(cls, path='src/company-names-arcadia.csv'):
+        """Empty index when the export is missing (everything falls back to TBC cards)"""
+        if not os.path.exists(path):
+            return cls(pd.DataFrame(columns=['id', 'name']))
+        return cls(pd.read_csv(path, usecols=lambda col: col in ('id',) + NAME_FIELDS))
+
+    def __len__(self):
+        return len(self.exact)
+
+    def resolve(self, name):
+        """NameMatch for a company name (exact or clean_key hit), or None when it is unknown or ambiguous"""
+        if name not in self._cache:
+            match = None
+            hit = self.exact.get(exact_key(name))
+            if hit is not None:
+                match = NameMatch(hit[0], hit[1], 'exact')
+            else:
+                key = clean_key(name)
+                hit = self.normalized.get(key) if len(key) >= MIN_NORMALIZED_LENGTH else None
+                if hit is not None:
+                    match = NameMatch(hit[0], hit[1], 'normalized')
+            self._cache[name] = match
+        return self._cache[name]
+
+    def candidate(self, name):
+        """Suffix-stripped (normalize_for_matching) hit for a name resolve() does not know - never auto-applied"""
+        if self.resolve(name) is not None:
+            return None
+        key = normalize_for_matching(name)
+        hit = self.candidates.get(key) if len(key) >= MIN_NORMALIZED_LENGTH else None
+        return NameMatch(hit[0], hit[1], 'candidate') if hit is not None else None
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the pipeline hot functions
+Created: 2025-09-08
+Purpose: Catch performance regressions in the functions called once per row or per pair
+(name normalization, fuzzy scoring, country/ticker mapping, TBC card registry, Arcadia row
+update) before they reach a full data run.
+
+Every function runs on fixed in-memory fixtures, so no data files or network are needed.
+A timed pass loops over its fixture PASS_LOOPS times so it takes at least ~50 ms - shorter
+passes are dominated by scheduler noise. Each pass is divided by a fixed pure-Python calibration
+loop timed right before it, and the median ratio over the repeats is compared with the baseline,
+which makes the stored baseline comparable between laptops and CI boxes.
+
+Baselines live in scripts/benchmark_baselines.json (committed with the repo).
+
+Usage:
+    py scripts/benchmark_hot_functions.py                     # print timings vs baseline
+    py scripts/benchmark_hot_functions.py --check             # exit 1 on regression
+    py scripts/benchmark_hot_functions.py --check --tolerance 40
+    py scripts/benchmark_hot_functions.py --update-baseline   # after an intended change
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fuzzy_match_companies import calculate_fuzzy_score, normalize_for_matching
+from map_unmapped_to_arcadia import detect_ticker, map_country
+from prepare_all_transactions_import import CompanyCardRegistry
+from sync_arcadia_updates import ArcadiaSync
+
+BASELINE_FILE = Path(__file__).resolve().parent / 'benchmark_baselines.json'
+DEFAULT_TOLERANCE = 25.0
+DEFAULT_REPEAT = 9
+MIN_PASS_SECONDS = 0.05
+
+# ----------------------------------------------------------------------
+# Fixtures - fixed seed, never read from disk
+# ----------------------------------------------------------------------
+STEMS = ['Nexaro', 'Korvim', 'Pixelforge', 'Zenquest', 'Runeworks', 'Skytor', 'Belcor', 'Hexfen',
+         'Mirnor', 'Playgo', 'Drakel', 'Solar', 'Quiet', 'Vortex', 'Ludo', 'Arcane']
+WORDS = ['Games', 'Studios', 'Interactive', 'Entertainment', 'Labs', 'Ventures', 'Capital',
+         'Partners', 'Media', 'Digital', 'Holdings']
+SUFFIXES = ['', '', ' Inc.', ' LLC', ' Ltd', ' Limited', ' GmbH', ' Corp.', ' Co.']
+COUNTRIES = ['United States', 'USA', 'UK', 'Germany', 'France', 'South Korea', 'Brasil', 'KR',
+             'GB', '', 'Narnia', 'Japan', 'Sweden', 'Finland', 'Turkey', 'Singapore']
+
+def build_fixtures():
+    rng = random.Random(20250908)
+    names = []
+    for _ in range(300):
+        name = f"{rng.choice(STEMS)} {rng.choice(WORDS)}{rng.choice(SUFFIXES)}"
+        roll = rng.random()
+        if roll < 0.1:
+            name = f"{name} (NASDAQ: {name[:4].upper()})"
+        elif roll < 0.2:
+            name = name.replace(' ', ' & ', 1)
+        elif roll < 0.3:
+            name = name.upper()
+        names.append(name)
+
+    pairs = [(rng.choice(names), rng.choice(names)) for _ in range(1500)]
+    countries = [rng.choice(COUNTRIES) for _ in range(3000)]
+    registry_calls = [(rng.choice(names[:120]), rng.choice(['target', 'lead', 'participant']))
+                      for _ in range(3000)]
+
+    arcadia_records = []
+    rows = []
+    for i, name in enumerate(names[:200]):
+        arcadia_records.append({
+            'id': 1000 + i, 'status': 'IMPORTED', 'name': name, 'also_known_as': '', 'aliases': '',
+            'type': 'Strategic / CVC', 'founded': 2015, 'hq_country': 'USA', 'hq_region': 'North America',
+            'ownership': 'Private', 'sector': 'Gaming', 'segment': 'Mobile', 'features': '',
+            'specialization': 'Generalist', 'aum': '', 'parent_company': '', 'transactions_count': 1,
+            'was_added': '2025-06-21 20:12:00', 'created_by': '', 'was_changed': '2025-06-21 20:12:00',
+            'modified_by': '', 'search_index': name
+        })
+        row = dict(arcadia_records[-1], status='TO BE CREATED', arc_website='https://example.com',
+                   IG_ID=str(i), ig_role='target')
+        rows.append(pd.Series(row))
+
+    return {
+        'names': names,
+        'pairs': pairs,
+        'countries': countries,
+        'registry_calls': registry_calls,
+        'arcadia_records': arcadia_records,
+        'rows': rows,
+    }
+
+# ----------------------------------------------------------------------
+# Benchmarks - each runs one pass over its fixture
+# ----------------------------------------------------------------------
+def bench_normalize_for_matching(fx):
+    for name in fx['names']:
+        normalize_for_matching(name)
+
+def bench_calculate_fuzzy_score(fx):
+    for a, b in fx['pairs']:
+        calculate_fuzzy_score(a, b)
+
+def bench_map_country(fx):
+    for country in fx['countries']:
+        map_country(country)
+
+def bench_detect_ticker(fx):
+    for name in fx['names']:
+        detect_ticker(name)
+
+def bench_get_or_create_company_id(fx):
+    registry = CompanyCardRegistry()
+    for name, role in fx['registry_calls']:
+        registry.get_or_create_company_id(name, role)
+
+def bench_update_from_arcadia(fx):
+    syncer = fx['syncer']
+    for row, record in zip(fx['rows'], fx['arcadia_records']):
+        syncer.update_from_arcadia(row, record)
+
+BENCHMARKS = {
+    'normalize_for_matching': bench_normalize_for_matching,
+    'calculate_fuzzy_score': bench_calculate_fuzzy_score,
+    'map_country': bench_map_country,
+    'detect_ticker': bench_detect_ticker,
+    'get_or_create_company_id': bench_get_or_create_company_id,
+    'update_from_arcadia': bench_update_from_arcadia,
+}
+
+# Fixture passes per timed run, so every run takes >= MIN_PASS_SECONDS
+PASS_LOOPS = {
+    'normalize_for_matching': 40,
+    'calculate_fuzzy_score': 1,
+    'map_country': 60,
+    'detect_ticker': 300,
+    'get_or_create_company_id': 15,
+    'update_from_arcadia': 4,
+}
+
+# ----------------------------------------------------------------------
+# Timing
+# ----------------------------------------------------------------------
+def calibration_workload():
+    """Fixed mix of dict, string and arithmetic work representative of the scripts"""
+    table = {}
+    total = 0
+    for i in range(60000):
+        key = f"company_{i % 997}".lower().strip()
+        table[key] = table.get(key, 0) + 1
+        total += len(key.replace('_', ' ').split())
+    return total
+
+def median_times(func, repeat):
+    """
+    Median over N runs of func, of the calibration loop and of their ratio; the two are
+    interleaved so each ratio compares runs that saw the same machine load
+    """
+    func_timings, calibration_timings, ratios = [], [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        calibration_workload()
+        calibration_timings.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        func()
+        func_timings.append(time.perf_counter() - start)
+        ratios.append(func_timings[-1] / calibration_timings[-1])
+    return statistics.median(func_timings), statistics.median(calibration_timings), statistics.median(ratios)
+
+def run_benchmarks(names, repeat):
+    fixtures = build_fixtures()
+    fixtures['syncer'] = ArcadiaSync()
+
+    calibrations = []
+    results = {}
+    for name in names:
+        bench, loops = BENCHMARKS[name], PASS_LOOPS[name]
+
+        def timed_pass():
+            for _ in range(loops):
+                bench(fixtures)
+
+        bench(fixtures)  # warm-up (regex cache, imports)
+        seconds, calibration, normalized = median_times(timed_pass, repeat)
+        calibrations.append(calibration)
+        results[name] = {
+            'seconds': round(seconds, 6),
+            'normalized': round(normalized, 4)
+        }
+        if seconds < MIN_PASS_SECONDS:
+            print(f"  [WARNING] {name}: {seconds * 1000:.1f} ms per pass is too short to time reliably "
+                  f"- raise PASS_LOOPS")
+    return statistics.median(calibrations), results
+
+def load_baseline():
+    if not BASELINE_FILE.exists():
+        return None
+    with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_baseline(calibration, results):
+    baseline = {
+        'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'host': platform.node(),
+        'calibration_seconds': round(calibration, 6),
+        'functions': results
+    }
+    with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
+        f.write('\n')
+    print(f"\n[OK] Baseline saved: {BASELINE_FILE}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks for pipeline hot functions')
+    parser.add_argument('--check', action='store_true', help='Exit with code 1 if any function regressed')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'Allowed slowdown vs baseline in percent (default {DEFAULT_TOLERANCE:g})')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='Runs per function, the median is kept')
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--update-baseline', action='store_true', help='Store these results as the new baseline')
+    args = parser.parse_args()
+
+    print("[BENCHMARK] Pipeline hot functions")
+    print("=" * 78)
+    calibration, results = run_benchmarks(args.only, args.repeat)
+    print(f"Calibration loop: {calibration * 1000:.2f} ms (python {platform.python_version()})\n")
+
+    baseline = load_baseline()
+    baseline_functions = baseline['functions'] if baseline else {}
+
+    regressions = []
+    print(f"{'Function':<28} {'ms':>9} {'normalized':>11} {'baseline':>10} {'change':>9}")
+    for name, result in results.items():
+        base = baseline_functions.get(name)
+        if base:
+            change = (result['normalized'] / base['normalized'] - 1) * 100
+            status = ''
+            if change > args.tolerance:
+                status = '  [REGRESSION]'
+                regressions.append((name, change))
+            print(f"{name:<28} {result['seconds'] * 1000:>9.2f} {result['normalized']:>11.4f} "
+                  f"{base['normalized']:>10.4f} {change:>+8.1f}%{status}")
+        else:
+            print(f"{name:<28} {result['seconds'] * 1000:>9.2f} {result['normalized']:>11.4f} {'-':>10} {'-':>9}")
+
+    if args.update_baseline:
+        merged = dict(baseline_functions)
+        merged.update(results)
+        save_baseline(calibration, merged)
+        return 0
+
+    if regressions:
+        print(f"\n[WARNING] {len(regressions)} function(s) slower than baseline by more than {args.tolerance:g}%:")
+        for name, change in regressions:
+            print(f"  - {name}: {change:+.1f}%")
+    elif baseline:
+        print(f"\n[OK] No regressions beyond {args.tolerance:g}%")
+    else:
+        print(f"\n[INFO] No baseline found at {BASELINE_FILE} - run with --update-baseline")
+
+    return 1 if args.check and regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
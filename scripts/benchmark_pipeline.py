@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Benchmark runner for the matching, sync and import-prep stages
+Created: 2025-09-08
+Purpose: Time every pipeline stage on synthetic data at 1x, 10x and 100x of the current
+volumes, so we know where the pipeline breaks before Arcadia and InvestGame grow.
+
+Each scale is generated once by generate_synthetic_data.py under output/synthetic/<scale>x/
+and the stages run from that directory, so the scripts read the same relative paths they
+use on real data. Stage functions are called directly with in-memory data; nothing under
+the real output/ folder is touched. Stage output is silenced, timings come from
+phase_metrics (nested phases of the decorated functions are kept in the metrics file).
+
+Fuzzy matching compares every company without an ID against every Arcadia name, so it grows
+with the product of the two tables (about 90s at 1x). Above --sample-pairs comparisons it is
+timed twice - with none and with a fixed sample of the companies without an ID - and the
+per-company cost is extrapolated to all of them. Those rows are reported as 'estimated'.
+--max-pairs skips such stages instead (opt-in).
+
+Usage:
+    py scripts/benchmark_pipeline.py
+    py scripts/benchmark_pipeline.py --scales 1 10 --stages fuzzy_match sync
+    py scripts/benchmark_pipeline.py --scales 100 --sample-pairs 2e7 --verbose
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_synthetic_data import SyntheticDataGenerator
+from phase_metrics import completed_phases, track_phase, write_metrics
+
+import comprehensive_ig_id_verification
+import fuzzy_match_companies
+import map_corporate_unmapped
+import map_unmapped_to_arcadia
+import prepare_all_transactions_import
+import sync_arcadia_updates
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SYNTHETIC_ROOT = REPO_ROOT / 'output' / 'synthetic'
+METRICS_DIR = REPO_ROOT / 'output' / 'metrics'
+
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_SAMPLE_PAIRS = 5e6  # about the full 1x fuzzy match
+SAMPLE_SEED = 0
+
+# ----------------------------------------------------------------------
+# Stages - each runs from the scale directory and returns rows processed
+# ----------------------------------------------------------------------
+def stage_fuzzy_match(sample_rows=None):
+    unmapped_df, arcadia_df = fuzzy_match_companies.load_data()
+    if sample_rows is not None:
+        unmapped_df = sample_without_id(unmapped_df, sample_rows)
+    norm_to_ids = fuzzy_match_companies.build_normalized_indexes(arcadia_df)
+    phase1_matches, _ = fuzzy_match_companies.phase1_smart_matching(unmapped_df, norm_to_ids)
+    fuzzy_matches, _ = fuzzy_match_companies.phase2_fuzzy_matching(unmapped_df, arcadia_df, phase1_matches)
+    fuzzy_match_companies.update_matched_companies(unmapped_df, phase1_matches + fuzzy_matches)
+    return len(unmapped_df)
+
+def stage_sync():
+    syncer = sync_arcadia_updates.ArcadiaSync()
+    syncer.load_data()
+    syncer.identify_manually_mapped()
+    syncer.merge_companies_by_id()
+    syncer.update_all_with_ids()
+    syncer.final_validation()
+    return syncer.stats['total_companies']
+
+def stage_import_prep():
+    prepare_all_transactions_import.prepare_all_transactions_import()
+    return len(pd.read_csv('output/ig_arc_unmapped_vF.csv', usecols=['IG_ID']))
+
+def stage_deal_type_mapping():
+    df = pd.read_csv('output/ig_arc_unmapped_vF.csv', encoding='utf-8')
+    df = map_corporate_unmapped.apply_corporate_mapping(df)
+    df, _ = map_corporate_unmapped.map_other_types(df)
+    return len(df)
+
+def stage_target_mapping():
+    df = pd.read_csv('output/ig_arc_unmapped_vF.csv', encoding='utf-8')
+    # Blank synthetic arc_ columns load as float64, which pandas refuses to fill with text
+    arc_columns = [col for col in df.columns if col.startswith('arc_')]
+    df[arc_columns] = df[arc_columns].astype(object)
+    unmapped_mask = df['arc_id'].isna() | (df['arc_id'].astype(str).str.strip() == '')
+    unmapped_records = df[unmapped_mask].copy()
+    enriched_data, _ = map_unmapped_to_arcadia.handle_duplicate_targets(unmapped_records)
+    df, _, _ = map_unmapped_to_arcadia.map_unmapped_companies(df, unmapped_records, enriched_data)
+    map_unmapped_to_arcadia.generate_statistics(df, unmapped_mask)
+    return len(df)
+
+def stage_verification():
+    verifier = comprehensive_ig_id_verification.ComprehensiveIGIDVerification()
+    verifier.load_data()
+    verifier.check_structural_integrity()
+    verifier.validate_bidirectional_connections()
+    verifier.verify_role_consistency()
+    verifier.analyze_data_quality()
+    verifier.generate_statistical_analysis()
+    return len(verifier.companies_df) + len(verifier.transactions_df)
+
+def sample_without_id(unmapped_df, rows):
+    """All companies with an ID plus a fixed sample of `rows` companies without one (index kept)"""
+    without_id = unmapped_df['id'].isna()
+    sample = unmapped_df[without_id].sample(n=min(rows, int(without_id.sum())), random_state=SAMPLE_SEED)
+    return unmapped_df[~without_id | unmapped_df.index.isin(sample.index)]
+
+STAGES = {
+    'fuzzy_match': stage_fuzzy_match,
+    'sync': stage_sync,
+    'import_prep': stage_import_prep,
+    'deal_type_mapping': stage_deal_type_mapping,
+    'target_mapping': stage_target_mapping,
+    'verification': stage_verification,
+}
+
+# Estimated comparisons for the stages whose cost grows with the product of two tables
+def estimate_pairs(stage, sizes):
+    if stage == 'fuzzy_match':
+        return sizes['companies_without_id'] * sizes['arcadia_companies']
+    return 0
+
+# Stages that can run on a sample: stage -> size key the pair count is linear in
+SAMPLED_STAGES = {'fuzzy_match': 'companies_without_id'}
+
+def dataset_sizes(root):
+    companies = pd.read_csv(root / 'output' / 'arcadia_company_unmapped.csv', usecols=['id'])
+    arcadia = pd.read_csv(root / 'src' / 'company-names-arcadia.csv', usecols=['id'])
+    deals = pd.read_csv(root / 'output' / 'ig_arc_unmapped_vF.csv', usecols=['IG_ID'])
+    return {
+        'unmapped_companies': len(companies),
+        'companies_without_id': int(companies['id'].isna().sum()),
+        'arcadia_companies': len(arcadia),
+        'unmapped_deals': len(deals),
+    }
+
+# ----------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------
+def ensure_dataset(scale, seed, regenerate):
+    root = SYNTHETIC_ROOT / f"{scale:g}x"
+    marker = root / 'output' / 'arcadia_company_unmapped.csv'
+    if regenerate or not marker.exists():
+        SyntheticDataGenerator(scale=scale, seed=seed).generate(root)
+    return root
+
+def timed_stage(label, stage_function, verbose, **kwargs):
+    """Run one stage (output silenced unless verbose); returns its phase record"""
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with output, track_phase(label) as phase:
+        phase['rows'] = stage_function(**kwargs)
+    return completed_phases()[-1]
+
+def estimate_stage(scale, stage, sizes, pairs, sample_pairs, verbose):
+    """
+    Time the stage with 0 and with n sampled rows; the difference is the cost of n rows, the
+    0-row run the fixed cost (loading, Arcadia indexes). Extrapolated linearly to all rows.
+    """
+    total_rows = sizes[SAMPLED_STAGES[stage]]
+    sample_rows = max(1, min(total_rows, int(sample_pairs * total_rows / pairs)))
+    fixed = timed_stage(f"{stage}@{scale:g}x[0 rows]", STAGES[stage], verbose, sample_rows=0)
+    sampled = timed_stage(f"{stage}@{scale:g}x[{sample_rows} rows]", STAGES[stage], verbose, sample_rows=sample_rows)
+    per_row = max(0.0, sampled['wall_seconds'] - fixed['wall_seconds']) / sample_rows
+    estimate = fixed['wall_seconds'] + per_row * total_rows
+    print(f"  [EST] {stage}: ~{estimate:,.0f}s (estimated: {fixed['wall_seconds']:.2f}s fixed + "
+          f"{per_row:.3f}s per row x {total_rows:,} rows, sampled {sample_rows:,})")
+    return {'scale': scale, 'stage': stage, 'status': 'estimated', 'pairs': pairs, 'wall_seconds': estimate,
+            'rows_per_second': None, 'peak_memory_mb': sampled.get('peak_memory_mb'), 'sampled_rows': sample_rows}
+
+def run_scale(scale, stages, max_pairs, sample_pairs, seed, regenerate, verbose):
+    root = ensure_dataset(scale, seed, regenerate)
+    sizes = dataset_sizes(root)
+
+    print(f"\n[BENCHMARK] Scale {scale:g}x")
+    print(f"  - Arcadia companies: {sizes['arcadia_companies']:,}")
+    print(f"  - Unmapped companies: {sizes['unmapped_companies']:,} ({sizes['companies_without_id']:,} without ID)")
+    print(f"  - Unmapped deals: {sizes['unmapped_deals']:,}")
+
+    results = []
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        for stage in stages:
+            pairs = estimate_pairs(stage, sizes)
+            if max_pairs is not None and pairs > max_pairs:
+                print(f"  [SKIP] {stage}: ~{pairs:,.0f} pairs exceeds --max-pairs {max_pairs:,.0f}")
+                results.append({'scale': scale, 'stage': stage, 'status': 'skipped', 'pairs': pairs})
+                continue
+
+            try:
+                if stage in SAMPLED_STAGES and pairs > sample_pairs:
+                    results.append(estimate_stage(scale, stage, sizes, pairs, sample_pairs, verbose))
+                    continue
+                record = timed_stage(f"{stage}@{scale:g}x", STAGES[stage], verbose)
+                results.append({'scale': scale, 'stage': stage, 'status': 'ok', 'pairs': pairs,
+                                'wall_seconds': record['wall_seconds'],
+                                'rows_per_second': record['rows_per_second'],
+                                'peak_memory_mb': record.get('peak_memory_mb')})
+                print(f"  [OK] {stage}: {record['wall_seconds']:.2f}s"
+                      + (f", peak {record['peak_memory_mb']:.1f} MB" if 'peak_memory_mb' in record else ''))
+            except Exception as e:
+                print(f"  [ERROR] {stage}: {type(e).__name__}: {e}")
+                results.append({'scale': scale, 'stage': stage, 'status': 'error', 'pairs': pairs})
+    finally:
+        os.chdir(cwd)
+
+    write_metrics(f"benchmark_{scale:g}x", directory=METRICS_DIR)
+    return results
+
+def print_summary(results):
+    print("\n" + "=" * 70)
+    print("BENCHMARK SUMMARY")
+    print("=" * 70)
+    print(f"{'Stage':<20} {'Scale':>6} {'Status':>10} {'Seconds':>10} {'Peak MB':>10}")
+    for r in results:
+        seconds = f"{r['wall_seconds']:.2f}" if 'wall_seconds' in r else '-'
+        if r['status'] == 'estimated':
+            seconds = '~' + seconds
+        peak = f"{r['peak_memory_mb']:.1f}" if r.get('peak_memory_mb') is not None else '-'
+        print(f"{r['stage']:<20} {r['scale']:>5g}x {r['status']:>10} {seconds:>10} {peak:>10}")
+
+    # Growth factor between consecutive scales shows which stages are super-linear
+    by_stage = {}
+    for r in results:
+        if r['status'] in ('ok', 'estimated'):
+            by_stage.setdefault(r['stage'], []).append((r['scale'], r['wall_seconds']))
+    growth = []
+    for stage, runs in by_stage.items():
+        for (s1, t1), (s2, t2) in zip(runs, runs[1:]):
+            if t1 > 0:
+                growth.append(f"  - {stage}: {s1:g}x -> {s2:g}x data, {t2 / t1:.1f}x time")
+    if growth:
+        print("\nScaling:")
+        print("\n".join(growth))
+    if any(r['status'] == 'estimated' for r in results):
+        print("\n~ estimated: timed on a sample of rows and extrapolated (see [EST] lines)")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark pipeline stages on synthetic data')
+    parser.add_argument('--scales', type=float, nargs='+', default=DEFAULT_SCALES)
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--sample-pairs', type=float, default=DEFAULT_SAMPLE_PAIRS,
+                        help='Time quadratic stages above this many comparisons on a sample and extrapolate')
+    parser.add_argument('--max-pairs', type=float, default=None,
+                        help='Skip quadratic stages above this many estimated comparisons (default: never)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--regenerate', action='store_true', help='Regenerate synthetic data even if present')
+    parser.add_argument('--verbose', action='store_true', help='Show the output of each stage')
+    args = parser.parse_args()
+
+    results = []
+    for scale in sorted(args.scales):
+        results.extend(run_scale(scale, args.stages, args.max_pairs, args.sample_pairs, args.seed, args.regenerate, args.verbose))
+    print_summary(results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Batch pre-import check of company card names against Arcadia's validate_company_name
+Created: 2025-09-10
+Purpose: Arcadia rejects a new company whose name matches an existing name exactly
+(case-insensitive) and asks for override_similar when an existing name is >= 89%
+Jaro-Winkler similar (docs/01_arcadia_system.md, section 2.2). This checks every pending
+card in one run - against the Arcadia company table and against the other cards in the
+batch - and gives each card Arcadia's verdict:
+    BLOCK            exact duplicate (or name length outside 2-100)
+    OVERRIDE NEEDED  similar name >= 89%, needs override_similar
+    CLEAN            would be created as is
+
+Exact hits come from a casefolded hash set. Near hits use SimilarNameIndex: candidates are
+pruned with numpy (length, per-character counts and the shared prefix give an upper bound
+on Jaro-Winkler) and only the survivors are scored, so the result equals a full scan.
+
+Within the batch, cards are taken in file order: a card collides with the cards before it.
+Cards with the same name in one file (one card per name and role) are one company.
+
+Usage:
+    py scripts/check_name_collisions.py
+    py scripts/check_name_collisions.py --cards output/companies_import_FINAL_ALL.csv
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from phase_metrics import timed_phase, write_metrics
+from string_similarity import ARCADIA_SIMILARITY_THRESHOLD, jaro_winkler
+
+# Characters counted separately for the match bound; everything else shares one bucket
+CHAR_BUCKETS = 'abcdefghijklmnopqrstuvwxyz0123456789 '
+_BUCKET_OF = {char: i for i, char in enumerate(CHAR_BUCKETS)}
+OTHER_BUCKET = len(CHAR_BUCKETS)
+PREFIX_CHARS = 4
+MIN_NAME_LENGTH = 2
+MAX_NAME_LENGTH = 100
+
+DEFAULT_CARD_FILES = ['output/arcadia_company_unmapped.csv', 'output/companies_import_FINAL_ALL.csv']
+REPORT_COLUMNS = ['source', 'card_id', 'name', 'verdict', 'reason', 'exact_match', 'similar_names', 'batch_collisions']
+
+VERDICT_BLOCK = 'BLOCK'
+VERDICT_OVERRIDE = 'OVERRIDE NEEDED'
+VERDICT_CLEAN = 'CLEAN'
+
+def name_key(name):
+    return str(name).strip().casefold()
+
+def char_counts(text):
+    counts = np.zeros(OTHER_BUCKET + 1, dtype=np.int16)
+    for char in text:
+        counts[_BUCKET_OF.get(char, OTHER_BUCKET)] += 1
+    return counts
+
+def prefix_codes(text):
+    codes = np.zeros(PREFIX_CHARS, dtype=np.int32)
+    for i, char in enumerate(text[:PREFIX_CHARS]):
+        codes[i] = ord(char)
+    return codes
+
+class SimilarNameIndex:
+    """
+    Jaro-Winkler >= threshold search over a growing set of (lowercased) names
+    Upper bound per candidate, computed for all names at once:
+      matches m <= sum over characters of min(count in query, count in name)
+      jaro <= (m/len1 + m/len2 + 1) / 3, then the Winkler boost for the actual shared prefix
+    """
+
+    def __init__(self, names=(), labels=None, threshold=ARCADIA_SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self.names = []
+        self.labels = []
+        self._pending = []
+        self._lengths = np.zeros(0, dtype=np.int32)
+        self._counts = np.zeros((0, OTHER_BUCKET + 1), dtype=np.int16)
+        self._prefixes = np.zeros((0, PREFIX_CHARS), dtype=np.int32)
+        self.add(names, labels)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, names, labels=None):
+        names = [str(name).lower() for name in names]
+        labels = list(labels) if labels is not None else names
+        self.names.extend(names)
+        self.labels.extend(labels)
+        self._pending.extend(names)
+
+    def _arrays(self):
+        if self._pending:
+            self._lengths = np.concatenate([self._lengths, np.array([len(n) for n in self._pending], dtype=np.int32)])
+            self._counts = np.vstack([self._counts] + [char_counts(n)[None, :] for n in self._pending])
+            self._prefixes = np.vstack([self._prefixes] + [prefix_codes(n)[None, :] for n in self._pending])
+            self._pending = []
+        return self._lengths, self._counts, self._prefixes
+
+    def candidates(self, name):
+        """Positions whose upper bound reaches the threshold"""
+        lowered = str(name).lower()
+        lengths, counts, prefixes = self._arrays()
+        if not len(lengths) or not lowered:
+            return np.zeros(0, dtype=np.int64)
+
+        matches = np.minimum(counts, char_counts(lowered)).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            jaro_bound = np.where(matches > 0, (matches / len(lowered) + matches / np.maximum(lengths, 1) + 1) / 3, 0.0)
+        shared = np.cumprod(prefixes == prefix_codes(lowered), axis=1).sum(axis=1)
+        shared = np.minimum(shared, np.minimum(lengths, len(lowered)))
+        bound = jaro_bound + shared * 0.1 * (1 - jaro_bound)
+        return np.flatnonzero(bound >= self.threshold - 1e-12)
+
+    def similar(self, name, limit=None):
+        """[(label, score)] at or above the threshold, best first"""
+        lowered = str(name).lower()
+        hits = []
+        for position in self.candidates(lowered):
+            score = jaro_winkler(lowered, self.names[position])
+            if score >= self.threshold:
+                hits.append((self.labels[position], score, position))
+        hits.sort(key=lambda hit: -hit[1])
+        return hits[:limit] if limit else hits
+
+def load_cards(paths):
+    """Pending cards from each file: TO BE CREATED rows of the unmapped table, every row of the TBC card file"""
+    frames = []
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"[WARNING] {path} not found - skipped")
+            continue
+        df = pd.read_csv(path)
+        if 'status' in df.columns and 'arcadia_company_unmapped' in os.path.basename(path):
+            df = df[df['status'] == 'TO BE CREATED']
+        frames.append(pd.DataFrame({'source': os.path.basename(path), 'card_id': df['id'], 'name': df['name']}))
+    cards = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['source', 'card_id', 'name'])
+    return cards[cards['name'].notna()].reset_index(drop=True)
+
+@timed_phase('check_name_collisions', rows=lambda cards, *_: len(cards))
+def check_cards(cards, arcadia_df, threshold=ARCADIA_SIMILARITY_THRESHOLD):
+    """Verdict per card against Arcadia names / also_known_as and the earlier cards of the batch"""
+    arcadia_names = arcadia_df['name'].dropna().astype(str)
+    exact_names = dict(zip(arcadia_names.map(name_key), arcadia_df.loc[arcadia_names.index, 'id']))
+
+    # Similarity pool: names and comma-separated also_known_as entries
+    pool_names = list(arcadia_names)
+    if 'also_known_as' in arcadia_df.columns:
+        akas = arcadia_df['also_known_as'].dropna().astype(str).str.split(',').explode().str.strip()
+        pool_names.extend(akas[akas != ''])
+    arcadia_index = SimilarNameIndex(pool_names, threshold=threshold)
+    batch_index = SimilarNameIndex(threshold=threshold)
+
+    keys = cards['name'].map(name_key)
+    first_card = {}  # name key -> position of the first card with that name
+    rows = []
+    for position, (source, card_id, name, key) in enumerate(zip(cards['source'], cards['card_id'], cards['name'], keys)):
+        row = {'source': source, 'card_id': card_id, 'name': name, 'verdict': VERDICT_CLEAN, 'reason': '',
+               'exact_match': '', 'similar_names': '', 'batch_collisions': ''}
+
+        if key in first_card:
+            earlier = rows[first_card[key]]
+            if earlier['source'] == source:
+                # Same company, another role: same outcome as the first card
+                rows.append(dict(earlier, card_id=card_id, name=name))
+                continue
+            row['batch_collisions'] = f"{earlier['card_id']} {earlier['name']} (100%)"
+
+        name_length = len(str(name).strip())
+        similar = arcadia_index.similar(name)
+        batch_similar = [(label, score) for label, score, _ in batch_index.similar(name)]
+        if similar:
+            row['similar_names'] = ', '.join(f"{label} ({round(score * 100)}%)" for label, score, _ in similar[:5])
+        if batch_similar and not row['batch_collisions']:
+            row['batch_collisions'] = ', '.join(f"{label} ({round(score * 100)}%)" for label, score in batch_similar[:5])
+
+        if name_length < MIN_NAME_LENGTH or name_length > MAX_NAME_LENGTH:
+            row['verdict'], row['reason'] = VERDICT_BLOCK, f"name length {name_length} outside {MIN_NAME_LENGTH}-{MAX_NAME_LENGTH}"
+        elif key in exact_names:
+            row['verdict'], row['reason'] = VERDICT_BLOCK, 'exact name exists in Arcadia'
+            row['exact_match'] = exact_names[key]
+        elif key in first_card:
+            row['verdict'], row['reason'] = VERDICT_BLOCK, 'exact name earlier in batch'
+        elif similar:
+            row['verdict'], row['reason'] = VERDICT_OVERRIDE, 'similar name in Arcadia'
+        elif batch_similar:
+            row['verdict'], row['reason'] = VERDICT_OVERRIDE, 'similar name earlier in batch'
+
+        if key not in first_card:
+            first_card[key] = len(rows)
+            batch_index.add([name], [f"{card_id} {name}"])
+        rows.append(row)
+
+    return pd.DataFrame(rows, columns=REPORT_COLUMNS)
+
+def main():
+    parser = argparse.ArgumentParser(description='Check pending company card names against Arcadia name validation')
+    parser.add_argument('--cards', nargs='+', default=DEFAULT_CARD_FILES, help='Card files (id, name[, status])')
+    parser.add_argument('--arcadia', default='src/company-names-arcadia.csv')
+    parser.add_argument('--threshold', type=float, default=ARCADIA_SIMILARITY_THRESHOLD)
+    parser.add_argument('--output', default='output/name_collision_report.csv')
+    args = parser.parse_args()
+
+    print("=== Company Name Collision Check ===")
+    cards = load_cards(args.cards)
+    arcadia_df = pd.read_csv(args.arcadia, usecols=['id', 'name', 'also_known_as'])
+    print(f"Loaded {len(cards)} pending cards, {len(arcadia_df)} Arcadia companies")
+
+    report = check_cards(cards, arcadia_df, args.threshold)
+    report.to_csv(args.output, index=False)
+
+    print(f"\n=== VERDICTS ===")
+    for source, group in report.groupby('source', sort=False):
+        counts = group['verdict'].value_counts()
+        print(f"  {source}: " + ', '.join(f"{verdict} {counts.get(verdict, 0)}"
+                                          for verdict in (VERDICT_BLOCK, VERDICT_OVERRIDE, VERDICT_CLEAN)))
+    print(f"\nReasons:")
+    for reason, count in report.loc[report['reason'] != '', 'reason'].value_counts().items():
+        print(f"  {reason}: {count}")
+    print(f"\nSaved report to: {args.output}")
+
+    write_metrics('check_name_collisions')
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
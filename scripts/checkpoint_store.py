@@ -0,0 +1,96 @@
+"""
+Phase checkpoints for long matching and sync runs
+Each completed phase is pickled to output/checkpoints/<stage>/ together with a
+manifest, so a run that dies partway (e.g. PermissionError on save while the CSV
+is open in Excel) can pick up from the last completed phase with --resume.
+"""
+
+import json
+import os
+import pickle
+from datetime import datetime
+from pathlib import Path
+
+CHECKPOINT_ROOT = Path('output/checkpoints')
+
+class CheckpointStore:
+    def __init__(self, stage, input_files=(), root=CHECKPOINT_ROOT):
+        self.stage = stage
+        self.directory = Path(root) / stage
+        self.manifest_file = self.directory / 'manifest.json'
+        self.fingerprint = self._fingerprint(input_files)
+        self.manifest = {'stage': stage, 'fingerprint': self.fingerprint, 'phases': []}
+
+    @staticmethod
+    def _fingerprint(input_files):
+        """Size and mtime of every input, so stale checkpoints are never resumed"""
+        fingerprint = {}
+        for path in input_files:
+            if os.path.exists(path):
+                stat = os.stat(path)
+                fingerprint[str(path)] = [stat.st_size, int(stat.st_mtime)]
+            else:
+                fingerprint[str(path)] = None
+        return fingerprint
+
+    def resume(self):
+        """Load the manifest of a previous run; returns the completed phases"""
+        if not self.manifest_file.exists():
+            print(f"[RESUME] No checkpoints found for '{self.stage}', starting fresh")
+            return []
+
+        with open(self.manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        if manifest.get('fingerprint') != self.fingerprint:
+            print(f"[RESUME] Input files changed since the last '{self.stage}' run, discarding checkpoints")
+            self.clear()
+            return []
+
+        self.manifest = manifest
+        phases = [p['name'] for p in manifest['phases']]
+        print(f"[RESUME] Completed phases for '{self.stage}': {', '.join(phases) if phases else 'none'}")
+        return phases
+
+    def has(self, phase):
+        return any(p['name'] == phase for p in self.manifest['phases'])
+
+    def last_completed(self):
+        return self.manifest['phases'][-1]['name'] if self.manifest['phases'] else None
+
+    def save(self, phase, data):
+        """Persist the output of a completed phase"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        phase_file = self.directory / f'{phase}.pkl'
+        tmp_file = phase_file.with_suffix('.pkl.tmp')
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, phase_file)
+
+        self.manifest['phases'] = [p for p in self.manifest['phases'] if p['name'] != phase]
+        self.manifest['phases'].append({
+            'name': phase,
+            'file': phase_file.name,
+            'saved_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+        with open(self.manifest_file, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+
+        print(f"  [CHECKPOINT] Saved phase '{phase}' -> {phase_file}")
+
+    def load(self, phase):
+        """Load the output of a completed phase"""
+        phase_file = self.directory / f'{phase}.pkl'
+        with open(phase_file, 'rb') as f:
+            data = pickle.load(f)
+        print(f"  [CHECKPOINT] Loaded phase '{phase}' from {phase_file}")
+        return data
+
+    def clear(self):
+        """Remove all checkpoints once the run has been written out"""
+        if self.directory.exists():
+            for path in self.directory.iterdir():
+                path.unlink()
+            self.directory.rmdir()
+        self.manifest = {'stage': self.stage, 'fingerprint': self.fingerprint, 'phases': []}
@@ -0,0 +1,48 @@
+"""
+Chunked CSV output for row-by-row generators
+Rows are buffered as dicts and appended to the file every chunk_size rows, so
+a generator never holds its whole output in memory and the columns are fixed
+up front (no union of sparse dict keys).
+
+Usage:
+    with ChunkedCsvWriter('output/x.csv', ['a', 'b']) as writer:
+        writer.write({'a': 1, 'b': 2})
+"""
+
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 5000
+
+class ChunkedCsvWriter:
+    def __init__(self, path, columns, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.path = path
+        self.columns = list(columns)
+        self.chunk_size = chunk_size
+        self.buffer = []
+        self.rows_written = 0
+        self.header_written = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def write(self, row):
+        self.buffer.append(row)
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer and self.header_written:
+            return
+        chunk = pd.DataFrame(self.buffer, columns=self.columns)
+        chunk.to_csv(self.path, mode='a' if self.header_written else 'w',
+                     header=not self.header_written, index=False)
+        self.header_written = True
+        self.rows_written += len(self.buffer)
+        self.buffer = []
+
+    def close(self):
+        self.flush()
@@ -4,6 +4,9 @@ from collections import defaultdict, Counter
 from datetime import datetime
 import json
 
+from phase_metrics import timed_phase, write_metrics
+from role_frame import build_role_frame, KNOWN_ROLES
+
 class ComprehensiveIGIDVerification:
     def __init__(self):
         self.companies_df = None
@@ -12,6 +15,7 @@ class ComprehensiveIGIDVerification:
         self.statistics = {}
         self.verification_results = {}
         
+    @timed_phase('load_data')
     def load_data(self):
         """Phase 1: Load and prepare data"""
         print("=" * 80)
@@ -38,19 +42,22 @@ class ComprehensiveIGIDVerification:
             print(f"  [ERROR] Failed to load data: {e}")
             return False
     
+    @timed_phase('check_structural_integrity', rows=lambda self: len(self.transactions_df) + len(self.companies_df))
     def check_structural_integrity(self):
         """Phase 2: Structural integrity checks"""
         print("\n[PHASE 2] Checking structural integrity...")
         
         # Check IG_ID format in transactions
         print("  Checking transaction IG_IDs...")
-        invalid_tx_ids = []
-        for idx, row in self.transactions_df.iterrows():
-            ig_id = str(row['IG_ID'])
-            if pd.isna(row['IG_ID']):
-                invalid_tx_ids.append({'row': idx + 2, 'value': 'NULL'})
-            elif not ig_id.replace('.0', '').isdigit():
-                invalid_tx_ids.append({'row': idx + 2, 'value': ig_id})
+        tx_ids = self.transactions_df['IG_ID']
+        tx_null = tx_ids.isna()
+        tx_text = tx_ids.astype(str)
+        tx_valid = tx_text.str.replace('.0', '', regex=False).str.isdigit()
+        tx_invalid = tx_null | ~tx_valid.fillna(False).astype(bool)
+        invalid_tx_ids = [
+            {'row': int(idx) + 2, 'value': 'NULL' if null else value}
+            for idx, null, value in zip(tx_ids.index[tx_invalid], tx_null[tx_invalid], tx_text[tx_invalid])
+        ]
         
         if invalid_tx_ids:
             self.issues['invalid_transaction_ids'] = invalid_tx_ids
@@ -60,22 +67,19 @@ class ComprehensiveIGIDVerification:
         
         # Check IG_ID format in companies
         print("  Checking company IG_IDs...")
-        invalid_company_ids = []
-        companies_with_ig_id = 0
-        
-        for idx, row in self.companies_df.iterrows():
-            if pd.notna(row['IG_ID']) and str(row['IG_ID']).strip():
-                companies_with_ig_id += 1
-                ig_ids = str(row['IG_ID']).split(',')
-                for ig_id in ig_ids:
-                    ig_id = ig_id.strip()
-                    if not ig_id.replace('.0', '').isdigit():
-                        invalid_company_ids.append({
-                            'company': row['name'],
-                            'row': idx + 2,
-                            'invalid_id': ig_id,
-                            'full_value': row['IG_ID']
-                        })
+        company_ids = self.companies_df['IG_ID']
+        has_ig_id = company_ids.notna() & (company_ids.astype(str).str.strip() != '')
+        companies_with_ig_id = int(has_ig_id.sum())
+        
+        # One row per listed IG_ID, index kept so rows map back to their company
+        exploded = company_ids[has_ig_id].astype(str).str.split(',').explode().str.strip()
+        valid = exploded.str.replace('.0', '', regex=False).str.isdigit()
+        bad = exploded[~valid.fillna(False).astype(bool)]
+        invalid_company_ids = [
+            {'company': company, 'row': int(idx) + 2, 'invalid_id': invalid_id, 'full_value': full_value}
+            for idx, invalid_id, company, full_value in zip(
+                bad.index, bad, self.companies_df.loc[bad.index, 'name'], company_ids[bad.index])
+        ]
         
         if invalid_company_ids:
             self.issues['invalid_company_ids'] = invalid_company_ids
@@ -87,20 +91,17 @@ class ComprehensiveIGIDVerification:
         
         # Check role field consistency
         print("  Checking role field consistency...")
-        role_issues = []
-        for idx, row in self.companies_df.iterrows():
-            if pd.notna(row['IG_ID']) and pd.notna(row['ig_role']):
-                ig_ids = str(row['IG_ID']).split(',')
-                roles = str(row['ig_role']).split(',')
-                
-                if len(ig_ids) != len(roles):
-                    role_issues.append({
-                        'company': row['name'],
-                        'ig_id_count': len(ig_ids),
-                        'role_count': len(roles),
-                        'ig_ids': row['IG_ID'],
-                        'roles': row['ig_role']
-                    })
+        both = self.companies_df[company_ids.notna() & self.companies_df['ig_role'].notna()]
+        ig_id_counts = both['IG_ID'].astype(str).str.count(',') + 1
+        role_counts = both['ig_role'].astype(str).str.count(',') + 1
+        mismatched = both[ig_id_counts != role_counts]
+        role_issues = [
+            {'company': name, 'ig_id_count': int(ig_count), 'role_count': int(role_count),
+             'ig_ids': ig_ids, 'roles': roles}
+            for name, ig_count, role_count, ig_ids, roles in zip(
+                mismatched['name'], ig_id_counts[mismatched.index], role_counts[mismatched.index],
+                mismatched['IG_ID'], mismatched['ig_role'])
+        ]
         
         if role_issues:
             self.issues['role_count_mismatch'] = role_issues
@@ -110,6 +111,7 @@ class ComprehensiveIGIDVerification:
         
         return True
     
+    @timed_phase('validate_bidirectional_connections', rows=lambda self: len(self.transactions_df) + len(self.companies_df))
     def validate_bidirectional_connections(self):
         """Phase 3: Bidirectional IG_ID validation"""
         print("\n[PHASE 3] Validating bidirectional IG_ID connections...")
@@ -154,48 +156,34 @@ class ComprehensiveIGIDVerification:
         
         return True
     
+    @timed_phase('verify_role_consistency', rows=lambda self: len(self.companies_df))
     def verify_role_consistency(self):
         """Phase 4: Role consistency verification"""
         print("\n[PHASE 4] Verifying role consistency...")
         
-        # Build transaction role mapping
-        tx_roles = defaultdict(lambda: {'targets': [], 'leads': [], 'participants': []})
-        
-        for idx, row in self.companies_df.iterrows():
-            if pd.notna(row['IG_ID']) and pd.notna(row['ig_role']):
-                ig_ids = str(row['IG_ID']).split(',')
-                roles = str(row['ig_role']).split(',')
-                company_name = row['name']
-                
-                for ig_id, role in zip(ig_ids, roles):
-                    ig_id = ig_id.strip().replace('.0', '')
-                    role = role.strip()
-                    
-                    if role == 'target':
-                        tx_roles[ig_id]['targets'].append(company_name)
-                    elif role == 'lead':
-                        tx_roles[ig_id]['leads'].append(company_name)
-                    elif role == 'participant':
-                        tx_roles[ig_id]['participants'].append(company_name)
+        # One row per (ig_id, company, role); unknown roles are ignored
+        roles = build_role_frame(self.companies_df)
+        roles = roles[roles['role'].isin(KNOWN_ROLES)]
+        is_target = roles['role'] == 'target'
+        targets = roles[is_target]
+        investors = roles[~is_target]
         
         # Check one target per transaction rule
         print("  Checking one target per transaction rule...")
-        multiple_targets = []
-        no_targets = []
-        
-        for ig_id in set(self.transactions_df['IG_ID'].dropna().astype(str).str.replace('.0', '')):
-            if ig_id in tx_roles:
-                targets = tx_roles[ig_id]['targets']
-                if len(targets) > 1:
-                    multiple_targets.append({
-                        'ig_id': ig_id,
-                        'targets': targets,
-                        'count': len(targets)
-                    })
-                elif len(targets) == 0:
-                    no_targets.append(ig_id)
-            else:
-                no_targets.append(ig_id)
+        target_lists = targets.groupby('ig_id', sort=False)['company'].agg(list)
+        target_counts = target_lists.str.len()
+        
+        tx_ig_ids = pd.Series(
+            self.transactions_df['IG_ID'].dropna().astype(str).str.replace('.0', '', regex=False).unique()
+        )
+        tx_target_counts = tx_ig_ids.map(target_counts).fillna(0)
+        
+        multiple = tx_ig_ids[tx_target_counts > 1]
+        multiple_targets = [
+            {'ig_id': ig_id, 'targets': target_lists[ig_id], 'count': len(target_lists[ig_id])}
+            for ig_id in multiple
+        ]
+        no_targets = tx_ig_ids[tx_target_counts == 0].tolist()
         
         if multiple_targets:
             self.issues['multiple_targets'] = multiple_targets
@@ -211,18 +199,15 @@ class ComprehensiveIGIDVerification:
         
         # Check for same company as target and investor
         print("  Checking for target-investor conflicts...")
-        target_investor_conflicts = []
-        
-        for ig_id, roles_dict in tx_roles.items():
-            targets = set(roles_dict['targets'])
-            investors = set(roles_dict['leads'] + roles_dict['participants'])
-            
-            conflicts = targets & investors
-            if conflicts:
-                target_investor_conflicts.append({
-                    'ig_id': ig_id,
-                    'conflicting_companies': list(conflicts)
-                })
+        conflicts = (
+            targets[['ig_id', 'company']].dropna().drop_duplicates()
+            .merge(investors[['ig_id', 'company']].drop_duplicates(), on=['ig_id', 'company'])
+            .groupby('ig_id', sort=False)['company'].agg(list)
+        )
+        target_investor_conflicts = [
+            {'ig_id': ig_id, 'conflicting_companies': companies}
+            for ig_id, companies in conflicts.items()
+        ]
         
         if target_investor_conflicts:
             self.issues['target_investor_conflicts'] = target_investor_conflicts
@@ -231,14 +216,12 @@ class ComprehensiveIGIDVerification:
             print(f"    [OK] No target-investor conflicts found")
         
         # Statistics
-        self.statistics['transactions_with_targets'] = len([k for k, v in tx_roles.items() if v['targets']])
-        self.statistics['avg_investors_per_transaction'] = np.mean([
-            len(v['leads']) + len(v['participants']) 
-            for v in tx_roles.values()
-        ])
+        self.statistics['transactions_with_targets'] = len(target_lists)
+        self.statistics['avg_investors_per_transaction'] = (~is_target).groupby(roles['ig_id']).sum().mean()
         
         return True
     
+    @timed_phase('analyze_data_quality', rows=lambda self: len(self.companies_df))
     def analyze_data_quality(self):
         """Phase 5: Data quality analysis"""
         print("\n[PHASE 5] Analyzing data quality...")
@@ -299,6 +282,7 @@ class ComprehensiveIGIDVerification:
         
         return True
     
+    @timed_phase('generate_statistical_analysis', rows=lambda self: len(self.companies_df))
     def generate_statistical_analysis(self):
         """Phase 6: Statistical analysis"""
         print("\n[PHASE 6] Generating statistical analysis...")
@@ -339,6 +323,7 @@ class ComprehensiveIGIDVerification:
         
         return True
     
+    @timed_phase('generate_reports')
     def generate_reports(self):
         """Phase 7: Generate comprehensive reports"""
         print("\n[PHASE 7] Generating verification reports...")
@@ -427,6 +412,8 @@ class ComprehensiveIGIDVerification:
         print("VERIFICATION COMPLETE")
         print("=" * 80)
         
+        write_metrics('comprehensive_ig_id_verification')
+        
         return success
 
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+"""
+Column-level date parsing shared by the verification and mapping scripts
+InvestGame dates are DD/MM/YYYY, Arcadia dates YYYY-MM-DD. Instead of trying
+strptime formats value by value, the format is inferred once per column from a
+sample and the whole column is parsed with pd.to_datetime. Values the inferred
+format rejects fall back to the other known formats (still vectorized), and
+whatever is left is reported instead of silently becoming None.
+
+Parsed columns are memoized in-process by a hash of their values, so scripts that
+parse the same Date column in several phases only pay for it once.
+
+Usage:
+    parsed = parse_date_column(df['Date'], label='Date')
+    years = parsed.dates.dt.year
+    parsed.failures          # raw values that could not be parsed, by row
+"""
+
+import hashlib
+import numbers
+from collections import namedtuple
+
+import pandas as pd
+
+# Order matters on ties (e.g. 2020-05-03 parses as both %Y-%m-%d and %Y-%d-%m)
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%Y-%d-%m', '%Y-%m-%d %H:%M:%S')
+SAMPLE_SIZE = 500
+
+ParsedDates = namedtuple('ParsedDates', ['dates', 'format', 'failures'])
+
+_parsed_cache = {}
+
+def _non_blank(values):
+    values = values.dropna().astype(str).str.strip()
+    return values[values != '']
+
+def infer_date_format(values, formats=DATE_FORMATS, sample_size=SAMPLE_SIZE):
+    """Format that parses the most of a sample of the column (None if none parse anything)"""
+    sample = _non_blank(values).drop_duplicates()
+    if len(sample) > sample_size:
+        sample = sample.sample(sample_size, random_state=0)
+    if sample.empty:
+        return None
+
+    scores = [pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum() for fmt in formats]
+    best = max(range(len(formats)), key=lambda i: (scores[i], -i))
+    return formats[best] if scores[best] else None
+
+def _column_key(values, formats):
+    digest = hashlib.blake2b(pd.util.hash_pandas_object(values, index=True).to_numpy().tobytes(), digest_size=16)
+    return (digest.hexdigest(), len(values), formats)
+
+def parse_date_column(values, formats=DATE_FORMATS, label=None, verbose=True):
+    """
+    Parse a whole column of date strings; returns ParsedDates(dates, format, failures)
+    dates is datetime64 aligned with values (NaT for blank or unparseable values),
+    failures holds the raw values that were not blank but could not be parsed.
+    """
+    formats = tuple(formats)
+    key = _column_key(values, formats)
+    if key not in _parsed_cache:
+        text = values.astype(str).str.strip().where(values.notna())
+        dates = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+
+        fmt = infer_date_format(text, formats)
+        if fmt is not None:
+            remaining = text.notna() & (text != '')
+            for candidate in (fmt,) + tuple(f for f in formats if f != fmt):
+                if not remaining.any():
+                    break
+                parsed = pd.to_datetime(text[remaining], format=candidate, errors='coerce', cache=True)
+                dates.loc[parsed.index[parsed.notna()]] = parsed[parsed.notna()]
+                remaining &= dates.isna()
+
+        blank = text.isna() | (text == '')
+        failures = values[dates.isna() & ~blank]
+        _parsed_cache[key] = ParsedDates(dates, fmt, failures)
+
+    result = _parsed_cache[key]
+    if verbose and len(result.failures):
+        rows = ', '.join(str(idx + 2) if isinstance(idx, numbers.Integral) else str(idx) for idx in result.failures.index[:10])
+        more = f" ... and {len(result.failures) - 10} more" if len(result.failures) > 10 else ""
+        print(f"[WARNING] {label or values.name}: {len(result.failures)} values could not be parsed "
+              f"(format {result.format}), rows {rows}{more}")
+    return ParsedDates(result.dates.copy(), result.format, result.failures.copy())
+
+def clear_date_cache():
+    _parsed_cache.clear()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Bulk derivation of transactions_count and search_index for pending company cards
+Created: 2025-09-11
+Purpose: Arcadia fills both fields itself (transaction signals and Company.save(),
+docs/01_arcadia_system.md). Our TO BE CREATED rows carry placeholder values (count 0,
+search_index built from country names) and the TBC cards carry none. This derives both
+for every card in one pass, the way Arcadia would after import:
+
+    transactions_count  links where the card is lead investor or other investor
+                        (target links do not count), one np.bincount over all links
+    search_index        name, also_known_as, hq_country code, hq_region, website joined
+                        with ", ", empty fields skipped; unknown country ("XX", blank,
+                        "notenoughinformation") gives "notenoughinformation" for country
+                        and region; the website is appended as stored, placeholder
+                        notenoughinformation.com included, as save() does
+
+Cards with an id are counted by id; TO BE CREATED rows have no id yet and are counted by
+casefolded name. Country codes are learned from the Arcadia export's own search_index
+(display name -> ISO code); countries the export never shows keep their display name.
+
+Usage:
+    py scripts/derive_card_fields.py
+    py scripts/derive_card_fields.py --apply    # also write the values into arcadia_company_unmapped.csv
+"""
+
+import argparse
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from arcadia_name_index import exact_key
+from phase_metrics import timed_phase, write_metrics
+
+NOT_ENOUGH_INFORMATION = 'notenoughinformation'
+UNKNOWN_COUNTRIES = {'', 'XX', NOT_ENOUGH_INFORMATION}
+COUNTED_ROLES = ('lead', 'participant')  # Arcadia: lead_investors + other_investors
+SEARCH_INDEX_MAX_LENGTH = 2000
+SEARCH_INDEX_SEPARATOR = ', '
+# Country spellings in our cards -> the display names the Arcadia export uses
+COUNTRY_NAME_VARIANTS = {'United States': 'USA', 'US': 'USA', 'UK': 'United Kingdom',
+                         'UAE': 'United Arab Emirates', 'Czech Republic': 'Czechia'}
+
+UNMAPPED_FILE = 'output/arcadia_company_unmapped.csv'
+TBC_CARDS_FILE = 'output/companies_import_FINAL_ALL.csv'
+PARTICIPANTS_FILE = 'output/transaction_import_participants.csv'
+WIDE_TRANSACTIONS_FILE = 'output/transaction_import_FINAL_ALL.csv'
+REPORT_COLUMNS = ['source', 'card_id', 'name', 'role', 'transactions_count', 'search_index',
+                  'old_transactions_count', 'old_search_index']
+
+def text_column(df, column):
+    """Stripped string column with '' for missing values (or all '' when the column is absent)"""
+    if column not in df.columns:
+        return pd.Series('', index=df.index, dtype=object)
+    return df[column].fillna('').astype(str).str.strip()
+
+def country_codes_from_export(arcadia_df):
+    """hq_country display name -> ISO code, read from the two-letter token in existing search_index values"""
+    if 'search_index' not in arcadia_df.columns:
+        return {}
+    rows = arcadia_df[arcadia_df['search_index'].notna() & arcadia_df['hq_country'].notna()]
+    codes = rows['search_index'].str.extract(r'(?:^|, )([A-Z]{2}), ')[0]
+    pairs = pd.DataFrame({'country': rows['hq_country'], 'code': codes}).dropna()
+    pairs = pairs[~pairs['country'].isin(UNKNOWN_COUNTRIES)]
+    return pairs.groupby('country')['code'].agg(lambda values: values.mode().iloc[0]).to_dict()
+
+def load_links(participants_file=PARTICIPANTS_FILE, wide_file=WIDE_TRANSACTIONS_FILE):
+    """Company-transaction links (TRANSACTION_ID, COMPANY_ID, COMPANY_NAME, ROLE) from the long table, else the wide file"""
+    if os.path.exists(participants_file):
+        return pd.read_csv(participants_file, dtype=str, usecols=['TRANSACTION_ID', 'COMPANY_ID', 'COMPANY_NAME', 'ROLE'])
+    if not os.path.exists(wide_file):
+        return pd.DataFrame(columns=['TRANSACTION_ID', 'COMPANY_ID', 'COMPANY_NAME', 'ROLE'])
+
+    wide = pd.read_csv(wide_file, dtype=str)
+    slots = [pd.DataFrame({'TRANSACTION_ID': wide['TRANSACTION_ID'], 'COMPANY_ID': wide['TARGET_COMPANY_ID'],
+                           'COMPANY_NAME': wide['TARGET_COMPANY_NAME'], 'ROLE': 'target'})]
+    for slot in sorted({int(m.group(1)) for m in map(re.compile(r'INVESTOR_(\d+)_ID$').match, wide.columns) if m}):
+        prefix = f'INVESTOR_{slot}_'
+        slots.append(pd.DataFrame({'TRANSACTION_ID': wide['TRANSACTION_ID'], 'COMPANY_ID': wide[prefix + 'ID'],
+                                   'COMPANY_NAME': wide[prefix + 'NAME'], 'ROLE': wide[prefix + 'ROLE']}))
+    links = pd.concat(slots, ignore_index=True)
+    return links[links['COMPANY_ID'].notna() | links['COMPANY_NAME'].notna()].reset_index(drop=True)
+
+def card_keys(cards):
+    """'id:<id>' for cards with an id, 'name:<casefolded name>' for cards still waiting for one"""
+    ids = text_column(cards, 'id')
+    names = text_column(cards, 'name').map(exact_key)
+    return pd.Series(np.where(ids != '', 'id:' + ids, 'name:' + names), index=cards.index)
+
+@timed_phase('derive_transactions_count', rows=lambda cards, *_: len(cards))
+def derive_transactions_count(cards, links):
+    """Lead + other investor links per card; one bincount over the factorized link keys"""
+    counted = links[links['ROLE'].isin(COUNTED_ROLES)].drop_duplicates(['TRANSACTION_ID', 'COMPANY_ID', 'COMPANY_NAME', 'ROLE'])
+    link_ids = text_column(counted, 'COMPANY_ID')
+    # Every link counts under its id and under its name, so both kinds of card key find it
+    link_keys = pd.concat([('id:' + link_ids[link_ids != '']),
+                           'name:' + text_column(counted, 'COMPANY_NAME').map(exact_key)], ignore_index=True)
+
+    codes, uniques = pd.factorize(link_keys)
+    counts = np.bincount(codes, minlength=len(uniques))
+    positions = uniques.get_indexer(card_keys(cards))
+    return pd.Series(np.where(positions >= 0, counts[positions], 0), index=cards.index, dtype='int64')
+
+@timed_phase('derive_search_index', rows=lambda cards, *_: len(cards))
+def derive_search_index(cards, country_codes):
+    """Arcadia search_index for every card: joined column-wise, no per-row Python"""
+    country = text_column(cards, 'hq_country')
+    unknown = country.isin(UNKNOWN_COUNTRIES)
+    country = country.replace(COUNTRY_NAME_VARIANTS)
+    country = country.map(country_codes).fillna(country).where(~unknown, NOT_ENOUGH_INFORMATION)
+    region = text_column(cards, 'hq_region').where(~unknown, NOT_ENOUGH_INFORMATION)
+    region = region.where(region != '', NOT_ENOUGH_INFORMATION)
+    website = text_column(cards, 'website') if 'website' in cards.columns else text_column(cards, 'arc_website')
+
+    index = text_column(cards, 'name')
+    for part in (text_column(cards, 'also_known_as'), country, region, website):
+        separator = np.where((index != '') & (part != ''), SEARCH_INDEX_SEPARATOR, '')
+        index = index + separator + part
+    return index.str.slice(0, SEARCH_INDEX_MAX_LENGTH)
+
+def load_cards(unmapped_file=UNMAPPED_FILE, tbc_file=TBC_CARDS_FILE):
+    """TO BE CREATED rows of the unmapped table (source_row = row in that file) and the TBC cards"""
+    frames = []
+    if os.path.exists(unmapped_file):
+        unmapped = pd.read_csv(unmapped_file)
+        pending = unmapped[unmapped['status'] == 'TO BE CREATED']
+        frames.append(pending.assign(source=os.path.basename(unmapped_file), source_row=pending.index))
+    else:
+        print(f"[WARNING] {unmapped_file} not found - skipped")
+    if os.path.exists(tbc_file):
+        frames.append(pd.read_csv(tbc_file).assign(source=os.path.basename(tbc_file)))
+    else:
+        print(f"[WARNING] {tbc_file} not found - skipped (run prepare_all_transactions_import.py)")
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['source', 'id', 'name'])
+
+def main():
+    parser = argparse.ArgumentParser(description='Derive transactions_count and search_index for pending company cards')
+    parser.add_argument('--unmapped', default=UNMAPPED_FILE)
+    parser.add_argument('--cards', default=TBC_CARDS_FILE, help='TBC card file (id, name, role, status)')
+    parser.add_argument('--participants', default=PARTICIPANTS_FILE)
+    parser.add_argument('--transactions', default=WIDE_TRANSACTIONS_FILE,
+                        help='Wide transaction file, used when the participants table is missing')
+    parser.add_argument('--arcadia', default='src/company-names-arcadia.csv')
+    parser.add_argument('--output', default='output/company_card_fields.csv')
+    parser.add_argument('--apply', action='store_true', help='Write the derived values into the unmapped table')
+    args = parser.parse_args()
+
+    print("=== Company Card Field Derivation ===")
+    cards = load_cards(args.unmapped, args.cards)
+    links = load_links(args.participants, args.transactions)
+    country_codes = country_codes_from_export(pd.read_csv(args.arcadia, usecols=['hq_country', 'search_index']))
+    print(f"Loaded {len(cards)} cards, {len(links)} company-transaction links, {len(country_codes)} country codes")
+
+    cards['new_transactions_count'] = derive_transactions_count(cards, links)
+    cards['new_search_index'] = derive_search_index(cards, country_codes)
+
+    report = pd.DataFrame({
+        'source': cards['source'], 'card_id': cards['id'], 'name': cards['name'],
+        'role': cards['role'] if 'role' in cards.columns else np.nan,
+        'transactions_count': cards['new_transactions_count'], 'search_index': cards['new_search_index'],
+        'old_transactions_count': cards['transactions_count'] if 'transactions_count' in cards.columns else np.nan,
+        'old_search_index': cards['search_index'] if 'search_index' in cards.columns else np.nan,
+    }, columns=REPORT_COLUMNS)
+    if 'ig_role' in cards.columns:
+        report['role'] = report['role'].fillna(cards['ig_role'])
+    report.to_csv(args.output, index=False)
+
+    print(f"\n=== RESULTS ===")
+    for source, group in report.groupby('source', sort=False):
+        changed_count = (group['old_transactions_count'].fillna(-1).astype('int64') != group['transactions_count']).sum()
+        changed_index = (group['old_search_index'].fillna('') != group['search_index']).sum()
+        incomplete = group['search_index'].str.contains(NOT_ENOUGH_INFORMATION, regex=False).sum()
+        print(f"  {source}: {len(group)} cards, {(group['transactions_count'] > 0).sum()} with transactions, "
+              f"{changed_count} counts changed, {changed_index} search_index changed, {incomplete} notenoughinformation")
+    print(f"\nSaved report to: {args.output}")
+
+    if args.apply:
+        unmapped = pd.read_csv(args.unmapped)
+        pending = cards[cards['source'] == os.path.basename(args.unmapped)]
+        unmapped.loc[pending['source_row'], 'transactions_count'] = pending['new_transactions_count'].to_numpy()
+        unmapped.loc[pending['source_row'], 'search_index'] = pending['new_search_index'].to_numpy()
+        unmapped.to_csv(args.unmapped, index=False)
+        print(f"Updated {len(pending)} TO BE CREATED rows in: {args.unmapped}")
+
+    write_metrics('derive_card_fields')
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Pre-import transaction duplicate report using Arcadia's signature algorithm
+Created: 2025-09-10
+Purpose: Arcadia flags a new transaction as a potential duplicate when its signature is
+>= 70% similar to an existing one (docs/01_arcadia_system.md, sections 3.6 and 3.2.3).
+This runs the same check locally for every IG deal to be imported, against every Arcadia
+deal and against the other IG deals, before anything is uploaded.
+
+Signatures (as Arcadia builds them):
+  - company:  target name, lowercase, spaces removed
+  - date:     last two digits of the year + lowercase month name ("25july", as stored)
+  - investor: lead investor names concatenated the same way, or "noleadinvestor"
+IG names are resolved to Arcadia's canonical names first (arcadia_name_index), since that is
+what the signatures will contain once the deal is imported. The IG lead is the first listed
+investor, as in prepare_all_transactions_import.py.
+
+Candidates follow Arcadia's blocking: announcement year within +-1 and the candidate's company
+signature containing the first 10 characters of the query's (a 10-character substring index;
+shorter signatures are searched in one joined string per year instead of row by row). Different-year pairs top out at 0.30 with Arcadia's weights, so they are
+skipped without scoring; same-year pairs skip the investor comparison when even a perfect
+investor match could not reach the threshold.
+
+Usage:
+    py scripts/detect_signature_duplicates.py
+    py scripts/detect_signature_duplicates.py --arcadia src/arcadia_database_2025-09-03.csv --threshold 0.7
+"""
+
+import argparse
+import glob
+import os
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from arcadia_name_index import ArcadiaNameIndex
+from date_parsing import parse_date_column
+from entity_tokenizer import InvestorSplitter
+from phase_metrics import timed_phase, track_phase, write_metrics
+from string_similarity import jaro_winkler
+
+DUPLICATE_THRESHOLD = 0.70
+PREFIX_LENGTH = 10
+NO_LEAD_INVESTOR = 'noleadinvestor'
+
+# (company, date, investor) weights by temporal relationship
+SAME_MONTH_WEIGHTS = (0.55, 0.15, 0.30)
+SAME_YEAR_WEIGHTS = (0.40, 0.20, 0.40)
+OTHER_YEAR_WEIGHTS = (0.10, 0.10, 0.10)
+
+REPORT_COLUMNS = ['ig_index', 'ig_id', 'ig_target', 'ig_date', 'ig_lead', 'match_source', 'match_id',
+                  'match_target', 'match_date', 'match_lead', 'company_similarity', 'investor_similarity',
+                  'same_month', 'score']
+
+def company_signature(name):
+    return str(name).lower().replace(' ', '') if pd.notna(name) else ''
+
+def investor_signature(lead_names):
+    signature = ''.join(company_signature(name) for name in lead_names if company_signature(name))
+    return signature or NO_LEAD_INVESTOR
+
+def signature_frame(ids, targets, dates, lead_lists, source):
+    """One row per deal with its signature components; rows without a date cannot be scored"""
+    frame = pd.DataFrame({
+        'id': ids.to_numpy(),
+        'target': targets.to_numpy(),
+        'date': dates.to_numpy(),
+        'lead': [', '.join(leads) for leads in lead_lists],
+        'company_sig': [company_signature(name) for name in targets],
+        'investor_sig': [investor_signature(leads) for leads in lead_lists],
+    }, index=ids.index)
+    frame['year'] = frame['date'].dt.year
+    frame['month'] = frame['date'].dt.month
+    frame['date_sig'] = (frame['year'] % 100).astype('Int64').astype(str) + frame['date'].dt.strftime('%B').str.lower()
+    frame['day'] = frame['date'].dt.strftime('%Y-%m-%d')
+    frame['source'] = source
+    return frame[frame['date'].notna() & (frame['company_sig'] != '')]
+
+def latest_arcadia_export(pattern='src/arcadia_database_*.csv'):
+    exports = sorted(glob.glob(pattern))
+    return exports[-1] if exports else None
+
+@timed_phase('load_arcadia_signatures')
+def load_arcadia_signatures(path, splitter):
+    arcadia_df = pd.read_csv(path)
+    dates = parse_date_column(arcadia_df['Announcement date*'], label='Announcement date*').dates
+    leads = [
+        [name for name in splitter.split(str(value)) if name] if pd.notna(value) else []
+        for value in arcadia_df['Lead Investor / Acquirer']
+    ]
+    return signature_frame(arcadia_df['ID'], arcadia_df['Target Company'], dates, leads, 'arcadia')
+
+@timed_phase('load_ig_signatures')
+def load_ig_signatures(path, splitter, name_index=None):
+    ig_df = pd.read_csv(path)
+    dates = parse_date_column(ig_df['Date'], label='Date').dates
+
+    def canonical(name):
+        match = name_index.resolve(name) if name_index is not None else None
+        return match.name if match is not None else name
+
+    targets = ig_df['Target name'].map(lambda name: canonical(str(name).strip()) if pd.notna(name) else name)
+    leads = []
+    for value in ig_df['Investors / Buyers']:
+        text = str(value).strip() if pd.notna(value) else ''
+        if text and text.lower() not in ['undisclosed', 'n/a', 'na', '']:
+            names = splitter.split(text)
+            leads.append([canonical(names[0])] if names else [])
+        else:
+            leads.append([canonical('Undisclosed')])
+    return signature_frame(ig_df['IG_ID'], targets, dates, leads, 'ig')
+
+class SignatureIndex:
+    """Deals grouped by year, with a 10-character substring index over company signatures"""
+
+    def __init__(self, frame):
+        self.frame = frame.reset_index(drop=True)
+        self.years = self.frame['year'].to_numpy()
+        self.company_sigs = self.frame['company_sig'].to_numpy()
+        # Per year: all signatures joined into one string, so short prefixes are found with str.find
+        self.year_text = {}
+        for year, positions in self.frame.groupby('year').indices.items():
+            lengths = np.array([len(sig) + 1 for sig in self.company_sigs[positions]])
+            starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+            self.year_text[year] = ('\n'.join(self.company_sigs[positions]), starts, positions)
+        self.substrings = defaultdict(set)
+        for position, signature in enumerate(self.company_sigs):
+            for start in range(max(len(signature) - PREFIX_LENGTH + 1, 1)):
+                self.substrings[signature[start:start + PREFIX_LENGTH]].add(position)
+
+    def candidates(self, company_sig, year):
+        """Positions whose company signature contains the query prefix, announced within +-1 year"""
+        prefix = company_sig[:PREFIX_LENGTH]
+        if len(prefix) == PREFIX_LENGTH:
+            positions = np.fromiter(self.substrings.get(prefix, ()), dtype=np.int64)
+        else:
+            # Short signatures: substring search over the year window only
+            found = []
+            for window_year in (year - 1, year, year + 1):
+                if window_year in self.year_text:
+                    found.append(self._find_in_year(prefix, *self.year_text[window_year]))
+            return np.unique(np.concatenate(found)) if found else np.array([], dtype=np.int64)
+        return positions[np.abs(self.years[positions] - year) <= 1] if len(positions) else positions
+
+    @staticmethod
+    def _find_in_year(prefix, text, starts, positions):
+        offsets = []
+        offset = text.find(prefix)
+        while offset != -1:
+            offsets.append(offset)
+            offset = text.find(prefix, offset + 1)
+        return positions[np.searchsorted(starts, offsets, side='right') - 1] if offsets else np.array([], dtype=np.int64)
+
+def weighted_similarity(query, candidate, threshold=DUPLICATE_THRESHOLD):
+    """(company_sim, investor_sim, same_month, score); investor_sim is None when the pair cannot reach threshold"""
+    same_year = query['year'] == candidate['year']
+    same_month = same_year and query['month'] == candidate['month']
+    company_weight, date_weight, investor_weight = (
+        SAME_MONTH_WEIGHTS if same_month else SAME_YEAR_WEIGHTS if same_year else OTHER_YEAR_WEIGHTS)
+    date_sim = 1.0 if query['date_sig'] == candidate['date_sig'] else 0.0
+
+    company_sim = jaro_winkler(query['company_sig'], candidate['company_sig'])
+    partial = company_sim * company_weight + date_sim * date_weight
+    if partial + investor_weight < threshold:
+        return company_sim, None, same_month, partial
+    investor_sim = jaro_winkler(query['investor_sig'], candidate['investor_sig'])
+    return company_sim, investor_sim, same_month, partial + investor_sim * investor_weight
+
+@timed_phase('find_signature_duplicates', rows=lambda queries, *_, **__: len(queries))
+def find_duplicates(queries, index, threshold=DUPLICATE_THRESHOLD, exclude_self=False):
+    """Report rows for every (query, candidate) pair scoring >= threshold, plus pair counts"""
+    rows = []
+    counts = {'candidates': 0, 'scored': 0}
+    # Different-year pairs cannot reach the threshold (max 0.30), so only same-year candidates are scored
+    can_cross_years = sum(OTHER_YEAR_WEIGHTS) >= threshold
+    columns = {column: index.frame[column].to_numpy() for column in index.frame.columns}
+    ids = columns['id']
+
+    for query in queries.to_dict('records'):
+        positions = index.candidates(query['company_sig'], query['year'])
+        counts['candidates'] += len(positions)
+        if not can_cross_years:
+            positions = positions[index.years[positions] == query['year']]
+        if exclude_self:
+            positions = positions[ids[positions] != query['id']]
+        for position in positions:
+            candidate = {column: values[position] for column, values in columns.items()}
+            counts['scored'] += 1
+            company_sim, investor_sim, same_month, score = weighted_similarity(query, candidate, threshold)
+            if score >= threshold:
+                rows.append({
+                    'ig_index': query['row'], 'ig_id': query['id'], 'ig_target': query['target'],
+                    'ig_date': query['day'], 'ig_lead': query['lead'],
+                    'match_source': candidate['source'], 'match_id': candidate['id'],
+                    'match_target': candidate['target'], 'match_date': candidate['day'],
+                    'match_lead': candidate['lead'], 'company_similarity': round(company_sim, 4),
+                    'investor_similarity': round(investor_sim, 4), 'same_month': same_month, 'score': round(score, 4)
+                })
+    return pd.DataFrame(rows, columns=REPORT_COLUMNS), counts
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Arcadia signature duplicate check for IG deals before import')
+    parser.add_argument('--ig', default='output/ig_arc_unmapped_vF.csv', help='IG deals to be imported')
+    parser.add_argument('--arcadia', default=None, help='Arcadia transactions export (default: latest src/arcadia_database_*.csv)')
+    parser.add_argument('--companies', default='src/company-names-arcadia.csv', help='Arcadia companies, for canonical names')
+    parser.add_argument('--threshold', type=float, default=DUPLICATE_THRESHOLD)
+    parser.add_argument('--no-resolve', action='store_true', help='Use IG names as they are, without Arcadia canonical names')
+    parser.add_argument('--output', default='output/signature_duplicates.csv')
+    args = parser.parse_args()
+
+    arcadia_path = args.arcadia or latest_arcadia_export()
+    if arcadia_path is None or not os.path.exists(arcadia_path):
+        print("[ERROR] No Arcadia transactions export found (src/arcadia_database_*.csv)")
+        return 1
+
+    print("=== Signature Duplicate Check ===")
+    splitter = InvestorSplitter.from_arcadia(args.companies)
+    name_index = None if args.no_resolve else ArcadiaNameIndex.from_csv(args.companies)
+
+    arcadia = load_arcadia_signatures(arcadia_path, splitter)
+    ig = load_ig_signatures(args.ig, splitter, name_index)
+    ig['row'] = ig.index
+    print(f"Signatures: {len(ig)} IG deals ({args.ig}), {len(arcadia)} Arcadia deals ({arcadia_path})")
+
+    with track_phase('build_signature_indexes', rows=len(arcadia) + len(ig)):
+        arcadia_index = SignatureIndex(arcadia)
+        ig_index = SignatureIndex(ig)
+
+    against_arcadia, arcadia_counts = find_duplicates(ig, arcadia_index, args.threshold)
+    within_ig, ig_counts = find_duplicates(ig, ig_index, args.threshold, exclude_self=True)
+    # Each IG pair is found from both sides; keep one
+    within_ig = within_ig[within_ig['ig_index'] < within_ig['match_id'].map(dict(zip(ig['id'], ig['row'])))]
+
+    report = pd.concat([against_arcadia, within_ig], ignore_index=True)
+    report = report.sort_values(['score', 'ig_index'], ascending=[False, True])
+    report.to_csv(args.output, index=False)
+
+    naive_pairs = len(ig) * len(arcadia) + len(ig) * (len(ig) - 1)
+    print(f"\n=== RESULTS (threshold {args.threshold:.0%}) ===")
+    print(f"Pairs: {naive_pairs:,} naive -> {arcadia_counts['candidates'] + ig_counts['candidates']:,} blocked "
+          f"-> {arcadia_counts['scored'] + ig_counts['scored']:,} scored")
+    print(f"Potential duplicates of Arcadia deals: {len(against_arcadia)} pairs, "
+          f"{against_arcadia['ig_index'].nunique()} IG deals")
+    print(f"Potential duplicates within the IG batch: {len(within_ig)} pairs")
+    for row in report.head(10).itertuples():
+        print(f"  {row.score:.2f}  IG {row.ig_id} {row.ig_target} ({row.ig_date}) ~ "
+              f"{row.match_source} {row.match_id} {row.match_target} ({row.match_date})")
+    print(f"\nSaved report to: {args.output}")
+
+    write_metrics('detect_signature_duplicates')
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,170 @@
+"""
+Entity-aware splitting of "Investors / Buyers" lists
+The import prep splits investor lists on , ; / & + and " and ", which breaks
+company names such as "Draper & Associates" into bogus pieces (each of which
+would become its own TBC company card). Known names are located first with an
+Aho-Corasick automaton (one pass over the text, however many names are loaded);
+delimiters inside those spans are ignored and the rest of the text is split as
+before.
+
+Only names that contain a delimiter need protecting, so only those are loaded
+into the automaton; every other name already survives the plain split.
+
+Usage:
+    splitter = InvestorSplitter.from_arcadia('src/company-names-arcadia.csv')
+    splitter.split('Draper & Associates, Sony and Tencent')
+    # ['Draper & Associates', 'Sony', 'Tencent']
+
+    py scripts/entity_tokenizer.py    # split sanity checks against the Arcadia export
+"""
+
+import os
+import re
+from collections import deque
+
+import pandas as pd
+
+INVESTOR_DELIMITERS = re.compile(r'[,;/&+]|\s+and\s+')
+ALIAS_LIST_FIELDS = ('also_known_as', 'aliases')  # comma-separated alias lists in the Arcadia export
+
+# Legitimate names containing '&' (see investigate_phantom_ig.py)
+KNOWN_AMPERSAND_NAMES = [
+    "Aream & Co.",
+    "BANANACULTURE GAMING & MEDIA",
+    "Draper & Associates",
+    "Engine Gaming & Media",
+    "German Federal Ministry for Economic Affairs & Energy",
+    "Whitwell & Co"
+]
+
+def _fold(text):
+    """Lowercase without changing string length, so match offsets stay valid"""
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return ''.join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+class EntityMatcher:
+    """Aho-Corasick automaton over a fixed set of names (case-insensitive, whole words only)"""
+
+    def __init__(self, names):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [0]  # length of the name ending at this node (0 if none)
+        self.names = 0
+
+        for name in names:
+            pattern = _fold(str(name).strip())
+            if pattern:
+                self._add(pattern)
+        self._build_failure_links()
+
+    def __len__(self):
+        return self.names
+
+    def _add(self, pattern):
+        node = 0
+        for char in pattern:
+            next_node = self.goto[node].get(char)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto[node][char] = next_node
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(0)
+            node = next_node
+        if not self.output[node]:
+            self.names += 1
+        self.output[node] = len(pattern)
+
+    def _build_failure_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(char, 0)
+
+    def _all_matches(self, folded):
+        node = 0
+        for end, char in enumerate(folded, 1):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            # Shorter names ending here are reached through the failure chain
+            state = node
+            while state:
+                if self.output[state]:
+                    yield end - self.output[state], end
+                state = self.fail[state]
+
+    def find(self, text):
+        """Non-overlapping (start, end) spans of known names, leftmost-longest first"""
+        if not self.names or not text:
+            return []
+        folded = _fold(text)
+        candidates = [
+            (start, end) for start, end in self._all_matches(folded)
+            if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+        ]
+        candidates.sort(key=lambda span: (span[0], span[0] - span[1]))
+
+        spans = []
+        last_end = 0
+        for start, end in candidates:
+            if start >= last_end:
+                spans.append((start, end))
+                last_end = end
+        return spans
+
+class InvestorSplitter:
+    """Split investor lists on delimiters, except inside known company names"""
+
+    def __init__(self, known_names=()):
+        names = {str(name).strip() for name in known_names if pd.notna(name)}
+        names.update(KNOWN_AMPERSAND_NAMES)
+        self.matcher = EntityMatcher(sorted(name for name in names if INVESTOR_DELIMITERS.search(name)))
+
+    @classmethod
+    def from_arcadia(cls, path='src/company-names-arcadia.csv'):
+        """
+        Names, also-known-as and aliases from the Arcadia company export (known '&' names only if missing)
+        also_known_as / aliases cells are comma-separated lists ("GV, Google"), so each piece is a name
+        of its own; loading the whole cell would glue distinct investors into one protected span.
+        """
+        if not os.path.exists(path):
+            return cls()
+        arcadia_df = pd.read_csv(path, usecols=lambda col: col in ('name',) + ALIAS_LIST_FIELDS)
+        names = [arcadia_df['name']] if 'name' in arcadia_df.columns else []
+        for field in ALIAS_LIST_FIELDS:
+            if field in arcadia_df.columns:
+                names.append(arcadia_df[field].dropna().astype(str).str.split(',').explode().str.strip())
+        return cls(pd.concat(names).dropna() if names else ())
+
+    def split(self, text):
+        protected = self.matcher.find(text)
+        names = []
+        piece_start = 0
+        for delimiter in INVESTOR_DELIMITERS.finditer(text):
+            if any(delimiter.start() < end and delimiter.end() > start for start, end in protected):
+                continue
+            names.append(text[piece_start:delimiter.start()])
+            piece_start = delimiter.end()
+        names.append(text[piece_start:])
+        return [name.strip() for name in names if name.strip()]
+
+if __name__ == "__main__":
+    # Sanity check against the Arcadia export: alias lists must not protect a whole "A, B" cell
+    splitter = InvestorSplitter.from_arcadia()
+    checks = {
+        'GV, Google, Sequoia': ['GV', 'Google', 'Sequoia'],
+        'NTT Corp, NTT Docomo Ventures': ['NTT Corp', 'NTT Docomo Ventures'],
+        'Draper & Associates, Sony and Tencent': ['Draper & Associates', 'Sony', 'Tencent'],
+    }
+    for text, expected in checks.items():
+        result = splitter.split(text)
+        assert result == expected, f"{text!r} -> {result}, expected {expected}"
+        print(f"[OK] {text!r} -> {result}")
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Threshold sweep for the company name matchers
+Created: 2025-09-08
+Purpose: Measure precision, recall and throughput of the 95% (fuzzy_match_companies),
+90% (rematch_blank_arc_ids) and 89% (Arcadia's Jaro-Winkler rule) thresholds against
+matches we have already adjudicated, so thresholds and candidate pruning can be chosen
+on data instead of by eye.
+
+Labeled set:
+    output/fuzzy_match_log.csv        - applied matches (positive)
+    output/arcadia_id_match_log.csv   - case-sensitive ID matches (positive),
+                                        'no_match' rows (negative)
+    apply_to_be_created_matches.py    - MATCHES_TO_APPLY manual matches (positive)
+
+Each query is scored once per scorer and pruning mode; the sweep over thresholds then
+reuses the stored top candidates.
+
+Pruning modes:
+    none         - score every Arcadia name
+    length       - skip names whose length alone caps the score below the lowest threshold (lossless)
+    prefix       - only names sharing the first 2 characters (lossy)
+    first_token  - only names sharing the first word (lossy)
+
+Usage:
+    py scripts/evaluate_match_thresholds.py
+    py scripts/evaluate_match_thresholds.py --scorers jaro_winkler --pruning length prefix
+    py scripts/evaluate_match_thresholds.py --thresholds 0.85 0.89 0.9 0.95 --limit 200
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from apply_to_be_created_matches import MATCHES_TO_APPLY
+from fuzzy_match_companies import calculate_fuzzy_score, normalize_for_matching
+from rematch_blank_arc_ids import calculate_similarity, normalize_name
+from string_similarity import ARCADIA_SIMILARITY_THRESHOLD, jaro_winkler, jaro_winkler_upper_bound
+
+FUZZY_MATCH_LOG = Path('output/fuzzy_match_log.csv')
+ID_MATCH_LOG = Path('output/arcadia_id_match_log.csv')
+ARCADIA_FILE = Path('src/company-names-arcadia.csv')
+OUTPUT_FILE = Path('output/threshold_sweep.csv')
+
+DEFAULT_THRESHOLDS = [0.80, 0.85, 0.87, 0.89, 0.90, 0.92, 0.95, 0.97, 1.00]
+PRUNING_MODES = ['none', 'length', 'prefix', 'first_token']
+TOP_CANDIDATES = 5
+
+def sequence_length_bound(len1, len2):
+    """Highest SequenceMatcher ratio two strings of these lengths can reach"""
+    return 2 * min(len1, len2) / (len1 + len2) if len1 + len2 else 0.0
+
+# name: (normalizer, score function 0-1, current threshold, length bound, decision policy)
+# policy 'unique' = a match only when exactly one Arcadia ID clears the threshold
+# (fuzzy_match_companies sends the rest to manual review), 'best' = take the top score
+SCORERS = {
+    'fuzzy_match': (normalize_for_matching, lambda a, b: calculate_fuzzy_score(a, b) / 100,
+                    0.95, sequence_length_bound, 'unique'),
+    'rematch': (normalize_name, calculate_similarity, 0.90, sequence_length_bound, 'best'),
+    'jaro_winkler': (lambda name: str(name).strip().lower() if pd.notna(name) else '', jaro_winkler,
+                     ARCADIA_SIMILARITY_THRESHOLD, jaro_winkler_upper_bound, 'best'),
+}
+
+# ----------------------------------------------------------------------
+# Labeled set
+# ----------------------------------------------------------------------
+def load_labeled_set():
+    """(query, arcadia_id or None, source) for every adjudicated name"""
+    print("[LOAD] Building labeled set...")
+    labels = []
+
+    if FUZZY_MATCH_LOG.exists():
+        log = pd.read_csv(FUZZY_MATCH_LOG)
+        for _, row in log.iterrows():
+            labels.append((row['unmapped_name'], int(row['matched_id']), 'fuzzy_match_log'))
+        print(f"  - {FUZZY_MATCH_LOG}: {len(log)} positives")
+    else:
+        print(f"  [WARNING] {FUZZY_MATCH_LOG} not found (run fuzzy_match_companies.py)")
+
+    if ID_MATCH_LOG.exists():
+        log = pd.read_csv(ID_MATCH_LOG)
+        negatives = log['match_type'] == 'no_match'
+        for _, row in log[~negatives].iterrows():
+            labels.append((row['company_name'], int(row['matched_id']), 'arcadia_id_match_log'))
+        for _, row in log[negatives].iterrows():
+            labels.append((row['company_name'], None, 'arcadia_id_match_log'))
+        print(f"  - {ID_MATCH_LOG}: {(~negatives).sum()} positives, {negatives.sum()} negatives")
+    else:
+        print(f"  [WARNING] {ID_MATCH_LOG} not found (run match_arcadia_ids_case_sensitive.py)")
+
+    for match in MATCHES_TO_APPLY:
+        labels.append((match['unmapped_name'], match['arcadia_id'], 'manual'))
+    print(f"  - apply_to_be_created_matches.py: {len(MATCHES_TO_APPLY)} positives")
+
+    # One label per query; drop names the sources disagree on
+    by_query = {}
+    conflicts = set()
+    for query, arcadia_id, source in labels:
+        if pd.isna(query) or not str(query).strip():
+            continue
+        if query in by_query and by_query[query][0] != arcadia_id:
+            conflicts.add(query)
+        by_query.setdefault(query, (arcadia_id, source))
+    for query in conflicts:
+        del by_query[query]
+
+    labeled = [(query, arcadia_id, source) for query, (arcadia_id, source) in by_query.items()]
+    positives = sum(1 for _, arcadia_id, _ in labeled if arcadia_id is not None)
+    print(f"  - Labeled queries: {len(labeled)} ({positives} positive, {len(labeled) - positives} negative)")
+    if conflicts:
+        print(f"  - Dropped {len(conflicts)} names with conflicting labels")
+    return labeled
+
+# ----------------------------------------------------------------------
+# Candidate index
+# ----------------------------------------------------------------------
+def build_candidates(arcadia_df, normalizer):
+    """Normalized Arcadia name -> set of IDs, plus length / prefix / first-token blocks"""
+    norm_to_ids = {}
+    for arc_id, name, aka, aliases in zip(arcadia_df['id'], arcadia_df['name'],
+                                          arcadia_df['also_known_as'], arcadia_df['aliases']):
+        names = [name, aka]
+        if pd.notna(aliases):
+            names.extend(alias.strip() for alias in str(aliases).split(','))
+        for original in names:
+            if pd.isna(original):
+                continue
+            norm = normalizer(original)
+            if norm:
+                norm_to_ids.setdefault(norm, set()).add(arc_id)
+
+    by_length, by_prefix, by_token = {}, {}, {}
+    for norm in norm_to_ids:
+        by_length.setdefault(len(norm), []).append(norm)
+        by_prefix.setdefault(norm[:2], []).append(norm)
+        by_token.setdefault(norm.split()[0], []).append(norm)
+    return norm_to_ids, by_length, by_prefix, by_token
+
+def candidate_names(norm, mode, index, min_threshold, length_bound):
+    norm_to_ids, by_length, by_prefix, by_token = index
+    if mode == 'none':
+        return norm_to_ids.keys()
+    if mode == 'length':
+        names = []
+        for length, bucket in by_length.items():
+            if length_bound(len(norm), length) >= min_threshold:
+                names.extend(bucket)
+        return names
+    if mode == 'prefix':
+        return by_prefix.get(norm[:2], [])
+    return by_token.get(norm.split()[0], [])
+
+def score_queries(labeled, scorer, mode, index, min_threshold):
+    """Top candidate IDs per query; returns (results, pairs scored, seconds)"""
+    normalizer, score, _, length_bound, _ = SCORERS[scorer]
+    norm_to_ids = index[0]
+    results = []
+    pairs = 0
+    start = time.perf_counter()
+
+    for query, arcadia_id, source in labeled:
+        norm = normalizer(query)
+        best_by_id = {}
+        if norm:
+            for candidate in candidate_names(norm, mode, index, min_threshold, length_bound):
+                pairs += 1
+                value = score(norm, candidate)
+                if value < min_threshold:
+                    continue
+                for candidate_id in norm_to_ids[candidate]:
+                    if value > best_by_id.get(candidate_id, 0):
+                        best_by_id[candidate_id] = value
+        top = sorted(best_by_id.items(), key=lambda item: item[1], reverse=True)[:TOP_CANDIDATES]
+        results.append((arcadia_id, top))
+
+    return results, pairs, time.perf_counter() - start
+
+def evaluate(results, threshold, policy):
+    tp = fp = fn = tn = 0
+    for label, top in results:
+        above = [candidate_id for candidate_id, value in top if value >= threshold]
+        if policy == 'unique':
+            predicted = above[0] if len(above) == 1 else None
+        else:
+            predicted = above[0] if above else None
+
+        if label is None:
+            if predicted is None:
+                tn += 1
+            else:
+                fp += 1
+        elif predicted == label:
+            tp += 1
+        else:
+            fn += 1
+            if predicted is not None:
+                fp += 1  # matched to the wrong company
+
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {'tp': tp, 'fp': fp, 'fn': fn, 'tn': tn,
+            'precision': round(precision, 4), 'recall': round(recall, 4), 'f1': round(f1, 4)}
+
+# ----------------------------------------------------------------------
+# Main
+# ----------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description='Sweep matcher thresholds and pruning on adjudicated matches')
+    parser.add_argument('--scorers', nargs='+', choices=list(SCORERS), default=list(SCORERS))
+    parser.add_argument('--pruning', nargs='+', choices=PRUNING_MODES, default=PRUNING_MODES)
+    parser.add_argument('--thresholds', type=float, nargs='+', default=DEFAULT_THRESHOLDS)
+    parser.add_argument('--limit', type=int, default=None, help='Evaluate only the first N labeled queries')
+    args = parser.parse_args()
+
+    print("[START] Matcher Threshold Sweep")
+    print("=" * 60)
+
+    labeled = load_labeled_set()
+    if args.limit:
+        labeled = labeled[:args.limit]
+    if not labeled:
+        print("[ERROR] No labeled data available")
+        return
+
+    arcadia_df = pd.read_csv(ARCADIA_FILE)
+    print(f"  - Loaded {len(arcadia_df)} Arcadia companies")
+    thresholds = sorted(args.thresholds)
+
+    rows = []
+    for scorer in args.scorers:
+        normalizer, _, current_threshold, _, policy = SCORERS[scorer]
+        min_threshold = min(thresholds + [current_threshold])
+        index = build_candidates(arcadia_df, normalizer)
+        print(f"\n[SCORER] {scorer} (current threshold {current_threshold:.2f}, "
+              f"{len(index[0]):,} normalized Arcadia names)")
+
+        for mode in args.pruning:
+            results, pairs, seconds = score_queries(labeled, scorer, mode, index, min_threshold)
+            pairs_per_second = pairs / seconds if seconds > 0 else 0
+            print(f"  {mode:<12} {pairs:>12,} pairs  {seconds:>8.2f}s  {pairs_per_second:>12,.0f} pairs/s")
+            for threshold in thresholds:
+                metrics = evaluate(results, threshold, policy)
+                rows.append({
+                    'scorer': scorer,
+                    'pruning': mode,
+                    'threshold': threshold,
+                    'current': abs(threshold - current_threshold) < 1e-9,
+                    **metrics,
+                    'pairs_scored': pairs,
+                    'seconds': round(seconds, 3),
+                    'pairs_per_second': round(pairs_per_second, 1)
+                })
+
+    sweep_df = pd.DataFrame(rows)
+
+    print("\n" + "=" * 60)
+    print("RESULTS")
+    print("=" * 60)
+    with pd.option_context('display.max_rows', None, 'display.width', 160):
+        print(sweep_df[['scorer', 'pruning', 'threshold', 'precision', 'recall', 'f1',
+                        'tp', 'fp', 'fn', 'pairs_scored', 'pairs_per_second']].to_string(index=False))
+
+    # Fastest configuration that is at least as good as each scorer's current setting
+    print("\n[RECOMMEND] Fastest setting matching the current precision and recall:")
+    for scorer, group in sweep_df.groupby('scorer', sort=False):
+        baseline = group[(group['pruning'] == 'none') & group['current']]
+        if baseline.empty:
+            baseline = group[group['current']]
+        if baseline.empty:
+            print(f"  - {scorer}: current threshold not in sweep")
+            continue
+        baseline = baseline.iloc[0]
+        good = group[(group['precision'] >= baseline['precision']) & (group['recall'] >= baseline['recall'])]
+        good = good.assign(distance=(good['threshold'] - baseline['threshold']).abs())
+        best = good.sort_values(['seconds', 'f1', 'distance'], ascending=[True, False, True]).iloc[0]
+        print(f"  - {scorer}: threshold {best['threshold']:.2f}, pruning '{best['pruning']}' "
+              f"(precision {best['precision']:.3f}, recall {best['recall']:.3f}, {best['seconds']:.2f}s "
+              f"vs {baseline['seconds']:.2f}s at current setting)")
+
+    OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    sweep_df.insert(0, 'generated', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    sweep_df.to_csv(OUTPUT_FILE, index=False)
+    print(f"\n[SAVE] Sweep results saved: {OUTPUT_FILE}")
+
+if __name__ == "__main__":
+    main()
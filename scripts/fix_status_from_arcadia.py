@@ -1,5 +1,7 @@
 import pandas as pd
 
+from id_resolver import IdResolver
+
 def fix_status_from_arcadia():
     print("=" * 80)
     print("FIXING STATUS VALUES FROM ARCADIA DATABASE")
@@ -19,17 +21,21 @@ def fix_status_from_arcadia():
     
     updates_made = 0
     
+    # Arcadia status for every company ID, resolved in one batch
+    arcadia = IdResolver(arcadia_df, 'id')
+    has_match = pd.Series(arcadia.found(unmapped_df['id']), index=unmapped_df.index)
+    if 'status' in arcadia_df.columns:
+        arcadia_status = pd.Series(arcadia.lookup(unmapped_df['id'], 'status'), index=unmapped_df.index)
+    else:
+        arcadia_status = pd.Series('ENABLED', index=unmapped_df.index)  # Default to ENABLED if status is missing
+    
     for idx in matched_companies.index:
         company_id = unmapped_df.loc[idx, 'id']
         company_name = unmapped_df.loc[idx, 'name']
         
         if pd.notna(company_id):
-            # Find the company in Arcadia database
-            arc_match = arcadia_df[arcadia_df['id'] == company_id]
-            
-            if not arc_match.empty:
-                arc_row = arc_match.iloc[0]
-                correct_status = arc_row.get('status', 'ENABLED')  # Default to ENABLED if status is missing
+            if has_match[idx]:
+                correct_status = arcadia_status[idx]
                 
                 # Update the status
                 old_status = unmapped_df.loc[idx, 'status']
@@ -55,11 +61,8 @@ def fix_status_from_arcadia():
         if current_status == 'MATCHED':
             continue
             
-        # Find in Arcadia
-        arc_match = arcadia_df[arcadia_df['id'] == company_id]
-        if not arc_match.empty:
-            arc_row = arc_match.iloc[0]
-            correct_status = arc_row.get('status', 'ENABLED')
+        if has_match[idx]:
+            correct_status = arcadia_status[idx]
             
             # Check if status needs updating
             if current_status != correct_status and current_status not in ['ENABLED', 'IS INCOMPLETE', 'IMPORTED']:
@@ -11,6 +11,10 @@ from datetime import datetime
 import re
 from difflib import SequenceMatcher
 import json
+import argparse
+
+from checkpoint_store import CheckpointStore
+from phase_metrics import timed_phase, write_metrics
 
 def normalize_for_matching(text):
     """
@@ -78,6 +82,7 @@ def calculate_fuzzy_score(str1, str2):
     # Use SequenceMatcher for fuzzy matching
     return SequenceMatcher(None, str1, str2).ratio() * 100
 
+@timed_phase('load_data')
 def load_data():
     """Load unmapped companies and Arcadia database"""
     print("[LOAD] Loading data files...")
@@ -91,6 +96,7 @@ def load_data():
     
     return unmapped_df, arcadia_df
 
+@timed_phase('build_normalized_indexes', rows=lambda arcadia_df: len(arcadia_df))
 def build_normalized_indexes(arcadia_df):
     """Build normalized lookup dictionaries for Phase 1"""
     print("\n[BUILD] Creating normalized matching indexes...")
@@ -145,6 +151,7 @@ def build_normalized_indexes(arcadia_df):
     
     return norm_to_ids
 
+@timed_phase('phase1_smart_matching', rows=lambda unmapped_df, *_: len(unmapped_df))
 def phase1_smart_matching(unmapped_df, norm_to_ids):
     """Phase 1: Smart matching using normalization"""
     print("\n[PHASE 1] Smart Matching (normalized)...")
@@ -190,6 +197,7 @@ def phase1_smart_matching(unmapped_df, norm_to_ids):
     
     return matches, multiple_matches
 
+@timed_phase('phase2_fuzzy_matching', rows=lambda unmapped_df, *_: len(unmapped_df))
 def phase2_fuzzy_matching(unmapped_df, arcadia_df, existing_matches):
     """Phase 2: Fuzzy matching for remaining companies"""
     print("\n[PHASE 2] Fuzzy Matching (95% threshold)...")
@@ -287,6 +295,7 @@ def phase2_fuzzy_matching(unmapped_df, arcadia_df, existing_matches):
     
     return fuzzy_matches, fuzzy_multiple
 
+@timed_phase('update_matched_companies', rows=lambda unmapped_df, all_matches: len(all_matches))
 def update_matched_companies(unmapped_df, all_matches):
     """Update matched companies with Arcadia data"""
     print("\n[UPDATE] Updating matched companies...")
@@ -330,6 +339,7 @@ def update_matched_companies(unmapped_df, all_matches):
     
     return unmapped_df
 
+@timed_phase('generate_reports')
 def generate_reports(all_matches, multiple_matches, fuzzy_multiple, unmapped_df):
     """Generate detailed reports"""
     print("\n[REPORT] Generating reports...")
@@ -391,35 +401,65 @@ def generate_reports(all_matches, multiple_matches, fuzzy_multiple, unmapped_df)
     
     return summary
 
-def main():
+def main(resume=False):
     print("[START] Advanced Fuzzy Matching Process")
     print("=" * 60)
     
     # Load data
     unmapped_df, arcadia_df = load_data()
     
+    # Checkpoints are keyed on the input files so a resume never mixes data refreshes
+    checkpoints = CheckpointStore('fuzzy_match_companies', input_files=[
+        'output/arcadia_company_unmapped.csv', 'src/company-names-arcadia.csv'
+    ])
+    if resume:
+        checkpoints.resume()
+    else:
+        checkpoints.clear()
+    
     # Phase 1: Smart normalization matching
-    norm_to_ids = build_normalized_indexes(arcadia_df)
-    phase1_matches, multiple_matches = phase1_smart_matching(unmapped_df, norm_to_ids)
+    if checkpoints.has('phase1'):
+        phase1_matches, multiple_matches = checkpoints.load('phase1')
+    else:
+        norm_to_ids = build_normalized_indexes(arcadia_df)
+        phase1_matches, multiple_matches = phase1_smart_matching(unmapped_df, norm_to_ids)
+        checkpoints.save('phase1', (phase1_matches, multiple_matches))
     
     # Phase 2: Fuzzy matching
-    fuzzy_matches, fuzzy_multiple = phase2_fuzzy_matching(unmapped_df, arcadia_df, phase1_matches)
+    if checkpoints.has('phase2'):
+        fuzzy_matches, fuzzy_multiple = checkpoints.load('phase2')
+    else:
+        fuzzy_matches, fuzzy_multiple = phase2_fuzzy_matching(unmapped_df, arcadia_df, phase1_matches)
+        checkpoints.save('phase2', (fuzzy_matches, fuzzy_multiple))
     
     # Combine all matches
     all_matches = phase1_matches + fuzzy_matches
     print(f"\n[COMBINE] Total matches found: {len(all_matches)}")
     
-    # Update matched companies
-    unmapped_df = update_matched_companies(unmapped_df, all_matches)
+    # Update matched companies (pending write)
+    if checkpoints.has('update'):
+        unmapped_df = checkpoints.load('update')
+    else:
+        unmapped_df = update_matched_companies(unmapped_df, all_matches)
+        checkpoints.save('update', unmapped_df)
     
     # Save updated file
     output_file = 'output/arcadia_company_unmapped.csv'
-    unmapped_df.to_csv(output_file, index=False, encoding='utf-8')
-    print(f"\n[SAVE] Updated file saved: {output_file}")
+    try:
+        unmapped_df.to_csv(output_file, index=False, encoding='utf-8')
+        print(f"\n[SAVE] Updated file saved: {output_file}")
+    except PermissionError:
+        print(f"\n[ERROR] {output_file} is locked (close it in Excel)")
+        print("[INFO] Matching results are checkpointed - rerun with --resume to retry the save")
+        write_metrics('fuzzy_match_companies')
+        return
     
     # Generate reports
     summary = generate_reports(all_matches, multiple_matches, fuzzy_multiple, unmapped_df)
     
+    # Everything is on disk, checkpoints are no longer needed
+    checkpoints.clear()
+    
     # Final summary
     print("\n" + "=" * 60)
     print("[SUCCESS] Fuzzy matching complete!")
@@ -429,6 +469,12 @@ def main():
     print(f"  TO BE CREATED converted: {summary['to_be_created_converted']}")
     print(f"  Companies needing review: {summary['multiple_matches_phase1'] + summary['multiple_matches_phase2']}")
     print(f"  Remaining without ID: {summary['companies_without_id_after']}")
+    
+    write_metrics('fuzzy_match_companies')
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Fuzzy match unmapped companies to Arcadia IDs')
+    parser.add_argument('--resume', action='store_true',
+                        help='Pick up from the last completed phase of an interrupted run')
+    args = parser.parse_args()
+    main(resume=args.resume)
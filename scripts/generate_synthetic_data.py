@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator for scaling tests of the matching pipeline
+Created: 2025-09-08
+Purpose: Produce realistic synthetic versions of the pipeline inputs at a configurable
+scale (1x = current data volumes) so matching, sync and import-prep stages can be
+benchmarked before Arcadia and InvestGame grow.
+
+Output mirrors the repo layout so the scripts can run unchanged from the scale root:
+    <root>/src/company-names-arcadia.csv
+    <root>/src/investgame_database_clean.csv
+    <root>/src/arcadia_database_synthetic.csv
+    <root>/output/arcadia_company_unmapped.csv
+    <root>/output/ig_arc_unmapped_vF.csv
+
+Names carry realistic noise: legal-suffix variants, '&' vs 'and', apostrophes,
+tickers like "(NASDAQ: META)", casing changes and keyboard typos.
+
+Usage:
+    py scripts/generate_synthetic_data.py --scale 10
+    py scripts/generate_synthetic_data.py --scale 1 --output output/synthetic/1x --seed 7
+"""
+
+import argparse
+import random
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+# Current data volumes (1x)
+BASE_ARCADIA_COMPANIES = 7281
+BASE_IG_DEALS = 4189
+BASE_ARCADIA_DEALS = 3349
+BASE_UNMAPPED_DEALS = 883
+BASE_UNMAPPED_COMPANIES = 1534
+
+ARCADIA_COMPANY_COLUMNS = [
+    'id', 'status', 'name', 'also_known_as', 'aliases', 'type', 'founded', 'hq_country',
+    'hq_region', 'ownership', 'sector', 'segment', 'features', 'specialization', 'aum',
+    'parent_company', 'transactions_count', 'was_added', 'created_by', 'was_changed',
+    'modified_by', 'search_index'
+]
+UNMAPPED_COMPANY_COLUMNS = ARCADIA_COMPANY_COLUMNS + ['arc_website', 'IG_ID', 'ig_role']
+
+IG_COLUMNS = [
+    'Date', 'Year', 'Quarter', 'Target name', 'Investors / Buyers', 'Type', 'Category', 'AI',
+    'Size, $m', '% acquired', 'Sector', 'Segment', "Target's Country", 'Region',
+    'Target Founded', 'Gender', "Target's Website", 'Short Deal Description', 'Deal Link',
+    'Amount_Status'
+]
+ARC_COLUMNS = [
+    'arc_id', 'arc_status', 'arc_name', 'arc_also_known_as', 'arc_aliases', 'arc_type',
+    'arc_founded', 'arc_hq_country', 'arc_hq_region', 'arc_ownership', 'arc_sector',
+    'arc_segment', 'arc_features', 'arc_specialization', 'arc_aum', 'arc_parent_company',
+    'arc_transactions_count', 'arc_was_added', 'arc_created_by', 'arc_was_changed',
+    'arc_modified_by', 'arc_search_index', 'arc_website'
+]
+UNMAPPED_DEAL_COLUMNS = IG_COLUMNS + ['IG_ID', 'Mapped_Type', 'Mapped_Category'] + ARC_COLUMNS
+
+ARCADIA_DEAL_COLUMNS = [
+    'ID', 'Status*', 'Announcement date*', 'Target Company', 'Transaction Size*, $M',
+    'Transaction Type*', 'Transaction Category*', 'closed date', 'To be closed',
+    'Lead Investor / Acquirer', 'Other Investors', 'Source URL*', 'Description*',
+    'Transaction UUID', 'Equity Value at Listing, $M', 'Internal information',
+    'signature company', 'signature date', 'signature investor', 'signature deal type',
+    'source data', 'created at'
+]
+
+# (IG type, IG category, Arcadia type, Arcadia category, weight)
+DEAL_TYPES = [
+    ('Seed round', 'Early-stage VC', 'Seed', 'Early-stage Investments', 38),
+    ('Control', 'M&A', 'M&A control (incl. LBO/MBO)', 'M&A', 25),
+    ('Series A', 'Early-stage VC', 'Series A', 'Early-stage Investments', 11),
+    ('Corporate', 'Corporate', 'Undisclosed Late-stage', 'Late-stage Investments', 7),
+    ('Minority', 'M&A', 'M&A minority', 'M&A', 3),
+    ('Series B', 'Late-stage VC', 'Series B', 'Late-stage Investments', 3),
+    ('PIPE, Other', 'Public offering', 'PIPE', 'Public offering', 3),
+    ('IPO', 'Public offering', 'Listing (IPO/SPAC)', 'Public offering', 2),
+    ('Series B+', 'Late-stage VC', 'Series B', 'Late-stage Investments', 2),
+    ('Accelerator/Incubator', 'Early-stage VC', 'Accelerator / Grant', 'Early-stage Investments', 1),
+    ('Fixed Income', 'Public offering', 'Fixed Income', 'Public offering', 1),
+    ('Series A+', 'Early-stage VC', 'Series A', 'Early-stage Investments', 1),
+    ('Growth', 'Late-stage VC', 'Growth / Expansion (not specified)', 'Late-stage Investments', 1),
+    ('Series H', 'Late-stage VC', 'Series E', 'Late-stage Investments', 1),
+]
+MAPPED_TYPES = {
+    'Seed round': ('seed', 'Early-stage Investments'),
+    'Control': ('m&a control (incl. lbo/mbo)', 'M&A'),
+    'Series A': ('series a', 'Early-stage Investments'),
+    'Corporate': ('undisclosed late-stage', 'Late-stage Investments'),
+    'Minority': ('m&a minority', 'M&A'),
+    'Series B': ('series b', 'Late-stage Investments'),
+    'PIPE, Other': ('pipe', 'Public offering'),
+    'IPO': ('listing (ipo/spac)', 'Public offering'),
+    'Series B+': ('series b', 'Late-stage Investments'),
+    'Accelerator/Incubator': ('accelerator / grant', 'Early-stage Investments'),
+    'Fixed Income': ('fixed income', 'Public offering'),
+    'Series A+': ('series a', 'Early-stage Investments'),
+    'Growth': ('growth / expansion (not specified)', 'Late-stage Investments'),
+    'Series H': ('series e', 'Late-stage Investments'),
+}
+
+# (IG country, Arcadia country, IG region, Arcadia region, weight)
+COUNTRIES = [
+    ('United States', 'USA', 'North America', 'North America', 31),
+    ('United Kingdom', 'United Kingdom', 'Western Europe', 'British Isles', 8),
+    ('Canada', 'Canada', 'North America', 'North America', 4),
+    ('India', 'India', 'Asia', 'Southern Asia', 4),
+    ('Turkey', 'Turkey', 'MENA', 'Middle East', 4),
+    ('China', 'China', 'Asia', 'Eastern Asia', 4),
+    ('Singapore', 'Singapore', 'Asia', 'Southeast Asia', 3),
+    ('Sweden', 'Sweden', 'Western Europe', 'Nordic Countries', 3),
+    ('South Korea', 'South Korea', 'Asia', 'Eastern Asia', 3),
+    ('Japan', 'Japan', 'Asia', 'Eastern Asia', 2),
+    ('France', 'France', 'Western Europe', 'Western Europe', 2),
+    ('Germany', 'Germany', 'Western Europe', 'Western Europe', 2),
+    ('Finland', 'Finland', 'Western Europe', 'Nordic Countries', 2),
+    ('Poland', 'Poland', 'Eastern Europe', 'Eastern Europe', 2),
+    ('US', 'USA', 'North America', 'North America', 1),
+    ('GB', 'United Kingdom', 'Western Europe', 'British Isles', 1),
+    ('KR', 'South Korea', 'Asia', 'Eastern Asia', 1),
+    ('Brasil', 'Brazil', 'Latin America', 'South America', 1),
+]
+SECTORS = [('Gaming', 47), ('Platform&Tech', 39), ('Esports', 8), ('Other', 6)]
+SEGMENTS = [
+    ('Blockchain-powered', 21), ('Mobile', 19), ('PC&Console', 15), ('Tech', 12), ('Esports', 8),
+    ('Multiplatform', 8), ('Platform', 6), ('VR/AR', 3), ('Cash-related', 3), ('Outsourcing', 2),
+    ('Other', 1), ('Hardware', 1), ('Marketing', 1)
+]
+
+SYLLABLES = [
+    'ka', 'ro', 'vi', 'tan', 'lu', 'mor', 'zen', 'qui', 'pa', 'nex', 'sol', 'ar', 'ter', 'io',
+    'bel', 'cor', 'dra', 'fen', 'gal', 'hex', 'ix', 'jo', 'kel', 'lym', 'mir', 'nor', 'ost',
+    'pix', 'rune', 'sky', 'tor', 'ul', 'vor', 'wyn', 'xen', 'yu', 'zor', 'bit', 'play', 'go'
+]
+NAME_WORDS = [
+    'Games', 'Studios', 'Interactive', 'Entertainment', 'Labs', 'Digital', 'Media', 'Ventures',
+    'Capital', 'Partners', 'Play', 'Works', 'Pixel', 'Forge', 'Arcade', 'Quest', 'Realm', 'Byte',
+    'Fund', 'Group', 'Holdings', 'Technologies', 'Esports', 'Network', 'Mobile', 'Software'
+]
+LEGAL_SUFFIXES = ['Inc', 'Inc.', 'LLC', 'Ltd', 'Ltd.', 'Limited', 'GmbH', 'AB', 'Oy', 'Corp.', 'S.A.']
+EXCHANGES = ['NASDAQ', 'NYSE', 'TSE', 'SEHK', 'KRX', 'LSE', 'STO', 'WSE']
+INVESTOR_WORDS = ['Ventures', 'Capital', 'Partners', 'Fund', 'VC', 'Investments', 'Holdings']
+NON_ASCII_SNIPPETS = [
+    '’s', '“next-gen”', '—', '€5m', 'café', '£10m', '™',
+    'Ã©', 'â€™'  # mojibake of e-acute and right quote
+]
+KEYBOARD_NEIGHBOURS = {
+    'a': 'sq', 'e': 'wr', 'i': 'uo', 'o': 'ip', 'u': 'yi', 'n': 'bm', 'r': 'et', 's': 'ad', 't': 'ry'
+}
+
+class SyntheticDataGenerator:
+    def __init__(self, scale=1, seed=42):
+        self.scale = scale
+        self.rng = random.Random(seed)
+        self.used_names = set()
+
+    def weighted(self, options):
+        values = [o[:-1] if len(o) > 2 else o[0] for o in options]
+        weights = [o[-1] for o in options]
+        return self.rng.choices(values, weights=weights)[0]
+
+    def count(self, base):
+        return max(1, int(round(base * self.scale)))
+
+    # ------------------------------------------------------------------
+    # Names and noise
+    # ------------------------------------------------------------------
+    def base_name(self, words=NAME_WORDS):
+        """A unique company name such as 'Korvim Games' or 'Nexaro & Pixel Labs'"""
+        while True:
+            stem = ''.join(self.rng.choice(SYLLABLES) for _ in range(self.rng.randint(2, 3)))
+            parts = [stem.capitalize()]
+            roll = self.rng.random()
+            if roll < 0.55:
+                parts.append(self.rng.choice(words))
+            elif roll < 0.65:
+                parts.extend(['&', self.rng.choice(words)])
+            elif roll < 0.72:
+                parts[0] = parts[0] + "'s"
+                parts.append(self.rng.choice(words))
+            if self.rng.random() < 0.15:
+                parts.append(self.rng.choice(LEGAL_SUFFIXES))
+            name = ' '.join(parts)
+            if name.lower() not in self.used_names:
+                self.used_names.add(name.lower())
+                return name
+
+    def typo(self, text):
+        letters = [i for i, c in enumerate(text) if c.isalpha()]
+        if len(letters) < 4:
+            return text
+        pos = self.rng.choice(letters[1:])
+        kind = self.rng.random()
+        if kind < 0.35:
+            return text[:pos] + text[pos + 1:]
+        if kind < 0.65 and pos + 1 < len(text):
+            return text[:pos] + text[pos + 1] + text[pos] + text[pos + 2:]
+        neighbours = KEYBOARD_NEIGHBOURS.get(text[pos].lower(), 'e')
+        return text[:pos] + self.rng.choice(neighbours) + text[pos + 1:]
+
+    def ticker(self, name):
+        symbol = ''.join(c for c in name.upper() if c.isalpha())[:4] or 'XXXX'
+        return f"{name} ({self.rng.choice(EXCHANGES)}: {symbol})"
+
+    def noisy_variant(self, name):
+        """How the same company tends to be spelled in a different source"""
+        roll = self.rng.random()
+        if roll < 0.20:
+            base = name
+            for suffix in LEGAL_SUFFIXES:
+                if base.endswith(' ' + suffix):
+                    base = base[:-len(suffix) - 1]
+                    break
+            return f"{base} {self.rng.choice(LEGAL_SUFFIXES)}"
+        if roll < 0.35:
+            return name.replace(' & ', ' and ') if ' & ' in name else name.replace(' and ', ' & ')
+        if roll < 0.45:
+            return name.replace("'s", 's') if "'s" in name else name.replace('s ', "'s ", 1)
+        if roll < 0.55:
+            return self.ticker(name)
+        if roll < 0.80:
+            return self.typo(name)
+        if roll < 0.90:
+            return name.upper() if self.rng.random() < 0.5 else name.lower()
+        return name
+
+    # ------------------------------------------------------------------
+    # Field helpers
+    # ------------------------------------------------------------------
+    def deal_date(self):
+        start = date(2020, 1, 1)
+        return start + timedelta(days=self.rng.randint(0, 2070))
+
+    def website(self, name):
+        slug = ''.join(c for c in name.lower() if c.isalnum())[:20] or 'company'
+        return f"https://www.{slug}.{self.rng.choice(['com', 'io', 'gg', 'games'])}/"
+
+    def description(self, target, investors, size):
+        text = f"{target} has raised ${size}m in a round led by {investors.split(',')[0]}."
+        if self.rng.random() < 0.12:
+            text += f" The studio {self.rng.choice(NON_ASCII_SNIPPETS)} plans to expand."
+        return text
+
+    # ------------------------------------------------------------------
+    # Tables
+    # ------------------------------------------------------------------
+    def arcadia_companies(self):
+        rows = []
+        for i in range(self.count(BASE_ARCADIA_COMPANIES)):
+            is_investor = self.rng.random() < 0.3
+            name = self.base_name(INVESTOR_WORDS if is_investor else NAME_WORDS)
+            if self.rng.random() < 0.01:
+                name = self.ticker(name)
+            incomplete = self.rng.random() < 0.49
+            country = self.weighted(COUNTRIES)
+            hq_country = 'notenoughinformation' if incomplete else country[1]
+            hq_region = 'notenoughinformation' if incomplete else country[3]
+            aka = ''
+            if self.rng.random() < 0.08:
+                aka = name.split(' ')[0]
+            aliases = self.noisy_variant(name) if self.rng.random() < 0.03 else ''
+            added = self.deal_date().strftime('%Y-%m-%d %H:%M:%S')
+            rows.append({
+                'id': 1000 + i,
+                'status': 'IS INCOMPLETE' if incomplete else self.rng.choice(['IMPORTED', 'ENABLED']),
+                'name': name,
+                'also_known_as': aka,
+                'aliases': aliases,
+                'type': 'TestType' if incomplete else (
+                    'Venture Capital & Accelerators' if is_investor else 'Strategic / CVC'),
+                'founded': 1800 if incomplete else self.rng.randint(1990, 2024),
+                'hq_country': hq_country,
+                'hq_region': hq_region,
+                'ownership': 'Public' if '(' in name else 'Private',
+                'sector': '' if incomplete else self.rng.choice(
+                    ['Gaming (Content Development/Publishing)', 'Platform & Tech', 'Esports', 'Other']),
+                'segment': '',
+                'features': '',
+                'specialization': 'Generalist',
+                'aum': '',
+                'parent_company': '',
+                'transactions_count': self.rng.randint(0, 5),
+                'was_added': added,
+                'created_by': '',
+                'was_changed': added,
+                'modified_by': '',
+                'search_index': ', '.join(p for p in [name, aka, hq_country, hq_region] if p),
+            })
+        return pd.DataFrame(rows, columns=ARCADIA_COMPANY_COLUMNS)
+
+    def investors_text(self, investor_pool):
+        if self.rng.random() < 0.3:
+            return 'Undisclosed'
+        names = [self.noisy_variant(self.rng.choice(investor_pool)) if self.rng.random() < 0.2
+                 else self.rng.choice(investor_pool)
+                 for _ in range(self.rng.choices([1, 2, 3, 4, 6], weights=[50, 25, 12, 8, 5])[0])]
+        separator = self.rng.choice([', ', ', ', ', ', ' & ', '; '])
+        return separator.join(names)
+
+    def ig_deals(self, arcadia_df):
+        arcadia_names = arcadia_df['name'].tolist()
+        investor_pool = arcadia_df.loc[
+            arcadia_df['type'] == 'Venture Capital & Accelerators', 'name'].tolist() or arcadia_names
+        investor_pool += [self.base_name(INVESTOR_WORDS) for _ in range(self.count(400))]
+
+        rows = []
+        for i in range(self.count(BASE_IG_DEALS)):
+            deal_date = self.deal_date()
+            if self.rng.random() < 0.75:
+                target = self.noisy_variant(self.rng.choice(arcadia_names))
+            else:
+                target = self.base_name()
+            ig_type, ig_category, _, _, = self.weighted(DEAL_TYPES)
+            country = self.weighted(COUNTRIES)
+            size = round(self.rng.choice([0, 0, 0.5, 1.2, 3.3, 5, 8, 12, 30.5, 120]) * self.rng.uniform(0.8, 1.2), 2)
+            investors = self.investors_text(investor_pool)
+            rows.append({
+                'Date': deal_date.strftime('%d/%m/%Y'),
+                'Year': deal_date.year,
+                'Quarter': f"Q{(deal_date.month - 1) // 3 + 1}'{deal_date.year % 100:02d}",
+                'Target name': target,
+                'Investors / Buyers': investors,
+                'Type': ig_type,
+                'Category': ig_category,
+                'AI': 'Yes' if self.rng.random() < 0.08 else 'No',
+                'Size, $m': size,
+                '% acquired': '' if self.rng.random() < 0.8 else self.rng.randint(1, 100),
+                'Sector': self.weighted(SECTORS),
+                'Segment': self.weighted(SEGMENTS),
+                "Target's Country": country[0],
+                'Region': country[2],
+                'Target Founded': float(self.rng.randint(1995, deal_date.year)) if self.rng.random() < 0.9 else '',
+                'Gender': self.rng.choice(['Men', 'Men', 'Men', 'Mixed', 'Women', '']),
+                "Target's Website": self.website(target) if self.rng.random() < 0.9 else '',
+                'Short Deal Description': self.description(target, investors, size),
+                'Deal Link': f"https://news.example.com/{i}",
+                'Amount_Status': 'DISCLOSED' if size else 'UNDISCLOSED',
+            })
+        return pd.DataFrame(rows, columns=IG_COLUMNS)
+
+    def arcadia_deals(self, ig_df):
+        """Arcadia-side copies of most IG deals, with the drift seen between the two sources"""
+        type_lookup = {d[0]: (d[2], d[3]) for d in DEAL_TYPES}
+        sample = ig_df.sample(n=min(len(ig_df), self.count(BASE_ARCADIA_DEALS)),
+                              random_state=self.rng.randint(0, 2**31 - 1)).sort_index()
+        rows = []
+        for n, (_, deal) in enumerate(sample.iterrows()):
+            deal_date = pd.to_datetime(deal['Date'], format='%d/%m/%Y') + timedelta(days=self.rng.choice([0, 0, 0, 1, -2, 5]))
+            investors = [] if deal['Investors / Buyers'] == 'Undisclosed' else [
+                p.strip() for p in str(deal['Investors / Buyers']).replace(';', ',').split(',') if p.strip()]
+            lead = investors[0] if investors else 'Undisclosed'
+            target = deal['Target name'] if self.rng.random() < 0.8 else self.noisy_variant(deal['Target name'])
+            arc_type, arc_category = type_lookup[deal['Type']]
+            rows.append({
+                'ID': 100 + n,
+                'Status*': self.rng.choice(['IMPORTED'] * 8 + ['ON APPROVAL', 'DISABLED']),
+                'Announcement date*': deal_date.strftime('%Y-%m-%d'),
+                'Target Company': target,
+                'Transaction Size*, $M': deal['Size, $m'],
+                'Transaction Type*': arc_type,
+                'Transaction Category*': arc_category,
+                'closed date': deal_date.strftime('%Y-%m-%d'),
+                'To be closed': 0,
+                'Lead Investor / Acquirer': lead,
+                'Other Investors': ', '.join(investors[1:]),
+                'Source URL*': deal['Deal Link'],
+                'Description*': f"<p>{deal['Short Deal Description']}</p>",
+                'Transaction UUID': str(uuid.UUID(int=self.rng.getrandbits(128))),
+                'Equity Value at Listing, $M': '',
+                'Internal information': '',
+                'signature company': str(target).lower().replace(' ', ''),
+                'signature date': f"{deal_date.year % 100}{deal_date.strftime('%B').lower()}",
+                'signature investor': 'noleadinvestor' if lead == 'Undisclosed' else lead.lower().replace(' ', ''),
+                'signature deal type': arc_type.lower().replace(' ', ''),
+                'source data': '',
+                'created at': deal_date.strftime('%Y-%m-%d %H:%M:%S'),
+            })
+        return pd.DataFrame(rows, columns=ARCADIA_DEAL_COLUMNS)
+
+    def unmapped_deals(self, ig_df, arcadia_df):
+        sample = ig_df.sample(n=min(len(ig_df), self.count(BASE_UNMAPPED_DEALS)),
+                              random_state=self.rng.randint(0, 2**31 - 1)).sort_index()
+        by_name = {record['name']: record for record in arcadia_df.to_dict('records')}
+        rows = []
+        for ig_id, deal in sample.iterrows():
+            row = deal.to_dict()
+            row['IG_ID'] = ig_id
+            row['Mapped_Type'], row['Mapped_Category'] = MAPPED_TYPES[deal['Type']]
+            for col in ARC_COLUMNS:
+                row[col] = ''
+            record = by_name.get(deal['Target name'])
+            roll = self.rng.random()
+            if record is not None and roll < 0.85:
+                for col in ARCADIA_COMPANY_COLUMNS:
+                    row[f'arc_{col}'] = record[col]
+                row['arc_website'] = deal["Target's Website"]
+            elif roll < 0.95:
+                row['arc_id'] = 'TO BE CREATED'
+                row['arc_name'] = deal['Target name']
+                row['arc_status'] = 'IMPORTED'
+            rows.append(row)
+        return pd.DataFrame(rows, columns=UNMAPPED_DEAL_COLUMNS)
+
+    def unmapped_companies(self, arcadia_df, unmapped_deals_df):
+        """Company cards for every party of the unmapped deals, as produced by the sync scripts"""
+        arcadia_records = arcadia_df.to_dict('records')
+        ig_ids = unmapped_deals_df['IG_ID'].tolist()
+        target_count = self.count(BASE_UNMAPPED_COMPANIES)
+
+        rows = []
+        while len(rows) < target_count:
+            roll = self.rng.random()
+            if roll < 0.65:
+                record = dict(self.rng.choice(arcadia_records))
+                if self.rng.random() < 0.03:
+                    record['name'] = self.noisy_variant(record['name'])  # duplicate card, same id
+            elif roll < 0.83:
+                record = {col: '' for col in ARCADIA_COMPANY_COLUMNS}
+                record.update(id=None, status='TO BE CREATED',
+                              name=self.noisy_variant(self.rng.choice(arcadia_records)['name']),
+                              type='Strategic / CVC', founded=1800,
+                              hq_country='notenoughinformation', hq_region='notenoughinformation')
+            else:
+                record = {col: '' for col in ARCADIA_COMPANY_COLUMNS}
+                record.update(id=None, status='TO BE CREATED', name=self.base_name(),
+                              type='TestType', founded=1800,
+                              hq_country='notenoughinformation', hq_region='notenoughinformation')
+
+            deal_count = self.rng.choices([1, 2, 3, 5], weights=[70, 18, 8, 4])[0]
+            deals = [str(self.rng.choice(ig_ids)) for _ in range(deal_count)]
+            roles = [self.rng.choice(['target', 'lead', 'participant', 'participant']) for _ in deals]
+            if self.rng.random() < 0.01:
+                roles = roles[:-1] or ['lead', 'target']  # count mismatch for the validators
+            record['arc_website'] = self.website(record['name']) if self.rng.random() < 0.5 else ''
+            record['IG_ID'] = ', '.join(deals)
+            record['ig_role'] = ', '.join(roles)
+            rows.append(record)
+        return pd.DataFrame(rows, columns=UNMAPPED_COMPANY_COLUMNS)
+
+    def generate(self, root):
+        root = Path(root)
+        (root / 'src').mkdir(parents=True, exist_ok=True)
+        (root / 'output').mkdir(parents=True, exist_ok=True)
+
+        print(f"[GENERATE] Synthetic dataset at {self.scale}x -> {root}")
+        arcadia_df = self.arcadia_companies()
+        print(f"  - Arcadia companies: {len(arcadia_df):,}")
+        ig_df = self.ig_deals(arcadia_df)
+        print(f"  - InvestGame deals: {len(ig_df):,}")
+        arcadia_deals_df = self.arcadia_deals(ig_df)
+        print(f"  - Arcadia deals: {len(arcadia_deals_df):,}")
+        unmapped_deals_df = self.unmapped_deals(ig_df, arcadia_df)
+        print(f"  - Unmapped deals: {len(unmapped_deals_df):,}")
+        unmapped_companies_df = self.unmapped_companies(arcadia_df, unmapped_deals_df)
+        print(f"  - Unmapped companies: {len(unmapped_companies_df):,}")
+
+        arcadia_df.to_csv(root / 'src' / 'company-names-arcadia.csv', index=False, encoding='utf-8')
+        ig_df.to_csv(root / 'src' / 'investgame_database_clean.csv', index=False, encoding='utf-8')
+        arcadia_deals_df.to_csv(root / 'src' / 'arcadia_database_synthetic.csv', index=False, encoding='utf-8')
+        unmapped_deals_df.to_csv(root / 'output' / 'ig_arc_unmapped_vF.csv', index=False, encoding='utf-8')
+        unmapped_companies_df.to_csv(root / 'output' / 'arcadia_company_unmapped.csv', index=False, encoding='utf-8')
+        print(f"  [OK] Files written under {root}")
+        return root
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic pipeline inputs at a given scale')
+    parser.add_argument('--scale', type=float, default=1, help='Multiple of current data volumes (default 1)')
+    parser.add_argument('--output', default=None, help='Output root (default output/synthetic/<scale>x)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    root = args.output or f"output/synthetic/{args.scale:g}x"
+    SyntheticDataGenerator(scale=args.scale, seed=args.seed).generate(root)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Hashed id -> row lookups shared by the update / verification scripts
+Replaces per-id scans like arcadia_df[arcadia_df['id'] == company_id].iloc[0]:
+the index is built once and a whole batch of ids is resolved in one take.
+
+Semantics match the boolean-mask version: the first row with a given key wins,
+rows with a blank key are never returned, and 3575 finds 3575.0.
+
+Usage:
+    arcadia = IdResolver(arcadia_df, 'id')
+    rows = arcadia.take(ids)                     # found rows only, in query order
+    names = arcadia.lookup(ids, 'name', '')      # one value per id, default when missing
+    row = arcadia.get(3575)                      # single row or None
+"""
+
+import numpy as np
+import pandas as pd
+
+class IdResolver:
+    def __init__(self, df, key='id'):
+        self.key = key
+        keys = df[key]
+        self.frame = df[keys.notna() & ~keys.duplicated()]
+        self.index = pd.Index(self.frame[key])
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, id_value):
+        return self.get(id_value) is not None
+
+    def positions(self, ids):
+        """Row position in self.frame for each id, -1 when not found"""
+        if np.isscalar(ids):
+            ids = [ids]
+        return self.index.get_indexer(ids)
+
+    def found(self, ids):
+        return self.positions(ids) >= 0
+
+    def take(self, ids):
+        """Rows for the ids that exist, in query order, keeping the original index labels"""
+        positions = self.positions(ids)
+        return self.frame.iloc[positions[positions >= 0]]
+
+    def lookup(self, ids, column, default=np.nan):
+        """Values of one column aligned with ids; default where the id is missing"""
+        positions = self.positions(ids)
+        values = np.full(len(positions), default, dtype=object)
+        hits = positions >= 0
+        values[hits] = self.frame[column].to_numpy()[positions[hits]]
+        return values
+
+    def get(self, id_value):
+        """Single row as a Series (name = original index label), or None"""
+        if pd.isna(id_value):
+            return None
+        position = self.positions(id_value)[0]
+        return self.frame.iloc[position] if position >= 0 else None
@@ -1,5 +1,7 @@
 import pandas as pd
 
+from entity_tokenizer import KNOWN_AMPERSAND_NAMES
+
 # Load the files
 companies_df = pd.read_csv('output/arcadia_company_unmapped.csv')
 transactions_df = pd.read_csv('output/ig_arc_unmapped_vF.csv')
@@ -63,14 +65,7 @@ print("\n" + "=" * 60)
 print("PARSING ARTIFACTS ANALYSIS")
 print("=" * 60)
 
-artifacts = [
-    "Aream & Co.",
-    "BANANACULTURE GAMING & MEDIA",
-    "Draper & Associates",
-    "Engine Gaming & Media",
-    "German Federal Ministry for Economic Affairs & Energy",
-    "Whitwell & Co"
-]
+artifacts = KNOWN_AMPERSAND_NAMES
 
 print("\nThe following companies have '&' in their names:")
 for name in artifacts:
@@ -78,5 +73,6 @@ for name in artifacts:
 
 print("\nNote: The '&' character is legitimate in company names.")
 print("These are NOT parsing errors - they are valid company names.")
+print("prepare_all_transactions_import.py keeps them whole (entity_tokenizer.py).")
 print("The verification script flagged them as potential issues,")
 print("but manual review confirms they are correct.")
\ No newline at end of file
@@ -5,7 +5,8 @@ List all unmapped Arcadia transactions with details
 
 import pandas as pd
 from pathlib import Path
-from datetime import datetime
+
+from date_parsing import parse_date_column
 
 # Load data
 base_path = Path(__file__).parent.parent
@@ -24,6 +25,15 @@ mapped_ids_set = set([int(float(x)) for x in mapped_ids])
 df_arcadia['ID_int'] = df_arcadia['ID'].astype(int)
 unmapped = df_arcadia[~df_arcadia['ID_int'].isin(mapped_ids_set)].copy()
 
+# Pre-2020 flags from the parsed date columns (DD/MM/YYYY or YYYY-MM-DD)
+def pre_2020_flags(column):
+    if column not in unmapped.columns:
+        return pd.Series(False, index=unmapped.index)
+    return parse_date_column(unmapped[column], label=column).dates.dt.year < 2020
+
+announcement_pre_2020 = pre_2020_flags('Announcement date*')
+closed_pre_2020 = pre_2020_flags('closed date')
+
 print(f"\nTotal unmapped Arcadia transactions: {len(unmapped)}\n")
 print("=" * 100)
 print("ID    | Status     | Announcement Date | Closed Date  | Target Company")
@@ -32,7 +42,7 @@ print("=" * 100)
 # Sort by ID for cleaner display
 unmapped = unmapped.sort_values('ID')
 
-for _, row in unmapped.iterrows():
+for idx, row in unmapped.iterrows():
     id_val = row['ID']
     status = row.get('Status*', 'N/A')
     announcement = row.get('Announcement date*', 'N/A')
@@ -43,17 +53,8 @@ for _, row in unmapped.iterrows():
     category = ""
     if status == 'DISABLED':
         category = " [DISABLED]"
-    elif announcement != 'N/A' and announcement:
-        try:
-            # Try to parse date
-            if '/' in str(announcement):
-                date_obj = datetime.strptime(str(announcement), '%d/%m/%Y')
-            else:
-                date_obj = datetime.strptime(str(announcement), '%Y-%m-%d')
-            if date_obj.year < 2020:
-                category = " [PRE-2020]"
-        except:
-            pass
+    elif announcement_pre_2020[idx]:
+        category = " [PRE-2020]"
     
     print(f"{id_val:<6}| {status:<10} | {announcement:<17} | {closed:<13} | {company}{category}")
 
@@ -63,26 +64,11 @@ print("=" * 100)
 pre_2020_count = 0
 disabled_count = 0
 
-for _, row in unmapped.iterrows():
+for idx, row in unmapped.iterrows():
     if row.get('Status*', '') == 'DISABLED':
         disabled_count += 1
     else:
-        announcement = row.get('Announcement date*', '')
-        closed = row.get('closed date', '')
-        
-        is_pre_2020 = False
-        for date_str in [announcement, closed]:
-            if date_str and date_str != 'N/A':
-                try:
-                    if '/' in str(date_str):
-                        date_obj = datetime.strptime(str(date_str), '%d/%m/%Y')
-                    else:
-                        date_obj = datetime.strptime(str(date_str), '%Y-%m-%d')
-                    if date_obj.year < 2020:
-                        is_pre_2020 = True
-                        break
-                except:
-                    pass
+        is_pre_2020 = announcement_pre_2020[idx] or closed_pre_2020[idx]
         
         if is_pre_2020:
             pre_2020_count += 1
@@ -10,6 +10,11 @@ import numpy as np
 from datetime import datetime
 from pathlib import Path
 
+from date_parsing import parse_date_column
+from mapping_engine import load_mapping
+from phase_metrics import timed_phase, write_metrics
+
+@timed_phase('analyze_corporate_transactions')
 def analyze_corporate_transactions():
     """Analyze and map Corporate transactions according to Arcadia rules"""
     
@@ -79,7 +84,7 @@ def analyze_corporate_transactions():
         corp_no_size_copy = corp_no_size.copy()
         
         # Extract year from Date column
-        corp_no_size_copy['Transaction_Year'] = pd.to_datetime(corp_no_size_copy['Date'], format='%d/%m/%Y').dt.year
+        corp_no_size_copy['Transaction_Year'] = parse_date_column(corp_no_size_copy['Date'], label='Date').dates.dt.year
         
         # Calculate company age
         corp_no_size_copy['Company_Age'] = corp_no_size_copy.apply(
@@ -112,6 +117,7 @@ def analyze_corporate_transactions():
     
     return df, both_corporate
 
+@timed_phase('apply_corporate_mapping', rows=lambda df: len(df))
 def apply_corporate_mapping(df):
     """Apply the Corporate mapping rules to create new columns"""
     
@@ -122,125 +128,72 @@ def apply_corporate_mapping(df):
     df['Mapped_Type'] = df['Type'].copy()
     df['Mapped_Category'] = df['Category'].copy()
     
-    # Convert Date to datetime for year extraction
-    df['Transaction_Year'] = pd.to_datetime(df['Date'], format='%d/%m/%Y').dt.year
+    # Transaction year and numeric inputs for the age / size rules
+    trans_year = parse_date_column(df['Date'], label='Date').dates.dt.year
+    size = pd.to_numeric(df['Size, $m'], errors='coerce')
+    founded = pd.to_numeric(df['Target Founded'], errors='coerce')
     
     # Process Corporate transactions
     corporate_mask = (df['Type'] == 'Corporate') | (df['Category'] == 'Corporate')
-    corporate_count = 0
-    
-    for idx in df[corporate_mask].index:
-        row = df.loc[idx]
-        size = row['Size, $m']
-        founded = row['Target Founded']
-        trans_year = row['Transaction_Year']
-        
-        # Determine new type based on rules
-        if pd.notna(size) and size > 0:
-            if size <= 5.0:
-                new_type = 'seed'
-                new_category = 'Early-stage Investments'
-            elif size <= 10.0:
-                new_type = 'series a'
-                new_category = 'Early-stage Investments'
-            else:
-                new_type = 'undisclosed late-stage'
-                new_category = 'Late-stage Investments'
-        else:
-            # No size, check age
-            if pd.notna(founded) and founded > 0:
-                company_age = trans_year - founded
-                if company_age <= 3:
-                    new_type = 'undisclosed early-stage'
-                    new_category = 'Early-stage Investments'
-                else:
-                    new_type = 'undisclosed late-stage'
-                    new_category = 'Late-stage Investments'
-            else:
-                # No size, no age - default
-                new_type = 'undisclosed late-stage'
-                new_category = 'Late-stage Investments'
-        
-        # Update the mapped columns
-        df.at[idx, 'Mapped_Type'] = new_type
-        df.at[idx, 'Mapped_Category'] = new_category
-        corporate_count += 1
+    corporate_count = int(corporate_mask.sum())
+    
+    # Rules in priority order (NaN never satisfies a comparison):
+    # size <= 5 -> seed, size <= 10 -> series a, larger -> late-stage,
+    # no size: company age <= 3 -> early-stage, otherwise late-stage
+    has_size = size > 0
+    young = ~has_size & (founded > 0) & ((trans_year - founded) <= 3)
+    conditions = [
+        has_size & (size <= 5.0),
+        has_size & (size <= 10.0),
+        has_size,
+        young
+    ]
+    new_type = np.select(conditions, [
+        'seed', 'series a', 'undisclosed late-stage', 'undisclosed early-stage'
+    ], default='undisclosed late-stage')
+    new_category = np.select(conditions, [
+        'Early-stage Investments', 'Early-stage Investments', 'Late-stage Investments', 'Early-stage Investments'
+    ], default='Late-stage Investments')
+    
+    # Update the mapped columns
+    df.loc[corporate_mask, 'Mapped_Type'] = new_type[corporate_mask.to_numpy()]
+    df.loc[corporate_mask, 'Mapped_Category'] = new_category[corporate_mask.to_numpy()]
     
     print(f"   Mapped {corporate_count} Corporate transactions")
     
-    # Drop the temporary Transaction_Year column
-    df = df.drop('Transaction_Year', axis=1)
-    
     return df
 
+@timed_phase('map_other_types', rows=lambda df: len(df))
 def map_other_types(df):
-    """Map non-Corporate types according to documentation"""
+    """Map non-Corporate types according to documentation (scripts/mappings/transaction_type_v*.csv)"""
     
     print("\n8. MAPPING OTHER TRANSACTION TYPES")
     print("-" * 50)
     
-    # Type mapping dictionary from documentation
-    type_mapping = {
-        # Early-Stage Types
-        'Seed round': ('seed', 'Early-stage Investments'),
-        'Grant': ('accelerator / grant', 'Early-stage Investments'),
-        'Accelerator/Incubator': ('accelerator / grant', 'Early-stage Investments'),
-        'Series A': ('series a', 'Early-stage Investments'),
-        'Series A+': ('series a', 'Early-stage Investments'),
-        
-        # Late-Stage Types
-        'Series B': ('series b', 'Late-stage Investments'),
-        'Series B+': ('series b', 'Late-stage Investments'),
-        'Series C': ('series c', 'Late-stage Investments'),
-        'Series D': ('series d', 'Late-stage Investments'),
-        'Series D+': ('series d', 'Late-stage Investments'),
-        'Series E': ('series e', 'Late-stage Investments'),
-        'Series G': ('series e', 'Late-stage Investments'),
-        'Series H': ('series e', 'Late-stage Investments'),
-        'Growth': ('growth / expansion (not specified)', 'Late-stage Investments'),
-        'Fixed Income': ('fixed income', 'Public offering'),
-        'Fixed income': ('fixed income', 'Public offering'),
-        
-        # M&A Types
-        'Control': ('m&a control (incl. lbo/mbo)', 'M&A'),
-        'Control ': ('m&a control (incl. lbo/mbo)', 'M&A'),  # With trailing space
-        'Minority': ('m&a minority', 'M&A'),
-        
-        # Public Offering Types
-        'IPO': ('listing (ipo/spac)', 'Public offering'),
-        'SPAC': ('listing (ipo/spac)', 'Public offering'),
-        'Direct Listing': ('listing (ipo/spac)', 'Public offering'),
-        'PIPE': ('pipe', 'Public offering'),
-        'PIPE, Other': ('pipe', 'Public offering'),
-        'PIPE, other': ('pipe', 'Public offering'),
-        
-        # Generic/Undefined
-        'Undisclosed': ('undisclosed early-stage', 'Early-stage Investments'),
-        'Late-stage': ('undisclosed late-stage', 'Late-stage Investments'),
-    }
+    type_mapping = load_mapping('transaction_type')
+    print(f"   Mapping table: transaction_type v{type_mapping.version} ({len(type_mapping)} types)")
     
     non_corporate_mask = ~((df['Type'] == 'Corporate') | (df['Category'] == 'Corporate'))
-    mapped_count = 0
+    mapped = type_mapping.apply(df['Type'])
+    matched_mask = non_corporate_mask & mapped['mapped_type'].notna()
     
-    for idx in df[non_corporate_mask].index:
-        original_type = df.at[idx, 'Type']
-        original_category = df.at[idx, 'Category']
-        
-        # Check if type exists in mapping
-        if original_type in type_mapping:
-            new_type, new_category = type_mapping[original_type]
-            df.at[idx, 'Mapped_Type'] = new_type
-            
-            # M&A category override rule
-            if original_category != 'M&A':
-                df.at[idx, 'Mapped_Category'] = new_category
-            # If original category is M&A, keep it
-            
-            mapped_count += 1
-    
-    print(f"   Mapped {mapped_count} non-Corporate transactions")
+    df.loc[matched_mask, 'Mapped_Type'] = mapped.loc[matched_mask, 'mapped_type']
     
-    return df
+    # M&A category override rule: if original category is M&A, keep it
+    category_mask = matched_mask & (df['Category'] != 'M&A')
+    df.loc[category_mask, 'Mapped_Category'] = mapped.loc[category_mask, 'mapped_category']
+    
+    print(f"   Mapped {int(matched_mask.sum())} non-Corporate transactions")
+    
+    # Types with no entry in the table keep their original values
+    unmatched_mask = non_corporate_mask & ~matched_mask
+    unmatched_rows = df.loc[unmatched_mask, ['IG_ID', 'Target name', 'Type', 'Category']]
+    if len(unmatched_rows):
+        print(f"   [WARNING] {len(unmatched_rows)} transactions with unmapped types:")
+        for _, item in type_mapping.unmatched(unmatched_rows['Type']).iterrows():
+            print(f"   - '{item['ig_type']}': {item['count']}")
+    
+    return df, unmatched_rows
 
 def generate_summary(df):
     """Generate summary statistics"""
@@ -282,7 +235,7 @@ def main():
     df = apply_corporate_mapping(df)
     
     # Map other types
-    df = map_other_types(df)
+    df, unmatched_rows = map_other_types(df)
     
     # Generate summary
     generate_summary(df)
@@ -295,6 +248,12 @@ def main():
     df.to_csv(output_file, index=False, encoding='utf-8')
     print("   File saved successfully!")
     
+    # Report transactions whose type is missing from the mapping table
+    if len(unmatched_rows):
+        unmatched_file = Path('../output/unmatched_transaction_types.csv')
+        unmatched_rows.to_csv(unmatched_file, index=False, encoding='utf-8')
+        print(f"   Unmatched types report saved: {unmatched_file}")
+    
     # Create audit report
     audit_file = Path('../output/corporate_mapping_audit.txt')
     with open(audit_file, 'w', encoding='utf-8') as f:
@@ -318,6 +277,8 @@ def main():
     print("\n" + "=" * 70)
     print("MAPPING COMPLETE!")
     print("=" * 70)
+    
+    write_metrics('map_corporate_unmapped', directory='../output/metrics')
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
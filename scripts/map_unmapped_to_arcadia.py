@@ -12,99 +12,21 @@ from datetime import datetime
 import re
 import json
 
+from mapping_engine import load_mapping, map_distinct
+from phase_metrics import timed_phase, write_metrics
+
 # Configuration constants
 TICKER_EXTRACTION_PATTERN = r'\(([A-Za-z]{2,}:\s*[A-Z0-9\s\.]+)\)'
 DEFAULT_WEBSITE = "http://notenoughinformation.com"
 DEFAULT_COUNTRY = "notenoughinformation"
 DEFAULT_FOUNDED = "1800"
 
-# Country code mapping (ISO 3166-1 alpha-2)
-COUNTRY_MAPPING = {
-    # US variations
-    'United States': 'US',
-    'United States of America': 'US',
-    'USA': 'US',
-    'U.S.A.': 'US',
-    'U.S.': 'US',
-    'US': 'US',
-    
-    # Common countries
-    'United Kingdom': 'GB',
-    'UK': 'GB',
-    'Great Britain': 'GB',
-    'Canada': 'CA',
-    'Germany': 'DE',
-    'France': 'FR',
-    'China': 'CN',
-    'Japan': 'JP',
-    'South Korea': 'KR',
-    'Korea': 'KR',
-    'Singapore': 'SG',
-    'Australia': 'AU',
-    'Netherlands': 'NL',
-    'Sweden': 'SE',
-    'Finland': 'FI',
-    'Denmark': 'DK',
-    'Norway': 'NO',
-    'Spain': 'ES',
-    'Italy': 'IT',
-    'Poland': 'PL',
-    'Russia': 'RU',
-    'Brazil': 'BR',
-    'India': 'IN',
-    'Israel': 'IL',
-    'Turkey': 'TR',
-    'UAE': 'AE',
-    'Switzerland': 'CH',
-    'Austria': 'AT',
-    'Belgium': 'BE',
-    'Ireland': 'IE',
-    'Portugal': 'PT',
-    'Czech Republic': 'CZ',
-    'Romania': 'RO',
-    'Hungary': 'HU',
-    'Greece': 'GR',
-    'New Zealand': 'NZ',
-    'Mexico': 'MX',
-    'Argentina': 'AR',
-    'Chile': 'CL',
-    'Colombia': 'CO',
-    'Philippines': 'PH',
-    'Thailand': 'TH',
-    'Malaysia': 'MY',
-    'Indonesia': 'ID',
-    'Vietnam': 'VN',
-    'Taiwan': 'TW',
-    'Hong Kong': 'HK',
-    'Ukraine': 'UA',
-}
-
-# Sector mapping rules
-SECTOR_MAPPING = {
-    'Esports': 'Esports',
-    'Gaming': 'Gaming (Content & Development Publishing)',
-    'Platform & Tech': 'Platform & Tech',
-    'Other': 'Other'
-}
-
-# Segment mapping rules
-SEGMENT_MAPPING = {
-    'Esports': 'Esports',
-    'Cash-related': 'Other',
-    'Hardware': 'Other',
-    'Marketing': 'Other',
-    'Other': 'Other',
-    'Blockchain-Powered': 'Platform & Tech',
-    'Platform': 'Platform & Tech',
-    'Tech': 'Platform & Tech',
-    'VR/AR': 'VR/AR',
-    'Mobile': 'Mobile',
-    'Multiplatform': 'Multiplatform/Web',
-    'PC&Console': 'PC/Console',
-    'PC & Console': 'PC/Console',
-    'Outsourcing': 'Outsourcing/WFH'
-}
+# Country code (ISO 3166-1 alpha-2), sector and segment mappings - see scripts/mappings/
+COUNTRY_MAPPING = load_mapping('country').as_dict('iso_code')
+SECTOR_MAPPING = load_mapping('sector').as_dict('arcadia_sector')
+SEGMENT_MAPPING = load_mapping('segment').as_dict('arcadia_segment')
 
+@timed_phase('analyze_unmapped_records')
 def analyze_unmapped_records():
     """Analyze records without arc_id"""
     print("=" * 70)
@@ -177,6 +99,22 @@ def detect_ticker(company_name):
     ticker_match = re.search(TICKER_EXTRACTION_PATTERN, company_str)
     return ticker_match is not None
 
+def detect_tickers(company_names):
+    """Vectorized detect_ticker for a whole column"""
+    return company_names.astype(str).str.extract(TICKER_EXTRACTION_PATTERN)[0].notna() & company_names.notna()
+
+def map_founded(founded):
+    """Founded year (YYYY) from a year or full date"""
+    if pd.notna(founded) and str(founded).strip() != '':
+        # Extract year if it's a full date
+        founded_str = str(founded).strip()
+        if len(founded_str) >= 4:
+            return founded_str[:4]
+    return DEFAULT_FOUNDED
+
+def is_blank(value):
+    return pd.isna(value) or str(value).strip() == ''
+
 def validate_url(url):
     """Validate and fix common URL issues"""
     if pd.isna(url) or str(url).strip() == '':
@@ -249,6 +187,7 @@ def map_segment_and_features(segment_str, ai_value, sector_str):
     
     return segment, features_str
 
+@timed_phase('handle_duplicate_targets', rows=lambda unmapped_records: len(unmapped_records))
 def handle_duplicate_targets(unmapped_records):
     """Analyze duplicate targets and create enriched mapping"""
     print("\n" + "=" * 70)
@@ -300,96 +239,93 @@ def handle_duplicate_targets(unmapped_records):
     
     return enriched_data, conflicts
 
+@timed_phase('map_unmapped_companies', rows=lambda df, unmapped_records, enriched_data: len(unmapped_records))
 def map_unmapped_companies(df, unmapped_records, enriched_data):
     """Map unmapped companies to arc_ columns"""
     print("\n" + "=" * 70)
     print("PHASE 3: MAPPING TO ARCADIA FORMAT")
     print("=" * 70)
     
-    unmapped_segments = []
-    processed_count = 0
-    
-    # Process each unmapped record
-    for idx in unmapped_records.index:
-        row = df.loc[idx]
-        target_name = row['Target name']
-        
-        # Get enriched data if available
-        if target_name in enriched_data:
-            enriched = enriched_data[target_name]
-            # Override with enriched data
-            for col, value in enriched.items():
-                if pd.isna(row[col]):
-                    row[col] = value
-        
-        # Set arc_id
-        df.at[idx, 'arc_id'] = 'TO BE CREATED'
-        
-        # Map arc_name
-        df.at[idx, 'arc_name'] = target_name if pd.notna(target_name) else 'Undisclosed'
-        
-        # Set constants
-        df.at[idx, 'arc_status'] = 'IMPORTED'
-        df.at[idx, 'arc_type'] = 'Strategic / CVC'
-        df.at[idx, 'arc_specialization'] = 'Generalist'
-        
-        # Map founded year
-        founded = row.get('Target Founded', '')
-        if pd.notna(founded) and str(founded).strip() != '':
-            # Extract year if it's a full date
-            founded_str = str(founded).strip()
-            if len(founded_str) >= 4:
-                df.at[idx, 'arc_founded'] = founded_str[:4]
-            else:
-                df.at[idx, 'arc_founded'] = DEFAULT_FOUNDED
-        else:
-            df.at[idx, 'arc_founded'] = DEFAULT_FOUNDED
-        
-        # Map country
-        country = row.get("Target's Country", '')
-        df.at[idx, 'arc_hq_country'] = map_country(country)
-        
-        # arc_hq_region - leave empty as it's auto-derived
-        df.at[idx, 'arc_hq_region'] = ''
-        
-        # Map ownership based on ticker
-        has_ticker = detect_ticker(target_name)
-        df.at[idx, 'arc_ownership'] = 'Public' if has_ticker else 'Private'
-        
-        # Map website
-        website = row.get("Target's Website", '')
-        df.at[idx, 'arc_website'] = validate_url(website)
-        
-        # Map sector
-        sector = row.get('Sector', '')
-        df.at[idx, 'arc_sector'] = map_sector(sector)
-        
-        # Map segment and features
-        segment = row.get('Segment', '')
-        ai = row.get('AI', '')
-        mapped_segment, features = map_segment_and_features(segment, ai, sector)
-        
-        # Check for unmapped segments
-        if mapped_segment not in SEGMENT_MAPPING.values() and mapped_segment != '':
-            if pd.notna(segment) and str(segment).strip() != '':
-                unmapped_segments.append({
-                    'row': idx,
-                    'target': target_name,
-                    'original_segment': segment,
-                    'mapped_to': mapped_segment
-                })
-        
-        df.at[idx, 'arc_segment'] = mapped_segment if mapped_segment else ''
-        df.at[idx, 'arc_features'] = features
-        
-        # Leave other arc_ fields empty
-        empty_fields = ['arc_also_known_as', 'arc_aliases', 'arc_aum', 
-                       'arc_parent_company', 'arc_search_index']
-        for field in empty_fields:
-            if field in df.columns:
-                df.at[idx, field] = ''
-        
-        processed_count += 1
+    idx = unmapped_records.index
+    rows = df.loc[idx].copy()
+    target_names = rows['Target name']
+    
+    # Fill gaps from the most complete record of duplicate targets
+    if enriched_data:
+        enriched = pd.DataFrame.from_dict(enriched_data, orient='index')
+        for col in enriched.columns:
+            rows[col] = rows[col].where(rows[col].notna(), target_names.map(enriched[col]))
+    
+    def source(col):
+        return rows[col] if col in rows.columns else pd.Series('', index=idx, name=col)
+    
+    # Set arc_id and constants
+    df.loc[idx, 'arc_id'] = 'TO BE CREATED'
+    df.loc[idx, 'arc_name'] = target_names.where(target_names.notna(), 'Undisclosed')
+    df.loc[idx, 'arc_status'] = 'IMPORTED'
+    df.loc[idx, 'arc_type'] = 'Strategic / CVC'
+    df.loc[idx, 'arc_specialization'] = 'Generalist'
+    
+    # Rule-based mappers run once per distinct value
+    df.loc[idx, 'arc_founded'] = map_distinct(map_founded, source('Target Founded')).values
+    
+    countries = map_distinct(map_country, source("Target's Country"),
+                             unmapped=lambda iso, country: iso == DEFAULT_COUNTRY and not is_blank(country))
+    df.loc[idx, 'arc_hq_country'] = countries.values
+    
+    # arc_hq_region - leave empty as it's auto-derived
+    df.loc[idx, 'arc_hq_region'] = ''
+    
+    # Map ownership based on ticker
+    df.loc[idx, 'arc_ownership'] = np.where(detect_tickers(target_names), 'Public', 'Private')
+    
+    websites = map_distinct(validate_url, source("Target's Website"),
+                            unmapped=lambda url, website: url == DEFAULT_WEBSITE and not is_blank(website))
+    df.loc[idx, 'arc_website'] = websites.values
+    
+    sectors = map_distinct(map_sector, source('Sector'),
+                           unmapped=lambda mapped, sector: not is_blank(sector) and str(sector).strip() not in SECTOR_MAPPING)
+    df.loc[idx, 'arc_sector'] = sectors.values
+    
+    # Map segment and features (sector does not affect either)
+    mapped_values = set(SEGMENT_MAPPING.values())
+    segments = map_distinct(lambda segment, ai: map_segment_and_features(segment, ai, None),
+                            source('Segment'), source('AI'),
+                            unmapped=lambda result, segment, ai: (result[0] not in mapped_values and result[0] != ''
+                                                                  and not is_blank(segment)))
+    mapped_segment = pd.Series([result[0] for result in segments.values], index=idx)
+    df.loc[idx, 'arc_segment'] = mapped_segment.where(mapped_segment.astype(bool), '')
+    df.loc[idx, 'arc_features'] = [result[1] for result in segments.values]
+    
+    # Check for unmapped segments
+    original_segment = source('Segment')
+    segment_blank = original_segment.isna() | (original_segment.astype(str).str.strip() == '')
+    is_unmapped = ~mapped_segment.isin(mapped_values) & (mapped_segment != '') & ~segment_blank
+    unmapped_segments = [
+        {'row': row, 'target': target, 'original_segment': segment, 'mapped_to': mapped}
+        for row, target, segment, mapped in zip(idx[is_unmapped], target_names[is_unmapped],
+                                                original_segment[is_unmapped], mapped_segment[is_unmapped])
+    ]
+    
+    # Leave other arc_ fields empty
+    empty_fields = ['arc_also_known_as', 'arc_aliases', 'arc_aum', 
+                   'arc_parent_company', 'arc_search_index']
+    for field in empty_fields:
+        if field in df.columns:
+            df.loc[idx, field] = ''
+    
+    processed_count = len(idx)
+    
+    # Distinct source values with no mapping, from the same pass
+    unmapped_values = pd.concat([
+        mapping.report.set_axis(['value'] + list(mapping.report.columns[1:]), axis=1).assign(field=field)
+        for field, mapping in [("Target's Country", countries), ("Target's Website", websites),
+                               ('Sector', sectors)]
+    ] + [
+        segments.report.drop(columns='AI').rename(columns={'Segment': 'value'})
+        .assign(field='Segment', mapped_to=lambda r: r['mapped_to'].str[0])
+        .groupby(['field', 'value', 'mapped_to'], as_index=False, dropna=False)['count'].sum()
+    ], ignore_index=True)[['field', 'value', 'mapped_to', 'count']]
     
     print(f"\n   Processed {processed_count} records")
     print(f"   Unmapped segments found: {len(unmapped_segments)}")
@@ -399,8 +335,13 @@ def map_unmapped_companies(df, unmapped_records, enriched_data):
         for item in unmapped_segments[:5]:
             print(f"   - Row {item['row']}: '{item['original_segment']}' for {item['target']}")
     
-    return df, unmapped_segments
+    if len(unmapped_values):
+        print(f"   Distinct unmapped source values: {len(unmapped_values)} "
+              f"({', '.join(f'{field}: {count}' for field, count in unmapped_values['field'].value_counts(sort=False).items())})")
+    
+    return df, unmapped_segments, unmapped_values
 
+@timed_phase('generate_statistics', rows=lambda df, unmapped_mask: int(unmapped_mask.sum()))
 def generate_statistics(df, unmapped_mask):
     """Generate statistics about the mapping"""
     print("\n" + "=" * 70)
@@ -591,7 +532,7 @@ def main():
     print(f"   Backup saved to: {backup_file}")
     
     # Phase 3: Map to Arcadia format
-    df_mapped, unmapped_segments = map_unmapped_companies(df, unmapped_records, enriched_data)
+    df_mapped, unmapped_segments, unmapped_values = map_unmapped_companies(df, unmapped_records, enriched_data)
     
     # Phase 4: Generate statistics
     stats = generate_statistics(df_mapped, unmapped_mask)
@@ -601,6 +542,11 @@ def main():
     df_mapped.to_csv(output_file, index=False, encoding='utf-8')
     print(f"\n   Updated data saved to: {output_file}")
     
+    if len(unmapped_values):
+        unmapped_values_file = Path('../output/unmapped_company_values.csv')
+        unmapped_values.to_csv(unmapped_values_file, index=False, encoding='utf-8')
+        print(f"   Unmapped source values saved to: {unmapped_values_file}")
+    
     # Create documentation
     doc_file = create_documentation(stats, enriched_data, conflicts, unmapped_segments, len(unmapped_records))
     
@@ -619,6 +565,8 @@ def main():
     
     print(f"\n✓ Documentation created: {doc_file}")
     print(f"✓ Data saved to: {output_file}")
+    
+    write_metrics('map_unmapped_to_arcadia', directory='../output/metrics')
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+Table-driven value mappings for the IG -> Arcadia conversion scripts
+Lookup tables live in scripts/mappings/<name>_v<N>.csv (first column is the key,
+remaining columns are mapped values). Bump the version number to change a table,
+so every output can be traced back to the table it was produced with.
+
+Usage:
+    types = load_mapping('transaction_type')          # latest version
+    mapped = types.apply(df['Type'])                  # one column per mapped value, NaN if unmatched
+    report = types.unmatched(df['Type'])              # values with no entry, with counts
+    COUNTRY_MAPPING = load_mapping('country').as_dict('iso_code')
+
+Rule-based mappers (functions of one or more cells) go through map_distinct, which
+calls them once per distinct input instead of once per row:
+    countries = map_distinct(map_country, df["Target's Country"],
+                             unmapped=lambda iso, country: iso == DEFAULT_COUNTRY and pd.notna(country))
+    df['arc_hq_country'] = countries.values
+    countries.report                                  # flagged inputs with row counts
+"""
+
+import re
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+MAPPINGS_DIR = Path(__file__).resolve().parent / 'mappings'
+
+class MappingTable:
+    def __init__(self, name, version, table):
+        self.name = name
+        self.version = version
+        self.key_column = table.columns[0]
+        self.value_columns = list(table.columns[1:])
+
+        duplicates = table[self.key_column][table[self.key_column].duplicated()]
+        if len(duplicates):
+            raise ValueError(f"Mapping '{name}' v{version} has duplicate keys: {sorted(duplicates.unique())}")
+
+        self.table = table.set_index(self.key_column)
+
+    def __len__(self):
+        return len(self.table)
+
+    def __contains__(self, key):
+        return key in self.table.index
+
+    def as_dict(self, value_column=None):
+        """Plain dict key -> value, for scalar lookups"""
+        return self.table[value_column or self.value_columns[0]].to_dict()
+
+    def apply(self, keys):
+        """Map a Series of keys in one pass; returns a DataFrame aligned to keys.index"""
+        return pd.DataFrame({
+            column: keys.map(self.table[column]) for column in self.value_columns
+        }, index=keys.index)
+
+    def unmatched(self, keys):
+        """Non-blank keys with no entry in the table, as a value/count report"""
+        keys = keys.dropna()
+        keys = keys[keys.astype(str).str.strip() != '']
+        missing = keys[~keys.isin(self.table.index)]
+        report = missing.value_counts().rename_axis(self.key_column).reset_index(name='count')
+        report.insert(0, 'mapping', f"{self.name}_v{self.version}")
+        return report
+
+DistinctMapping = namedtuple('DistinctMapping', ['values', 'report'])
+
+def map_distinct(func, *columns, unmapped=None):
+    """
+    Apply func(*cells) once per distinct combination of the aligned columns and
+    broadcast the results back to every row (values is an object array in row order).
+    unmapped(result, *cells) flags distinct inputs for the report, which lists them
+    with the mapped result and the number of rows they cover.
+    """
+    frame = pd.concat(columns, axis=1, keys=range(len(columns)))
+    codes = frame.groupby(list(frame.columns), dropna=False, sort=False).ngroup().to_numpy()
+    # Same first-appearance order as the group numbers above
+    distinct = frame.drop_duplicates()
+
+    results = np.empty(len(distinct), dtype=object)
+    for i, cells in enumerate(distinct.itertuples(index=False, name=None)):
+        results[i] = func(*cells)
+
+    names = [column.name for column in columns]
+    report = distinct.set_axis(names, axis=1).reset_index(drop=True)
+    report['mapped_to'] = results
+    report['count'] = np.bincount(codes, minlength=len(distinct))
+    if unmapped is None:
+        report = report.iloc[0:0]
+    else:
+        flagged = [bool(unmapped(result, *cells)) for result, cells in
+                   zip(results, distinct.itertuples(index=False, name=None))]
+        report = report[np.array(flagged, dtype=bool)].reset_index(drop=True)
+
+    return DistinctMapping(results[codes], report)
+
+def available_versions(name):
+    pattern = re.compile(rf'^{re.escape(name)}_v(\d+)\.csv$')
+    return sorted(int(m.group(1)) for m in (pattern.match(p.name) for p in MAPPINGS_DIR.glob(f'{name}_v*.csv')) if m)
+
+def load_mapping(name, version=None):
+    """Load mappings/<name>_v<version>.csv (latest version when not given)"""
+    versions = available_versions(name)
+    if not versions:
+        raise FileNotFoundError(f"No mapping table '{name}' in {MAPPINGS_DIR}")
+    if version is None:
+        version = versions[-1]
+    elif version not in versions:
+        raise FileNotFoundError(f"Mapping '{name}' v{version} not found (available: {versions})")
+
+    # Strings only: keys like 'Control ' (trailing space) and 'NA' must survive as written
+    table = pd.read_csv(MAPPINGS_DIR / f'{name}_v{version}.csv', dtype=str, keep_default_na=False)
+    return MappingTable(name, version, table)
@@ -10,10 +10,13 @@ import json
 import random
 from pathlib import Path
 
+from phase_metrics import timed_phase, write_metrics
+
 # Set random seed for reproducibility
 random.seed(42)
 np.random.seed(42)
 
+@timed_phase('load_data')
 def load_data():
     """Load both the unmapped companies and Arcadia database"""
     print("[LOAD] Loading data files...")
@@ -54,6 +57,7 @@ def analyze_data(unmapped_df, arcadia_df):
     
     return need_matching
 
+@timed_phase('build_matching_indexes', rows=lambda arcadia_df: len(arcadia_df))
 def build_matching_indexes(arcadia_df):
     """Build case-sensitive lookup dictionaries"""
     print("\n[BUILD] Creating case-sensitive matching indexes...")
@@ -128,6 +132,7 @@ def match_company(row, name_to_id, aka_to_id, alias_to_id):
     
     return None, None
 
+@timed_phase('perform_matching', rows=lambda unmapped_df, *_: len(unmapped_df))
 def perform_matching(unmapped_df, name_to_id, aka_to_id, alias_to_id):
     """Perform matching for all companies"""
     print("\n[MATCH] Performing case-sensitive ID matching...")
@@ -182,6 +187,7 @@ def perform_matching(unmapped_df, name_to_id, aka_to_id, alias_to_id):
     
     return unmapped_df, match_log, statistics
 
+@timed_phase('perform_validation')
 def perform_validation(unmapped_df, arcadia_df, match_log, sample_size=50):
     """Perform random validation checks"""
     print("\n[VALIDATE] Performing 50 random validation checks...")
@@ -297,6 +303,7 @@ def perform_validation(unmapped_df, arcadia_df, match_log, sample_size=50):
     
     return validation_results
 
+@timed_phase('save_results')
 def save_results(unmapped_df, match_log, statistics, validation_results):
     """Save all results and generate reports"""
     print("\n[SAVE] Saving results...")
@@ -393,6 +400,8 @@ def main():
     print("[SUCCESS] ID matching complete!")
     print(f"Match rate: {((statistics['name_match'] + statistics['aka_match'] + statistics['alias_match']) / max(1, statistics['total_processed'] - statistics['existing']) * 100):.1f}%")
     print(f"Validation accuracy: {(sum(1 for v in validation_results if v['is_correct']) / len(validation_results) * 100):.1f}%")
+    
+    write_metrics('match_arcadia_ids_case_sensitive')
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
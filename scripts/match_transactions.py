@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+IG -> Arcadia transaction matcher (proposes ARCADIA_TR_ID per IG deal)
+Created: 2025-09-11
+Purpose: Re-runnable replacement for the archived scripts that built the 3,306-row
+ARCADIA_TR_ID mapping in ig_arc_mapping_full, so new IG deals no longer need to be
+matched by hand. Every IG deal in investgame_database_clean.csv is compared with the
+Arcadia transactions export and gets a proposed Arcadia transaction ID, or none.
+
+Candidates (both passes are column-wise joins, no IG x Arcadia loop):
+  1. exact target  - IG target resolved to its Arcadia canonical name (arcadia_name_index),
+                     both sides normalized with normalize_for_matching; join on the
+                     normalized target, keep pairs within +-N days
+  2. fuzzy target  - IG deals without an exact-target candidate: date-window join
+                     (searchsorted over the sorted Arcadia dates, +-N days), keep pairs
+                     whose normalized targets are >= 90% Jaro-Winkler similar; pairs are
+                     pruned with the character-count bound of check_name_collisions first
+
+Score = weighted name, date, size and lead investor agreement:
+  name   1.0 for the exact pass, the Jaro-Winkler score for the fuzzy pass
+  date   1 at the same day, falling linearly to 0 just past the window
+  size   1 if both undisclosed or within the size tolerance, 0.5 if only one side has a size
+  lead   1 if the IG lead (first listed investor, canonical name) is an Arcadia lead,
+         0.5 if it is one of Arcadia's other investors, 1 if both are undisclosed
+
+Assignment is greedy one-to-one: best score first (ties: closer date), each IG deal and
+each Arcadia transaction used at most once, proposals below the minimum score dropped.
+
+Usage:
+    py scripts/match_transactions.py
+    py scripts/match_transactions.py --window-days 60 --min-score 0.6
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from arcadia_name_index import ArcadiaNameIndex
+from check_name_collisions import char_counts, prefix_codes
+from date_parsing import parse_date_column
+from detect_signature_duplicates import latest_arcadia_export
+from entity_tokenizer import InvestorSplitter
+from fuzzy_match_companies import normalize_for_matching
+from phase_metrics import timed_phase, track_phase, write_metrics
+from string_similarity import jaro_winkler
+
+DATE_WINDOW_DAYS = 30
+SIZE_TOLERANCE = 0.15  # relative difference still counted as the same size
+FUZZY_NAME_THRESHOLD = 0.90
+MIN_SCORE = 0.60
+WEIGHTS = {'name': 0.40, 'date': 0.20, 'size': 0.20, 'lead': 0.20}
+UNDISCLOSED_NAMES = {'', 'undisclosed', 'n/a', 'na'}
+
+PASS_EXACT = 'exact_target'
+PASS_FUZZY = 'fuzzy_target'
+
+REPORT_COLUMNS = ['IG_ID', 'ig_target', 'ig_date', 'ig_size', 'ig_lead', 'ARCADIA_TR_ID', 'arc_target',
+                  'arc_date', 'arc_size', 'arc_lead', 'match_pass', 'day_diff', 'name_score', 'size_score',
+                  'lead_score', 'score', 'candidates']
+
+def lead_key(name):
+    return normalize_for_matching(name) if str(name).strip().lower() not in UNDISCLOSED_NAMES else ''
+
+def split_investors(value, splitter):
+    text = str(value).strip() if pd.notna(value) else ''
+    return [] if text.lower() in UNDISCLOSED_NAMES else splitter.split(text)
+
+@timed_phase('load_ig_deals')
+def load_ig_deals(path, splitter, name_index=None):
+    """One row per IG deal: id, target, normalized block key, date, size, lead"""
+    ig_df = pd.read_csv(path)
+
+    def canonical(name):
+        match = name_index.resolve(name) if name_index is not None else None
+        return match.name if match is not None else name
+
+    targets = ig_df['Target name'].map(lambda name: canonical(str(name).strip()) if pd.notna(name) else '')
+    leads = [(investors[:1] or [''])[0] for investors in (split_investors(v, splitter) for v in ig_df['Investors / Buyers'])]
+    sizes = pd.to_numeric(ig_df['Size, $m'], errors='coerce')
+    if 'Amount_Status' in ig_df.columns:
+        sizes = sizes.where(ig_df['Amount_Status'] != 'UNDISCLOSED')
+
+    return pd.DataFrame({
+        'id': ig_df['IG_ID'] if 'IG_ID' in ig_df.columns else ig_df.index,
+        'target': ig_df['Target name'],
+        'block': targets.map(normalize_for_matching),
+        'date': parse_date_column(ig_df['Date'], label='Date').dates,
+        'size': sizes.where(sizes > 0),
+        'lead': [canonical(lead) if lead else '' for lead in leads],
+    }, index=ig_df.index)
+
+@timed_phase('load_arcadia_deals')
+def load_arcadia_deals(path, splitter):
+    """One row per Arcadia transaction with its lead and other investor keys"""
+    arcadia_df = pd.read_csv(path)
+    sizes = pd.to_numeric(arcadia_df['Transaction Size*, $M'], errors='coerce')
+    leads = [split_investors(v, splitter) for v in arcadia_df['Lead Investor / Acquirer']]
+    others = [split_investors(v, splitter) for v in arcadia_df['Other Investors']]
+    return pd.DataFrame({
+        'id': arcadia_df['ID'],
+        'target': arcadia_df['Target Company'],
+        'block': arcadia_df['Target Company'].map(normalize_for_matching),
+        'date': parse_date_column(arcadia_df['Announcement date*'], label='Announcement date*').dates,
+        'size': sizes.where(sizes > 0),
+        'lead': [', '.join(names) for names in leads],
+        'lead_keys': [{lead_key(name) for name in names} - {''} for names in leads],
+        'other_keys': [{lead_key(name) for name in names} - {''} for names in others],
+    })
+
+def exact_candidates(ig, arcadia, window_days):
+    """Pairs with the same normalized target within the date window"""
+    pairs = ig[['block', 'date']].reset_index(names='ig_row').merge(
+        arcadia[['block', 'date']].reset_index(names='arc_row'), on='block', suffixes=('_ig', '_arc'))
+    pairs = pairs[pairs['block'] != '']
+    pairs['day_diff'] = (pairs['date_arc'] - pairs['date_ig']).dt.days.abs()
+    pairs = pairs[pairs['day_diff'] <= window_days]
+    return pairs.assign(name_score=1.0, match_pass=PASS_EXACT)[['ig_row', 'arc_row', 'day_diff', 'name_score', 'match_pass']]
+
+def window_candidates(ig, arcadia, window_days, threshold=FUZZY_NAME_THRESHOLD):
+    """Date-window join: every Arcadia deal within +-N days, kept when the targets are similar"""
+    ig = ig[ig['date'].notna() & (ig['block'] != '')]
+    arcadia = arcadia[arcadia['date'].notna() & (arcadia['block'] != '')].sort_values('date')
+    if ig.empty or arcadia.empty:
+        return pd.DataFrame(columns=['ig_row', 'arc_row', 'day_diff', 'name_score', 'match_pass'])
+    arc_days = arcadia['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    ig_days = ig['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+
+    starts = np.searchsorted(arc_days, ig_days - window_days, side='left')
+    ends = np.searchsorted(arc_days, ig_days + window_days, side='right')
+    lengths = ends - starts
+    ig_positions = np.repeat(np.arange(len(ig)), lengths)
+    arc_positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+    # Upper bound on Jaro-Winkler from character counts and shared prefix (as SimilarNameIndex); only survivors are scored
+    ig_blocks, arc_blocks = ig['block'].to_numpy(), arcadia['block'].to_numpy()
+    ig_lengths, arc_lengths = np.array([len(b) for b in ig_blocks]), np.array([len(b) for b in arc_blocks])
+    ig_counts, arc_counts = np.array([char_counts(b) for b in ig_blocks]), np.array([char_counts(b) for b in arc_blocks])
+    ig_prefixes, arc_prefixes = np.array([prefix_codes(b) for b in ig_blocks]), np.array([prefix_codes(b) for b in arc_blocks])
+    left_lengths, right_lengths = ig_lengths[ig_positions], arc_lengths[arc_positions]
+    matches = np.minimum(ig_counts[ig_positions], arc_counts[arc_positions]).sum(axis=1)
+    jaro_bound = (matches / left_lengths + matches / right_lengths + 1) / 3
+    shared = np.cumprod(ig_prefixes[ig_positions] == arc_prefixes[arc_positions], axis=1).sum(axis=1)
+    shared = np.minimum(shared, np.minimum(left_lengths, right_lengths))
+    bound = np.where(matches > 0, jaro_bound + shared * 0.1 * (1 - jaro_bound), 0.0)
+
+    scores = np.zeros(len(ig_positions))
+    for i in np.flatnonzero(bound >= threshold - 1e-12):
+        scores[i] = jaro_winkler(ig_blocks[ig_positions[i]], arc_blocks[arc_positions[i]])
+    keep = scores >= threshold
+
+    return pd.DataFrame({
+        'ig_row': ig.index.to_numpy()[ig_positions[keep]],
+        'arc_row': arcadia.index.to_numpy()[arc_positions[keep]],
+        'day_diff': np.abs(arc_days[arc_positions[keep]] - ig_days[ig_positions[keep]]),
+        'name_score': scores[keep],
+        'match_pass': PASS_FUZZY,
+    })
+
+def score_candidates(pairs, ig, arcadia, window_days, size_tolerance=SIZE_TOLERANCE):
+    """Adds date, size, lead and total scores, all column-wise"""
+    ig_size = ig['size'].to_numpy()[ig.index.get_indexer(pairs['ig_row'])]
+    arc_size = arcadia['size'].to_numpy()[arcadia.index.get_indexer(pairs['arc_row'])]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relative = np.abs(ig_size - arc_size) / np.maximum(ig_size, arc_size)
+    both_missing = np.isnan(ig_size) & np.isnan(arc_size)
+    one_missing = np.isnan(ig_size) ^ np.isnan(arc_size)
+    pairs['size_score'] = np.where(both_missing | (relative <= size_tolerance), 1.0, np.where(one_missing, 0.5, 0.0))
+
+    ig_leads = ig['lead'].map(lead_key).to_numpy()[ig.index.get_indexer(pairs['ig_row'])]
+    arc_rows = arcadia.index.get_indexer(pairs['arc_row'])
+    lead_keys = arcadia['lead_keys'].to_numpy()[arc_rows]
+    other_keys = arcadia['other_keys'].to_numpy()[arc_rows]
+    pairs['lead_score'] = [
+        1.0 if (lead in leads if lead else not leads) else 0.5 if lead and lead in others else 0.0
+        for lead, leads, others in zip(ig_leads, lead_keys, other_keys)
+    ]
+
+    pairs['date_score'] = 1 - pairs['day_diff'] / (window_days + 1)
+    pairs['score'] = sum(weight * pairs[f'{part}_score'] for part, weight in WEIGHTS.items())
+    return pairs
+
+def assign_greedy(pairs, min_score=MIN_SCORE):
+    """Best score first, each IG deal and Arcadia transaction at most once"""
+    ordered = pairs[pairs['score'] >= min_score].sort_values(['score', 'day_diff', 'ig_row'], ascending=[False, True, True])
+    used_ig, used_arc, chosen = set(), set(), []
+    for position, ig_row, arc_row in zip(ordered.index, ordered['ig_row'], ordered['arc_row']):
+        if ig_row in used_ig or arc_row in used_arc:
+            continue
+        used_ig.add(ig_row)
+        used_arc.add(arc_row)
+        chosen.append(position)
+    return ordered.loc[chosen]
+
+@timed_phase('match_transactions', rows=lambda ig, *_, **__: len(ig))
+def match_transactions(ig, arcadia, window_days=DATE_WINDOW_DAYS, min_score=MIN_SCORE, fuzzy=True):
+    """(assigned pairs, all scored candidates)"""
+    pairs = exact_candidates(ig, arcadia, window_days)
+    if fuzzy:
+        missing = ig[~ig.index.isin(pairs['ig_row'])]
+        pairs = pd.concat([pairs, window_candidates(missing, arcadia, window_days)], ignore_index=True)
+    pairs = score_candidates(pairs.reset_index(drop=True), ig, arcadia, window_days)
+    return assign_greedy(pairs, min_score), pairs
+
+def build_report(ig, arcadia, assigned, pairs):
+    """One row per IG deal; ARCADIA_TR_ID blank when nothing was proposed"""
+    report = pd.DataFrame({
+        'IG_ID': ig['id'], 'ig_target': ig['target'], 'ig_date': ig['date'].dt.strftime('%Y-%m-%d'),
+        'ig_size': ig['size'], 'ig_lead': ig['lead'],
+        'candidates': pairs['ig_row'].value_counts().reindex(ig.index, fill_value=0),
+    })
+    matched = assigned.set_index('ig_row')
+    arc = arcadia.loc[matched['arc_row']]
+    report.loc[matched.index, 'ARCADIA_TR_ID'] = arc['id'].to_numpy()
+    report.loc[matched.index, 'arc_target'] = arc['target'].to_numpy()
+    report.loc[matched.index, 'arc_date'] = arc['date'].dt.strftime('%Y-%m-%d').to_numpy()
+    report.loc[matched.index, 'arc_size'] = arc['size'].to_numpy()
+    report.loc[matched.index, 'arc_lead'] = arc['lead'].to_numpy()
+    for column in ('match_pass', 'day_diff', 'name_score', 'size_score', 'lead_score', 'score'):
+        values = matched[column]
+        report.loc[matched.index, column] = values.round(4) if column.endswith('score') else values
+    report['ARCADIA_TR_ID'] = report['ARCADIA_TR_ID'].astype('Int64')
+    return report[REPORT_COLUMNS]
+
+def main():
+    parser = argparse.ArgumentParser(description='Propose ARCADIA_TR_ID for IG deals by target, date window, size and lead')
+    parser.add_argument('--ig', default='src/investgame_database_clean.csv')
+    parser.add_argument('--arcadia', default=None, help='Arcadia transactions export (default: latest src/arcadia_database_*.csv)')
+    parser.add_argument('--companies', default='src/company-names-arcadia.csv', help='Arcadia companies, for canonical names')
+    parser.add_argument('--window-days', type=int, default=DATE_WINDOW_DAYS)
+    parser.add_argument('--min-score', type=float, default=MIN_SCORE)
+    parser.add_argument('--no-fuzzy', action='store_true', help='Exact normalized targets only')
+    parser.add_argument('--output', default='output/transaction_match_proposals.csv')
+    args = parser.parse_args()
+
+    arcadia_path = args.arcadia or latest_arcadia_export()
+    if arcadia_path is None or not os.path.exists(arcadia_path):
+        print("[ERROR] No Arcadia transactions export found (src/arcadia_database_*.csv)")
+        return 1
+
+    print("=== IG -> Arcadia Transaction Matching ===")
+    splitter = InvestorSplitter.from_arcadia(args.companies)
+    name_index = ArcadiaNameIndex.from_csv(args.companies)
+    ig = load_ig_deals(args.ig, splitter, name_index)
+    arcadia = load_arcadia_deals(arcadia_path, splitter)
+    print(f"Loaded {len(ig)} IG deals ({args.ig}), {len(arcadia)} Arcadia transactions ({arcadia_path})")
+
+    assigned, pairs = match_transactions(ig, arcadia, args.window_days, args.min_score, fuzzy=not args.no_fuzzy)
+    with track_phase('write_match_report', rows=len(ig)):
+        report = build_report(ig, arcadia, assigned, pairs)
+        report.to_csv(args.output, index=False)
+
+    print(f"\n=== RESULTS (window +-{args.window_days} days, min score {args.min_score}) ===")
+    print(f"Candidate pairs: {len(pairs):,} ({(pairs['match_pass'] == PASS_EXACT).sum():,} exact target, "
+          f"{(pairs['match_pass'] == PASS_FUZZY).sum():,} fuzzy target)")
+    proposed = report['ARCADIA_TR_ID'].notna()
+    print(f"Proposed ARCADIA_TR_ID: {proposed.sum()} of {len(report)} IG deals ({proposed.mean():.1%})")
+    for match_pass, count in report['match_pass'].value_counts().items():
+        print(f"  {match_pass}: {count}")
+    print(f"Below min score or no candidate: {(~proposed & (report['candidates'] > 0)).sum()} / "
+          f"{(report['candidates'] == 0).sum()}")
+    print(f"\nSaved proposals to: {args.output}")
+
+    write_metrics('match_transactions')
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
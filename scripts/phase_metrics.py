@@ -0,0 +1,132 @@
+"""
+Lightweight per-phase instrumentation for the pipeline scripts
+Records wall time and rows processed per second for each named phase (plus
+tracemalloc peak when memory tracing is on), and writes one JSON metrics file per run so regressions can be
+tracked across data refreshes.
+
+Usage:
+    @timed_phase('phase1_smart_matching', rows=lambda unmapped_df, *_: len(unmapped_df))
+    def phase1_smart_matching(unmapped_df, norm_to_ids): ...
+
+    with track_phase('scan', rows=len(df)) as phase:
+        ...
+        phase['rows'] = rows_actually_scanned
+
+    write_metrics('fuzzy_match_companies')
+
+Memory tracing is off by default: tracemalloc slows every allocation, so timings taken with it
+are not comparable. Set PIPELINE_TRACE_MEMORY=1 for a separate memory run; tracing starts with
+the outermost phase and stops when it exits.
+"""
+
+import functools
+import json
+import os
+import platform
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+TRACE_MEMORY = os.environ.get('PIPELINE_TRACE_MEMORY', '0') == '1'
+MB = 1024 * 1024
+
+_completed_phases = []
+_active_phases = []
+
+@contextmanager
+def track_phase(name, rows=None):
+    """Time a block of code; the yielded dict's 'rows' may be set inside the block"""
+    record = {'phase': name, 'rows': rows, '_peak': 0}
+    start_memory = 0
+    started_tracing = False
+
+    if TRACE_MEMORY:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+        # Fold the enclosing phase's peak in before resetting, so nesting stays correct
+        if _active_phases:
+            parent = _active_phases[-1]
+            parent['_peak'] = max(parent['_peak'], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+
+    record['depth'] = len(_active_phases)
+    _active_phases.append(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        wall = time.perf_counter() - start
+        _active_phases.pop()
+        peak = record.pop('_peak')
+
+        if TRACE_MEMORY:
+            current, traced_peak = tracemalloc.get_traced_memory()
+            peak = max(peak, traced_peak)
+            if _active_phases:
+                parent = _active_phases[-1]
+                parent['_peak'] = max(parent['_peak'], peak)
+            record['peak_memory_mb'] = round(peak / MB, 3)
+            record['memory_growth_mb'] = round((current - start_memory) / MB, 3)
+            if started_tracing:
+                tracemalloc.stop()
+
+        record['wall_seconds'] = round(wall, 6)
+        rows_done = record['rows']
+        record['rows_per_second'] = round(rows_done / wall, 1) if rows_done and wall > 0 else None
+        record['started_at'] = datetime.fromtimestamp(time.time() - wall).strftime('%Y-%m-%d %H:%M:%S')
+        _completed_phases.append(record)
+
+        line = f"  [TIME] {name}: {wall:.3f}s"
+        if rows_done:
+            line += f", {rows_done:,} rows ({record['rows_per_second']:,.0f} rows/s)"
+        if TRACE_MEMORY:
+            line += f", peak {record['peak_memory_mb']:.1f} MB"
+        print(line)
+
+def timed_phase(name, rows=None):
+    """
+    Decorator form of track_phase
+    rows: int, or callable receiving the wrapped function's arguments
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            row_count = rows(*args, **kwargs) if callable(rows) else rows
+            with track_phase(name, rows=row_count):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def completed_phases():
+    return list(_completed_phases)
+
+def reset_metrics():
+    _completed_phases.clear()
+
+def write_metrics(script_name, directory='output/metrics'):
+    """Write the phases recorded in this run to <directory>/<script>_<timestamp>.json"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    timestamp = datetime.now()
+    metrics = {
+        'script': script_name,
+        'generated': timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'host': platform.node(),
+        'trace_memory': TRACE_MEMORY,
+        'total_wall_seconds': round(sum(p['wall_seconds'] for p in _completed_phases if p['depth'] == 0), 6),
+        'phases': list(_completed_phases)
+    }
+
+    metrics_file = directory / f"{script_name}_{timestamp.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(metrics_file, 'w', encoding='utf-8') as f:
+        json.dump(metrics, f, indent=2)
+    print(f"  [METRICS] Phase metrics saved: {metrics_file}")
+
+    reset_metrics()
+    return metrics_file
@@ -1,51 +1,90 @@
 #!/usr/bin/env python3
 
+import argparse
 import pandas as pd
 import sys
 import os
-import re
 
-def prepare_all_transactions_import():
-    """
-    Prepare ALL InvestGame unmapped transactions for Arcadia import
-    Create company cards directly from transaction data with [Number]TBC IDs
-    """
-    
-    print(f"=== Complete Transaction Import Preparation - All 882 Transactions ===")
-    
-    # Load source files
-    print("Loading source files...")
-    
-    # Load unmapped transactions
-    transactions_df = pd.read_csv('output/ig_arc_unmapped_vF.csv')
-    print(f"Loaded {len(transactions_df)} unmapped transactions")
+from concurrent.futures import ProcessPoolExecutor
+
+from arcadia_name_index import ArcadiaNameIndex
+from chunked_writer import ChunkedCsvWriter
+from entity_tokenizer import InvestorSplitter
+from phase_metrics import track_phase, write_metrics
+from tbc_ids import TbcIdAllocator, entity_key
+
+SHARD_SIZE = 500
+RESOLUTION_COLUMNS = ['source_name', 'role', 'arcadia_id', 'arcadia_name', 'match_type', 'mentions', 'tbc_id']
+CANDIDATE_MATCH = 'candidate'  # suffix-stripped hit: the TBC card is kept until someone confirms it
+
+TRANSACTION_COLUMNS = ['TRANSACTION_ID', 'DATE', 'AMOUNT', 'ROUND', 'CATEGORY', 'STATUS', 'SOURCE',
+                       'ORIGINAL_IG_INDEX', 'ORIGINAL_IG_ID', 'INVESTORS_COUNT']
+# One row per company on a deal: the target (ordinal 0), then investors in listed order
+PARTICIPANT_COLUMNS = ['TRANSACTION_ID', 'COMPANY_ID', 'COMPANY_NAME', 'ROLE', 'ORDINAL']
+
+class CompanyCardRegistry:
+    """Company cards created during import prep, keyed by normalized name and role, with [XXXXXXXX]TBC IDs"""
     
-    # Create transaction cards and collect companies
-    transaction_cards = []
-    company_cards = {}
-    tbc_counter = 1
+    def __init__(self, allocator=None):
+        self.company_cards = {}
+        self.allocator = allocator if allocator is not None else TbcIdAllocator()
     
-    def get_or_create_company_id(name, role):
-        nonlocal tbc_counter
-        
+    def get_or_create_company_id(self, name, role):
         # Create a key for the company
-        company_key = f"{name}_{role}".lower().strip()
+        company_key = entity_key(name, role)
         
-        if company_key not in company_cards:
-            # Create new company card with [Number]TBC ID
-            company_id = f"[{tbc_counter}]TBC"
-            company_cards[company_key] = {
+        if company_key not in self.company_cards:
+            # Create new company card with a hash-based TBC ID
+            company_id = self.allocator.get(company_key)
+            self.company_cards[company_key] = {
                 'id': company_id,
                 'name': name,
                 'role': role,
                 'status': 'TO BE CREATED'
             }
-            tbc_counter += 1
             return company_id
         
-        return company_cards[company_key]['id']
+        return self.company_cards[company_key]['id']
     
-    print("Processing all transactions...")
+    def placeholder_id(self, key):
+        """TBC ID without a company card (transactions with no target name)"""
+        return self.allocator.get(entity_key(key, 'placeholder'))
+
+def build_shard_cards(transactions_df, splitter, name_index=None):
+    """
+    Transaction and participant rows for one shard of transactions
+    Names found in name_index get their Arcadia ID; the rest get TBC cards whose IDs are
+    local to the shard (the caller re-allocates them over all shards by key)
+    """
+    registry = CompanyCardRegistry()
+    resolved = {}  # card key -> Arcadia match (no card needed) or review candidate (card kept, tbc_id set)
+    transaction_rows = []
+    participant_rows = []
+    
+    def get_or_create_company_id(name, role):
+        match = name_index.resolve(name) if name_index is not None else None
+        tbc_id = None
+        if match is None:
+            tbc_id = registry.get_or_create_company_id(name, role)
+            match = name_index.candidate(name) if name_index is not None else None
+            if match is None:
+                return tbc_id, name
+        
+        company_key = entity_key(name, role)
+        if company_key not in resolved:
+            resolved[company_key] = {
+                'source_name': name,
+                'role': role,
+                'arcadia_id': match.id,
+                'arcadia_name': match.name,
+                'match_type': match.match_type,
+                'mentions': 0,
+                'tbc_id': tbc_id
+            }
+        resolved[company_key]['mentions'] += 1
+        if tbc_id is not None:
+            return tbc_id, name
+        return match.id, match.name
     
     for idx, transaction in transactions_df.iterrows():
         # Base transaction data
@@ -65,12 +104,10 @@ def prepare_all_transactions_import():
         target_raw = transaction.get('Target name', '')
         target_name = str(target_raw).strip() if pd.notna(target_raw) else ''
         if target_name:
-            card['TARGET_COMPANY_ID'] = get_or_create_company_id(target_name, 'target')
-            card['TARGET_COMPANY_NAME'] = target_name
+            target_id, target_name = get_or_create_company_id(target_name, 'target')
+            target = {'id': target_id, 'name': target_name}
         else:
-            card['TARGET_COMPANY_ID'] = f"[{tbc_counter}]TBC"
-            card['TARGET_COMPANY_NAME'] = f"Unknown Target {idx}"
-            tbc_counter += 1
+            target = {'id': registry.placeholder_id(card['TRANSACTION_ID']), 'name': f"Unknown Target {idx}"}
         
         # Process investors/buyers
         investors_raw = transaction.get('Investors / Buyers', '')
@@ -78,50 +115,169 @@ def prepare_all_transactions_import():
         investors = []
         
         if investors_text and investors_text.lower() not in ['undisclosed', 'n/a', 'na', '']:
-            # Parse investors - split by common delimiters
-            investor_names = re.split(r'[,;/&+]|\s+and\s+', investors_text)
-            investor_names = [name.strip() for name in investor_names if name.strip()]
+            # Parse investors - split by common delimiters outside known names
+            investor_names = splitter.split(investors_text)
             
             for i, investor_name in enumerate(investor_names):
                 # Assign roles: first investor is lead, others are participants
                 role = 'lead' if i == 0 else 'participant'
                 
+                investor_id, investor_name = get_or_create_company_id(investor_name, role)
                 investor_data = {
-                    'id': get_or_create_company_id(investor_name, role),
+                    'id': investor_id,
                     'name': investor_name,
                     'role': role
                 }
                 investors.append(investor_data)
         else:
             # Handle undisclosed investors
+            investor_id, investor_name = get_or_create_company_id('Undisclosed', 'lead')
             investor_data = {
-                'id': get_or_create_company_id('Undisclosed', 'lead'),
-                'name': 'Undisclosed',
+                'id': investor_id,
+                'name': investor_name,
                 'role': 'lead'
             }
             investors.append(investor_data)
         
-        # Add investor information to card
         card['INVESTORS_COUNT'] = len(investors)
-        for i, investor in enumerate(investors):
-            card[f'INVESTOR_{i+1}_ID'] = investor['id']
-            card[f'INVESTOR_{i+1}_NAME'] = investor['name']
-            card[f'INVESTOR_{i+1}_ROLE'] = investor['role']
+        transaction_rows.append(card)
         
-        transaction_cards.append(card)
-        
-        # Progress indicator
-        if (idx + 1) % 100 == 0:
-            print(f"  Processed {idx + 1}/{len(transactions_df)} transactions...")
+        # Target and investors as participant rows
+        participant_rows.append({
+            'TRANSACTION_ID': card['TRANSACTION_ID'],
+            'COMPANY_ID': target['id'],
+            'COMPANY_NAME': target['name'],
+            'ROLE': 'target',
+            'ORDINAL': 0
+        })
+        for i, investor in enumerate(investors):
+            participant_rows.append({
+                'TRANSACTION_ID': card['TRANSACTION_ID'],
+                'COMPANY_ID': investor['id'],
+                'COMPANY_NAME': investor['name'],
+                'ROLE': investor['role'],
+                'ORDINAL': i + 1
+            })
     
-    print("Creating output files...")
+    return transaction_rows, participant_rows, registry.company_cards, registry.allocator.ids, resolved
+
+def build_wide_cards(transactions_file, participants_file, output_file):
+    """
+    Wide export for the Sheets importer (TARGET_COMPANY_* and INVESTOR_<n>_* columns),
+    built from the long transactions / participants tables
+    """
+    transactions = pd.read_csv(transactions_file, dtype=str, keep_default_na=False)
+    participants = pd.read_csv(participants_file, dtype=str, keep_default_na=False)
+    participants['ORDINAL'] = participants['ORDINAL'].astype(int)
     
-    # Convert to DataFrame
-    cards_df = pd.DataFrame(transaction_cards)
+    is_target = participants['ROLE'] == 'target'
+    targets = participants[is_target].set_index('TRANSACTION_ID')[['COMPANY_ID', 'COMPANY_NAME']]
+    targets.columns = ['TARGET_COMPANY_ID', 'TARGET_COMPANY_NAME']
     
-    # Save all transactions
-    output_file = 'output/transaction_import_FINAL_ALL.csv'
-    cards_df.to_csv(output_file, index=False)
+    investors = participants[~is_target].pivot(index='TRANSACTION_ID', columns='ORDINAL',
+                                               values=['COMPANY_ID', 'COMPANY_NAME', 'ROLE'])
+    investors = investors.sort_index(axis=1, level=1, sort_remaining=False)
+    investors.columns = [f"INVESTOR_{ordinal}_{field.replace('COMPANY_', '')}" for field, ordinal in investors.columns]
+    
+    count_position = transactions.columns.get_loc('INVESTORS_COUNT')
+    wide = pd.concat([
+        transactions.iloc[:, :count_position].set_index('TRANSACTION_ID', drop=False),
+        targets,
+        transactions.iloc[:, count_position:].set_index(transactions['TRANSACTION_ID']),
+        investors
+    ], axis=1, join='outer').reindex(transactions['TRANSACTION_ID'])
+    
+    wide.to_csv(output_file, index=False)
+    return len(wide)
+
+def prepare_all_transactions_import(write_wide=True, workers=1, resolve_arcadia=True):
+    """
+    Prepare ALL InvestGame unmapped transactions for Arcadia import
+    Create company cards directly from transaction data with hash-based [XXXXXXXX]TBC IDs
+    (see tbc_ids.py); shards of transactions are processed in `workers` processes
+    Names that already exist in Arcadia get their Arcadia ID instead of a card unless resolve_arcadia=False
+    Writes a transactions table and a participants table (streamed in chunks);
+    the wide transaction_import_FINAL_ALL.csv is built from them unless write_wide=False
+    """
+    
+    print(f"=== Complete Transaction Import Preparation - All 882 Transactions ===")
+    
+    # Load source files
+    print("Loading source files...")
+    
+    # Load unmapped transactions
+    transactions_df = pd.read_csv('output/ig_arc_unmapped_vF.csv')
+    print(f"Loaded {len(transactions_df)} unmapped transactions")
+    
+    # Known company names containing delimiters ("Draper & Associates") are kept whole
+    splitter = InvestorSplitter.from_arcadia('src/company-names-arcadia.csv')
+    print(f"Loaded {len(splitter.matcher)} known company names containing delimiters")
+    
+    # Existing Arcadia companies (name, also_known_as, aliases) are reused instead of TBC cards
+    name_index = ArcadiaNameIndex.from_csv('src/company-names-arcadia.csv') if resolve_arcadia else None
+    if name_index is not None:
+        print(f"Indexed {len(name_index)} exact, {len(name_index.normalized)} normalized and "
+              f"{len(name_index.candidates)} review-only Arcadia names "
+              f"(skipped {name_index.ambiguous_exact + name_index.ambiguous_normalized} ambiguous keys)")
+    
+    # Create transaction cards and collect companies, SHARD_SIZE transactions at a time
+    shards = [transactions_df.iloc[i:i + SHARD_SIZE] for i in range(0, len(transactions_df), SHARD_SIZE)]
+    
+    transactions_file = 'output/transaction_import_transactions.csv'
+    participants_file = 'output/transaction_import_participants.csv'
+    
+    print(f"Processing all transactions ({len(shards)} shards, {workers} worker(s))...")
+    
+    with track_phase('build_transaction_cards', rows=len(transactions_df)):
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(build_shard_cards, shards, [splitter] * len(shards),
+                                            [name_index] * len(shards)))
+        else:
+            results = [build_shard_cards(shard, splitter, name_index) for shard in shards]
+    
+    # One allocation over every key, in sorted order, so IDs do not depend on sharding or row order
+    allocator = TbcIdAllocator()
+    allocator.allocate(key for _, _, _, shard_ids, _ in results for key in shard_ids)
+    company_cards = {}
+    resolved = {}
+    written = 0
+    
+    with track_phase('write_transaction_tables', rows=len(transactions_df)), \
+            ChunkedCsvWriter(transactions_file, TRANSACTION_COLUMNS) as transaction_writer, \
+            ChunkedCsvWriter(participants_file, PARTICIPANT_COLUMNS) as participant_writer:
+        for transaction_rows, participant_rows, shard_cards, shard_ids, shard_resolved in results:
+            final_ids = {local_id: allocator.ids[key] for key, local_id in shard_ids.items()}
+            for company_key, company_data in shard_cards.items():
+                if company_key not in company_cards:
+                    company_cards[company_key] = dict(company_data, id=final_ids[company_data['id']])
+            for company_key, match in shard_resolved.items():
+                if company_key in resolved:
+                    resolved[company_key]['mentions'] += match['mentions']
+                else:
+                    resolved[company_key] = dict(match, tbc_id=final_ids.get(match['tbc_id'], ''))
+            
+            for card in transaction_rows:
+                transaction_writer.write(card)
+            for participant in participant_rows:
+                participant_writer.write(dict(participant, COMPANY_ID=final_ids.get(participant['COMPANY_ID'], participant['COMPANY_ID'])))
+            
+            # Progress indicator
+            written += len(transaction_rows)
+            print(f"  Processed {written}/{len(transactions_df)} transactions...")
+    
+    if allocator.collisions:
+        print(f"  [INFO] {allocator.collisions} TBC hash collisions resolved by rehashing")
+    
+    print("Creating output files...")
+    
+    transaction_count = transaction_writer.rows_written
+    output_file = transactions_file
+    if write_wide:
+        # Wide export for the Sheets importer
+        output_file = 'output/transaction_import_FINAL_ALL.csv'
+        with track_phase('write_transaction_cards', rows=transaction_count):
+            build_wide_cards(transactions_file, participants_file, output_file)
     
     # Save company cards created
     companies_list = []
@@ -132,11 +288,21 @@ def prepare_all_transactions_import():
     companies_output = 'output/companies_import_FINAL_ALL.csv'
     companies_df.to_csv(companies_output, index=False)
     
+    # Names resolved to existing Arcadia companies (one row per card that was not needed)
+    # and suffix-stripped candidates whose cards were kept for review
+    resolutions_output = 'output/import_arcadia_resolutions.csv'
+    resolutions_df = pd.DataFrame(list(resolved.values()), columns=RESOLUTION_COLUMNS)
+    resolutions_df.to_csv(resolutions_output, index=False)
+    
     print(f"\n=== FINAL RESULTS ===")
-    print(f"Processed {len(cards_df)} transaction cards")
+    print(f"Processed {transaction_count} transaction cards")
     print(f"Created {len(company_cards)} unique companies")
-    print(f"Saved transactions to: {output_file}")
+    print(f"Saved transactions to: {transactions_file}")
+    print(f"Saved participants to: {participants_file} ({participant_writer.rows_written} rows)")
+    if write_wide:
+        print(f"Saved wide import cards to: {output_file}")
     print(f"Saved companies to: {companies_output}")
+    print(f"Saved Arcadia resolutions to: {resolutions_output}")
     
     # Summary statistics
     target_count = len([c for c in company_cards.values() if c['role'] == 'target'])
@@ -144,7 +310,7 @@ def prepare_all_transactions_import():
     participant_count = len([c for c in company_cards.values() if c['role'] == 'participant'])
     
     print(f"\n=== FINAL SUMMARY STATISTICS ===")
-    print(f"Total transactions processed: {len(cards_df)}")
+    print(f"Total transactions processed: {transaction_count}")
     print(f"Total companies created: {len(company_cards)}")
     print(f"  - Target companies: {target_count}")
     print(f"  - Lead investors: {lead_count}")
@@ -152,7 +318,18 @@ def prepare_all_transactions_import():
     print(f"All transactions assigned status: IMPORTED")
     print(f"All companies assigned status: TO BE CREATED")
     
+    if name_index is not None:
+        match_counts = resolutions_df['match_type'].value_counts()
+        applied = resolutions_df[resolutions_df['match_type'] != CANDIDATE_MATCH]
+        print(f"\n=== ARCADIA RESOLUTION ===")
+        print(f"Company cards avoided: {len(applied)} "
+              f"({match_counts.get('exact', 0)} exact, {match_counts.get('normalized', 0)} normalized)")
+        print(f"Mentions resolved to Arcadia IDs: {applied['mentions'].sum()}")
+        print(f"Distinct Arcadia companies referenced: {applied['arcadia_id'].nunique()}")
+        print(f"Candidates for review (TBC card kept): {match_counts.get(CANDIDATE_MATCH, 0)}")
+    
     # Show transaction type distribution
+    cards_df = pd.read_csv(transactions_file, usecols=['ROUND', 'CATEGORY'])
     print(f"\n=== TRANSACTION TYPE DISTRIBUTION ===")
     type_counts = cards_df['ROUND'].value_counts()
     for round_type, count in type_counts.head(10).items():
@@ -164,12 +341,23 @@ def prepare_all_transactions_import():
     for category, count in category_counts.items():
         print(f"  {category}: {count}")
     
-    return output_file, companies_output, len(cards_df), len(company_cards)
+    return output_file, companies_output, transaction_count, len(company_cards)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Prepare all unmapped InvestGame transactions for Arcadia import')
+    parser.add_argument('--no-wide', action='store_true',
+                        help='Only write the long transactions / participants tables, skip transaction_import_FINAL_ALL.csv')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processes used to build transaction cards (IDs are the same for any value)')
+    parser.add_argument('--no-arcadia-resolve', action='store_true',
+                        help='Create TBC cards for every name, even ones that already exist in Arcadia')
+    args = parser.parse_args()
+    
     try:
         # Process all 882 transactions
-        trans_file, comp_file, trans_count, comp_count = prepare_all_transactions_import()
+        trans_file, comp_file, trans_count, comp_count = prepare_all_transactions_import(
+            write_wide=not args.no_wide, workers=args.workers, resolve_arcadia=not args.no_arcadia_resolve)
+        write_metrics('prepare_all_transactions_import')
         print(f"\n[SUCCESS] Complete import preparation finished!")
         print(f"Transaction file: {trans_file}")
         print(f"Company file: {comp_file}")
@@ -5,6 +5,8 @@ and Correct Transaction Imported.csv
 import pandas as pd
 import random
 
+from id_resolver import IdResolver
+
 print("=" * 70)
 print("RANDOM VERIFICATION OF 100 IG_ID MAPPINGS")
 print("=" * 70)
@@ -38,17 +40,20 @@ print("\n3. VERIFYING MAPPINGS...")
 matches = []
 mismatches = []
 
-for ig_id in random_ids:
+# Resolve the whole sample against both files in one batch
+ig_lookup = IdResolver(ig_db, 'IG_ID')
+ver_lookup = IdResolver(verified, 'ig_id')
+in_ig_db = ig_lookup.found(random_ids)
+ig_targets = ig_lookup.lookup(random_ids, 'Target name')
+ver_targets = ver_lookup.lookup(random_ids, 'ig_target_clean')
+
+for ig_id, found, ig_target, ver_target in zip(random_ids, in_ig_db, ig_targets, ver_targets):
     ig_id_int = int(ig_id)
     
     # Get from InvestGame database using IG_ID column
-    if ig_id_int in ig_db['IG_ID'].values:
-        ig_row = ig_db[ig_db['IG_ID'] == ig_id_int].iloc[0]
-        ig_target = ig_row['Target name'].strip()
-        
-        # Get from verified file
-        ver_row = verified[verified['ig_id'] == ig_id].iloc[0]
-        ver_target = ver_row['ig_target_clean'].strip()
+    if found:
+        ig_target = ig_target.strip()
+        ver_target = ver_target.strip()
         
         # Compare
         if ig_target == ver_target:
@@ -66,7 +71,7 @@ for ig_id in random_ids:
         mismatches.append({
             'ig_id': ig_id_int,
             'ig_target': 'NOT FOUND IN IG_DB',
-            'ver_target': verified[verified['ig_id'] == ig_id].iloc[0]['ig_target_clean']
+            'ver_target': ver_target
         })
 
 # 4. Report results
@@ -104,16 +109,16 @@ for start, end in ranges:
     ids_in_range = [id for id in random_ids if start <= id < end]
     if ids_in_range:
         sample_id = ids_in_range[0]
-        target = ig_db[ig_db['IG_ID'] == sample_id]['Target name'].iloc[0]
+        target = ig_lookup.get(sample_id)['Target name']
         print(f"   ID {sample_id:4} (range {start}-{end}): '{target}'")
 
 # 6. Save detailed results
 print("\n6. SAVING DETAILED RESULTS...")
 results_df = pd.DataFrame({
     'ig_id': random_ids,
-    'ig_target': [ig_db[ig_db['IG_ID'] == id]['Target name'].iloc[0] if id in ig_db['IG_ID'].values else 'NOT FOUND' for id in random_ids],
-    'ver_target': [verified[verified['ig_id'] == id]['ig_target_clean'].iloc[0] for id in random_ids],
-    'match': [ig_db[ig_db['IG_ID'] == id]['Target name'].iloc[0].strip() == verified[verified['ig_id'] == id]['ig_target_clean'].iloc[0].strip() if id in ig_db['IG_ID'].values else False for id in random_ids]
+    'ig_target': [target if found else 'NOT FOUND' for target, found in zip(ig_targets, in_ig_db)],
+    'ver_target': ver_targets,
+    'match': [found and target.strip() == ver_target.strip() for target, ver_target, found in zip(ig_targets, ver_targets, in_ig_db)]
 })
 
 results_df.to_csv('output/random_100_verification_results.csv', index=False)
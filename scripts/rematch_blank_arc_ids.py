@@ -12,6 +12,9 @@ from datetime import datetime
 import json
 from difflib import SequenceMatcher
 
+from phase_metrics import timed_phase, write_metrics
+
+@timed_phase('load_and_analyze_current_state')
 def load_and_analyze_current_state():
     """Load current data and analyze blank arc_id records"""
     print("=" * 70)
@@ -55,6 +58,7 @@ def load_and_analyze_current_state():
     
     return df, blank_records, blank_mask
 
+@timed_phase('load_arcadia_companies')
 def load_arcadia_companies():
     """Load Arcadia company reference data"""
     print("\n" + "=" * 70)
@@ -102,6 +106,7 @@ def calculate_similarity(str1, str2):
     """Calculate similarity ratio between two strings"""
     return SequenceMatcher(None, str1, str2).ratio()
 
+@timed_phase('match_companies', rows=lambda blank_records, arcadia_df: len(blank_records))
 def match_companies(blank_records, arcadia_df):
     """Match blank records to Arcadia companies"""
     print("\n" + "=" * 70)
@@ -216,6 +221,7 @@ def match_companies(blank_records, arcadia_df):
     
     return matches, no_matches
 
+@timed_phase('update_dataframe', rows=lambda df, matches: len(matches))
 def update_dataframe(df, matches):
     """Update the dataframe with new arc_id values"""
     print("\n" + "=" * 70)
@@ -339,6 +345,8 @@ def main():
     final_blank = df_final['arc_id'].isna() | (df_final['arc_id'].astype(str).str.strip() == '') | (df_final['arc_id'].astype(str) == 'nan')
     final_blank_count = final_blank.sum()
     print(f"\nFinal blank arc_id count: {final_blank_count} (reduced by {original_blank_count - final_blank_count})")
+    
+    write_metrics('rematch_blank_arc_ids')
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
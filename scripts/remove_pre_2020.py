@@ -5,6 +5,8 @@ This is done VERY CAREFULLY with multiple verification steps
 import pandas as pd
 from datetime import datetime
 
+from date_parsing import parse_date_column
+
 print("=" * 70)
 print("REMOVING PRE-2020 TRANSACTIONS FROM FILTERED DATABASE")
 print("=" * 70)
@@ -17,7 +19,16 @@ print(f"   Loaded {len(df)} transactions from {file_path}")
 
 # 2. Convert date column and analyze
 print("\n2. ANALYZING DATE DISTRIBUTION...")
-df['Announcement date*'] = pd.to_datetime(df['Announcement date*'])
+parsed = parse_date_column(df['Announcement date*'])
+# Rows without a date match neither filter below and would vanish from the rewrite
+undated = parsed.dates.isna()
+if undated.any():
+    print(f"   ERROR: {undated.sum()} transactions have no parseable announcement date "
+          f"({len(parsed.failures)} unparseable, {undated.sum() - len(parsed.failures)} blank)")
+    print(f"   IDs: {', '.join(map(str, df.loc[undated, 'ID'].head(10)))}")
+    print("   ABORTING to prevent data corruption")
+    exit(1)
+df['Announcement date*'] = parsed.dates
 
 # Count pre-2020 transactions
 pre_2020 = df[df['Announcement date*'] < '2020-01-01']
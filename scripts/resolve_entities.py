@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Entity resolution over all company match evidence (union-find clustering)
+Created: 2025-09-12
+Purpose: Match evidence is spread over several logs and a hard-coded list, and
+ArcadiaSync.merge_companies_by_id only merges rows that already share an id. This loads
+every piece of pairwise evidence as an edge and clusters names, Arcadia ids and TBC
+cards with a union-find structure (path halving + union by size, near-linear), so
+pending cards that are the same company end up together even when no single source
+links them directly.
+
+Nodes:
+    name:<casefolded name>       company names from the logs and pending cards
+    arcadia:<id>                 Arcadia company ids
+    card:<TBC id>                TBC cards from companies_import_FINAL_ALL.csv
+    normalized:<key>             normalize_for_matching key of a pending name (>= 3 chars)
+
+Edges (source):
+    arcadia_id_match_log         match_arcadia_ids_case_sensitive (name / aka / alias hits)
+    fuzzy_match_log              fuzzy_match_companies (normalized and fuzzy hits)
+    manual                       MATCHES_TO_APPLY in apply_to_be_created_matches
+    rematch                      IG target -> arc_id in the IG unmapped file (rematch results)
+    unmapped_table               name -> id rows of arcadia_company_unmapped.csv
+    import_resolution            import prep name resolutions (import_arcadia_resolutions.csv),
+                                 review-only 'candidate' rows excluded
+    tbc_card                     TBC card -> its name
+    normalized_name              pending name -> its normalized key
+
+Cluster verdicts:
+    CONFLICT     more than one Arcadia id in the cluster - needs review before merging
+    RESOLVED     exactly one Arcadia id - every pending name / card in it maps to that id
+    MERGE        no Arcadia id, several names or several cards - one company to create, not several
+    SINGLE       nothing to do
+
+Usage:
+    py scripts/resolve_entities.py
+    py scripts/resolve_entities.py --no-normalized    # only explicit match evidence
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from apply_to_be_created_matches import MATCHES_TO_APPLY
+from arcadia_name_index import MIN_NORMALIZED_LENGTH, exact_key
+from fuzzy_match_companies import normalize_for_matching
+from phase_metrics import timed_phase, track_phase, write_metrics
+
+ID_MATCH_LOG = 'output/arcadia_id_match_log.csv'
+FUZZY_MATCH_LOG = 'output/fuzzy_match_log.csv'
+IG_UNMAPPED_FILE = 'output/ig_arc_unmapped_vF.csv'
+UNMAPPED_FILE = 'output/arcadia_company_unmapped.csv'
+RESOLUTIONS_FILE = 'output/import_arcadia_resolutions.csv'
+TBC_CARDS_FILE = 'output/companies_import_FINAL_ALL.csv'
+
+EDGE_COLUMNS = ['left', 'right', 'source', 'detail']
+NODE_COLUMNS = ['cluster_id', 'verdict', 'node', 'node_type', 'value', 'cluster_size', 'arcadia_ids', 'sources']
+
+VERDICT_CONFLICT = 'CONFLICT'
+VERDICT_RESOLVED = 'RESOLVED'
+VERDICT_MERGE = 'MERGE'
+VERDICT_SINGLE = 'SINGLE'
+
+class UnionFind:
+    """Disjoint sets over 0..n-1 (numpy parent array, path halving, union by size)"""
+
+    def __init__(self, size):
+        self.parent = np.arange(size)
+        self.size = np.ones(size, dtype=np.int64)
+
+    def find(self, node):
+        parent = self.parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(self, left, right):
+        left, right = self.find(left), self.find(right)
+        if left == right:
+            return False
+        if self.size[left] < self.size[right]:
+            left, right = right, left
+        self.parent[right] = left
+        self.size[left] += self.size[right]
+        return True
+
+    def roots(self):
+        """Root of every node (fully compressed)"""
+        return np.array([self.find(node) for node in range(len(self.parent))])
+
+def name_node(names):
+    return 'name:' + names.astype(str).map(exact_key)
+
+def arcadia_node(ids):
+    return 'arcadia:' + pd.to_numeric(ids, errors='coerce').astype('Int64').astype(str)
+
+def id_edges(names, ids, source, detail=''):
+    """name -> arcadia id edges for the rows that have both"""
+    ids = pd.to_numeric(ids, errors='coerce')
+    keep = names.notna() & (names.astype(str).str.strip() != '') & ids.notna()
+    return pd.DataFrame({'left': name_node(names[keep]), 'right': arcadia_node(ids[keep]),
+                         'source': source, 'detail': detail[keep] if isinstance(detail, pd.Series) else detail})
+
+def read_optional(path, hint, **kwargs):
+    if os.path.exists(path):
+        return pd.read_csv(path, **kwargs)
+    print(f"  [WARNING] {path} not found{f' ({hint})' if hint else ''} - skipped")
+    return None
+
+@timed_phase('load_match_evidence')
+def load_evidence(normalized=True):
+    """All pairwise evidence as one edge frame"""
+    edges = []
+
+    log = read_optional(ID_MATCH_LOG, 'run match_arcadia_ids_case_sensitive.py')
+    if log is not None:
+        edges.append(id_edges(log['company_name'], log['matched_id'], 'arcadia_id_match_log', log['match_type']))
+
+    log = read_optional(FUZZY_MATCH_LOG, 'run fuzzy_match_companies.py')
+    if log is not None:
+        detail = log['match_type'].astype(str) + ' ' + log['score'].astype(str)
+        edges.append(id_edges(log['unmapped_name'], log['matched_id'], 'fuzzy_match_log', detail))
+
+    manual = pd.DataFrame(MATCHES_TO_APPLY)
+    edges.append(id_edges(manual['unmapped_name'], manual['arcadia_id'], 'manual', 'IG ' + manual['ig_id'].astype(str)))
+
+    ig = read_optional(IG_UNMAPPED_FILE, '', usecols=['Target name', 'arc_id', 'IG_ID'])
+    if ig is not None:
+        edges.append(id_edges(ig['Target name'], ig['arc_id'], 'rematch', 'IG ' + ig['IG_ID'].astype(str)))
+
+    pending_names = []
+    unmapped = read_optional(UNMAPPED_FILE, '', usecols=['id', 'name', 'status'])
+    if unmapped is not None:
+        edges.append(id_edges(unmapped['name'], unmapped['id'], 'unmapped_table', unmapped['status']))
+        pending_names.append(unmapped.loc[unmapped['status'] == 'TO BE CREATED', 'name'])
+
+    resolutions = read_optional(RESOLUTIONS_FILE, 'run prepare_all_transactions_import.py')
+    if resolutions is not None:
+        resolutions = resolutions[resolutions['match_type'] != 'candidate']  # unconfirmed, not evidence
+        edges.append(id_edges(resolutions['source_name'], resolutions['arcadia_id'], 'import_resolution',
+                              resolutions['match_type']))
+
+    cards = read_optional(TBC_CARDS_FILE, 'run prepare_all_transactions_import.py', usecols=['id', 'name', 'role'])
+    if cards is not None:
+        cards = cards.dropna(subset=['id', 'name'])
+        edges.append(pd.DataFrame({'left': 'card:' + cards['id'].astype(str), 'right': name_node(cards['name']),
+                                   'source': 'tbc_card', 'detail': cards['role']}))
+        pending_names.append(cards['name'])
+
+    if normalized and pending_names:
+        names = pd.concat(pending_names).dropna().drop_duplicates()
+        keys = names.map(normalize_for_matching)
+        keep = keys.str.len() >= MIN_NORMALIZED_LENGTH
+        edges.append(pd.DataFrame({'left': name_node(names[keep]), 'right': 'normalized:' + keys[keep],
+                                   'source': 'normalized_name', 'detail': ''}))
+
+    edges = pd.concat(edges, ignore_index=True)[EDGE_COLUMNS]
+    return edges.drop_duplicates(['left', 'right', 'source']).reset_index(drop=True)
+
+@timed_phase('cluster_entities', rows=lambda edges: len(edges))
+def cluster(edges):
+    """(nodes frame with a cluster id per node, cluster id per edge)"""
+    codes, nodes = pd.factorize(pd.concat([edges['left'], edges['right']], ignore_index=True))
+    left, right = codes[:len(edges)], codes[len(edges):]
+
+    sets = UnionFind(len(nodes))
+    for a, b in zip(left.tolist(), right.tolist()):
+        sets.union(a, b)
+    roots = sets.roots()
+
+    # Cluster ids numbered by first appearance, so reruns over the same evidence agree
+    cluster_ids = pd.factorize(roots)[0]
+    node_frame = pd.DataFrame({'cluster_id': cluster_ids, 'node': nodes})
+    split = node_frame['node'].str.split(':', n=1)
+    node_frame['node_type'] = split.str[0]
+    node_frame['value'] = split.str[1]
+    return node_frame, cluster_ids[left]
+
+def summarize(node_frame, edges, edge_clusters):
+    """Verdict, Arcadia ids and evidence sources per cluster, joined back onto the nodes"""
+    by_cluster = node_frame.groupby('cluster_id')
+    arcadia = node_frame[node_frame['node_type'] == 'arcadia'].groupby('cluster_id')['value']
+    types = pd.crosstab(node_frame['cluster_id'], node_frame['node_type']).reindex(columns=['name', 'card'], fill_value=0)
+
+    clusters = pd.DataFrame({'cluster_size': by_cluster.size()})
+    clusters['arcadia_count'] = arcadia.size().reindex(clusters.index, fill_value=0)
+    clusters['arcadia_ids'] = arcadia.agg(lambda ids: ', '.join(sorted(ids, key=int))).reindex(clusters.index, fill_value='')
+    clusters['sources'] = (edges.assign(cluster_id=edge_clusters).groupby('cluster_id')['source']
+                           .agg(lambda sources: ', '.join(sorted(set(sources)))).reindex(clusters.index, fill_value=''))
+    clusters['verdict'] = np.select(
+        [clusters['arcadia_count'] > 1, clusters['arcadia_count'] == 1, (types['name'] > 1) | (types['card'] > 1)],
+        [VERDICT_CONFLICT, VERDICT_RESOLVED, VERDICT_MERGE], VERDICT_SINGLE)
+
+    report = node_frame.join(clusters, on='cluster_id')
+    return report.sort_values(['cluster_id', 'node_type', 'value'])[NODE_COLUMNS], clusters
+
+def main():
+    parser = argparse.ArgumentParser(description='Cluster companies over all match evidence and flag multi-id clusters')
+    parser.add_argument('--no-normalized', action='store_true', help='Do not link names through normalize_for_matching keys')
+    parser.add_argument('--output', default='output/entity_clusters.csv')
+    parser.add_argument('--review-output', default='output/entity_cluster_review.csv')
+    args = parser.parse_args()
+
+    print("=== Entity Resolution ===")
+    print("Loading match evidence...")
+    edges = load_evidence(normalized=not args.no_normalized)
+    for source, count in edges['source'].value_counts().items():
+        print(f"  {source}: {count} edges")
+
+    node_frame, edge_clusters = cluster(edges)
+    with track_phase('summarize_clusters', rows=len(node_frame)):
+        report, clusters = summarize(node_frame, edges, edge_clusters)
+    report.to_csv(args.output, index=False)
+
+    # Evidence behind every conflicting cluster, for review
+    conflicts = clusters.index[clusters['verdict'] == VERDICT_CONFLICT]
+    review = edges.assign(cluster_id=edge_clusters)
+    review = review[review['cluster_id'].isin(conflicts)].join(clusters[['arcadia_ids']], on='cluster_id')
+    review.sort_values(['cluster_id', 'source', 'left']).to_csv(args.review_output, index=False)
+
+    print(f"\n=== RESULTS ===")
+    print(f"{len(node_frame)} nodes, {len(edges)} edges -> {len(clusters)} clusters")
+    for verdict in (VERDICT_CONFLICT, VERDICT_RESOLVED, VERDICT_MERGE, VERDICT_SINGLE):
+        print(f"  {verdict}: {(clusters['verdict'] == verdict).sum()}")
+    merge_cards = report[(report['verdict'] == VERDICT_MERGE) & (report['node_type'] == 'card')]
+    print(f"TBC cards in MERGE clusters: {len(merge_cards)} in {merge_cards['cluster_id'].nunique()} clusters")
+    for cluster_id in conflicts[:10]:
+        names = report.loc[(report['cluster_id'] == cluster_id) & (report['node_type'] == 'name'), 'value']
+        print(f"  CONFLICT {cluster_id}: Arcadia ids {clusters.at[cluster_id, 'arcadia_ids']} <- "
+              f"{', '.join(names.head(4))}{' ...' if len(names) > 4 else ''}")
+    print(f"\nSaved clusters to: {args.output}")
+    print(f"Saved conflict evidence to: {args.review_output}")
+
+    write_metrics('resolve_entities')
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
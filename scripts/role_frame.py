@@ -0,0 +1,43 @@
+"""
+Exploded role frame: one row per (IG_ID, company, role) link
+Company cards store their deals as parallel comma-separated lists in IG_ID and
+ig_role ("2215, 4143" / "lead, target"). This turns them into a long frame once,
+so per-deal checks become groupby / merge operations instead of string parsing.
+
+Pairs follow zip() semantics: the n-th IG_ID goes with the n-th role and extra
+entries on the longer side are dropped.
+"""
+
+import pandas as pd
+
+INVESTOR_ROLES = ('lead', 'participant')
+KNOWN_ROLES = ('target',) + INVESTOR_ROLES
+
+def normalize_ig_ids(values):
+    """IG_IDs as strings without the '.0' left by float columns"""
+    return values.astype(str).str.strip().str.replace('.0', '', regex=False)
+
+def build_role_frame(companies_df, company_column='name'):
+    """
+    Columns: row (index of the company card), position, ig_id, company, role
+    Only cards with both IG_ID and ig_role are included.
+    """
+    linked = companies_df[companies_df['IG_ID'].notna() & companies_df['ig_role'].notna()]
+
+    ig_ids = linked['IG_ID'].astype(str).str.split(',').explode()
+    roles = linked['ig_role'].astype(str).str.split(',').explode()
+
+    ig_ids = pd.DataFrame({
+        'row': ig_ids.index,
+        'position': ig_ids.groupby(level=0).cumcount().to_numpy(),
+        'ig_id': normalize_ig_ids(ig_ids).to_numpy()
+    })
+    roles = pd.DataFrame({
+        'row': roles.index,
+        'position': roles.groupby(level=0).cumcount().to_numpy(),
+        'role': roles.str.strip().to_numpy()
+    })
+
+    frame = ig_ids.merge(roles, on=['row', 'position'], how='inner', sort=False)
+    frame['company'] = linked.loc[frame['row'], company_column].to_numpy()
+    return frame[['row', 'position', 'ig_id', 'company', 'role']]
@@ -5,51 +5,109 @@ Created: 2025-09-03
 Purpose: Systematically scan all Short descriptions in batches to identify ALL encoding issues
 """
 
+import argparse
+import re
 import pandas as pd
 import json
+from functools import lru_cache
 from pathlib import Path
 from collections import defaultdict
 from datetime import datetime
 
+from phase_metrics import timed_phase, track_phase, write_metrics
+
+# One match per run of consecutive non-ASCII characters
+NON_ASCII_RUN = re.compile(r'[^\x00-\x7f]+')
+
+def text_columns(df):
+    """Columns holding text (object / string dtypes)"""
+    return list(df.select_dtypes(include=['object', 'string']).columns)
+
+@lru_cache(maxsize=None)
+def repair_mojibake(run):
+    """
+    UTF-8 text that was decoded as Windows-1252 ('Ã©' for 'é', 'â€™' for '’')
+    round-trips back through cp1252 -> utf-8. Returns the repaired text, or None
+    when the run is not mojibake (a genuine accented letter or symbol).
+    """
+    try:
+        repaired = run.encode('cp1252').decode('utf-8')
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return None
+    return repaired if repaired != run else None
+
+def iter_non_ascii_runs(values):
+    """(index label, text, match) for every non-ASCII run; rows without one are skipped without a Python loop"""
+    values = values.dropna()
+    texts = values.astype(str)
+    texts = texts[texts.str.contains(NON_ASCII_RUN.pattern, regex=True)]
+    for idx, text in texts.items():
+        for match in NON_ASCII_RUN.finditer(text):
+            yield idx, text, match
+
+def context_of(text, start, end, width=10):
+    return text[max(0, start - width):min(len(text), end + width)]
+
+@timed_phase('scan_table', rows=lambda df, columns=None, id_column='IG_ID': len(df))
+def scan_table(df, columns=None, id_column='IG_ID'):
+    """
+    Non-ASCII runs across the text columns of any table, one row per run,
+    with the likely-mojibake flag and the cp1252 -> utf-8 repair suggestion
+    """
+    columns = columns or text_columns(df)
+    ig_ids = df[id_column] if id_column in df.columns else pd.Series(None, index=df.index)
+    
+    runs = []
+    for column in columns:
+        for idx, text, match in iter_non_ascii_runs(df[column]):
+            sequence = match.group()
+            repaired = repair_mojibake(sequence)
+            runs.append({
+                'column': column,
+                'row': idx + 2,  # Excel row number
+                'ig_id': ig_ids[idx],
+                'position': match.start(),
+                'sequence': sequence,
+                'length': len(sequence),
+                'mojibake': repaired is not None,
+                'suggested': repaired if repaired is not None else '',
+                'context': context_of(text, match.start(), match.end())
+            })
+    
+    return pd.DataFrame(runs, columns=['column', 'row', 'ig_id', 'position', 'sequence', 'length',
+                                       'mojibake', 'suggested', 'context'])
+
 def scan_batch(df, start_idx, end_idx, batch_num):
     """Scan a batch of rows for encoding issues"""
     
     issues = []
     char_frequency = defaultdict(int)
     
-    for idx in range(start_idx, min(end_idx, len(df))):
-        row_num = idx + 2  # Excel row number
-        ig_id = df.at[idx, 'IG_ID']
-        short_desc = df.at[idx, 'Short Deal Description']
+    batch = df['Short Deal Description'].iloc[start_idx:end_idx]
+    batch = batch[batch != '']
+    
+    for idx, text, match in iter_non_ascii_runs(batch):
+        full_text = text[:100] + '...' if len(text) > 100 else text
         
-        if pd.notna(short_desc) and short_desc != '':
-            text = str(short_desc)
+        for pos in range(match.start(), match.end()):
+            char = text[pos]
+            char_frequency[char] += 1
             
-            # Scan each character
-            for pos, char in enumerate(text):
-                if ord(char) > 127:  # Non-ASCII character
-                    char_frequency[char] += 1
-                    
-                    # Get context (10 chars before and after)
-                    start = max(0, pos - 10)
-                    end = min(len(text), pos + 11)
-                    context = text[start:end]
-                    
-                    issues.append({
-                        'batch': batch_num,
-                        'row': row_num,
-                        'ig_id': ig_id,
-                        'position': pos,
-                        'character': char,
-                        'ascii_code': ord(char),
-                        'hex_code': hex(ord(char)),
-                        'context': context,
-                        'full_text': text[:100] + '...' if len(text) > 100 else text
-                    })
+            issues.append({
+                'batch': batch_num,
+                'row': idx + 2,  # Excel row number
+                'ig_id': df.at[idx, 'IG_ID'],
+                'position': pos,
+                'character': char,
+                'ascii_code': ord(char),
+                'hex_code': hex(ord(char)),
+                'context': context_of(text, pos, pos + 1),  # 10 chars before and after
+                'full_text': full_text
+            })
     
     return issues, char_frequency
 
-def main():
+def main(input_file='../output/ig_arc_unmapped_FINAL_COMPLETE.csv', columns=None):
     """Main execution function"""
     
     print("=" * 70)
@@ -57,7 +115,7 @@ def main():
     print("=" * 70)
     
     # Load data
-    input_file = Path('../output/ig_arc_unmapped_FINAL_COMPLETE.csv')
+    input_file = Path(input_file)
     print(f"\n1. Loading data from: {input_file}")
     df = pd.read_csv(input_file, encoding='utf-8')
     total_rows = len(df)
@@ -68,6 +126,13 @@ def main():
     num_batches = (total_rows + batch_size - 1) // batch_size
     print(f"   Processing in {num_batches} batches of {batch_size} rows")
     
+    # Every text column in one pass; the batch report below covers descriptions
+    column_runs = scan_table(df, columns)
+    runs_file = Path('../output/encoding_issues_runs.csv')
+    column_runs.to_csv(runs_file, index=False, encoding='utf-8')
+    print(f"   Non-ASCII runs across {column_runs['column'].nunique()} text columns: {len(column_runs)} "
+          f"({int(column_runs['mojibake'].sum())} likely mojibake)")
+    
     # Initialize tracking
     all_issues = []
     global_char_frequency = defaultdict(int)
@@ -85,44 +150,45 @@ def main():
         f.write("## Batch-by-Batch Scan Results\n\n")
         
         # Process each batch
-        for batch_num in range(num_batches):
-            start_idx = batch_num * batch_size
-            end_idx = start_idx + batch_size
+        with track_phase('scan_batches', rows=total_rows):
+            for batch_num in range(num_batches):
+                start_idx = batch_num * batch_size
+                end_idx = start_idx + batch_size
             
-            print(f"\n2. Processing Batch {batch_num + 1}/{num_batches} (rows {start_idx + 2}-{min(end_idx + 1, total_rows + 1)})")
+                print(f"\n2. Processing Batch {batch_num + 1}/{num_batches} (rows {start_idx + 2}-{min(end_idx + 1, total_rows + 1)})")
             
-            # Scan this batch
-            batch_issues, batch_chars = scan_batch(df, start_idx, end_idx, batch_num + 1)
+                # Scan this batch
+                batch_issues, batch_chars = scan_batch(df, start_idx, end_idx, batch_num + 1)
             
-            # Update global tracking
-            all_issues.extend(batch_issues)
-            for char, count in batch_chars.items():
-                global_char_frequency[char] += count
+                # Update global tracking
+                all_issues.extend(batch_issues)
+                for char, count in batch_chars.items():
+                    global_char_frequency[char] += count
             
-            # Write batch results to report
-            f.write(f"### Batch {batch_num + 1} (Rows {start_idx + 2}-{min(end_idx + 1, total_rows + 1)})\n")
+                # Write batch results to report
+                f.write(f"### Batch {batch_num + 1} (Rows {start_idx + 2}-{min(end_idx + 1, total_rows + 1)})\n")
             
-            if batch_issues:
-                f.write(f"- **Issues Found**: {len(batch_issues)}\n")
-                f.write("- **Unique Characters**: ")
-                unique_chars = list(set(issue['character'] for issue in batch_issues))
-                for char in unique_chars[:10]:  # Show first 10
-                    f.write(f"`{char}` (U+{ord(char):04X}) ")
-                if len(unique_chars) > 10:
-                    f.write(f"... and {len(unique_chars) - 10} more")
-                f.write("\n\n")
+                if batch_issues:
+                    f.write(f"- **Issues Found**: {len(batch_issues)}\n")
+                    f.write("- **Unique Characters**: ")
+                    unique_chars = list(set(issue['character'] for issue in batch_issues))
+                    for char in unique_chars[:10]:  # Show first 10
+                        f.write(f"`{char}` (U+{ord(char):04X}) ")
+                    if len(unique_chars) > 10:
+                        f.write(f"... and {len(unique_chars) - 10} more")
+                    f.write("\n\n")
                 
-                # Sample issues from this batch
-                f.write("**Sample Issues:**\n")
-                for issue in batch_issues[:5]:  # Show first 5 issues
-                    f.write(f"- Row {issue['row']}: `{issue['character']}` at position {issue['position']}\n")
-                    f.write(f"  Context: `...{issue['context']}...`\n")
-            else:
-                f.write("- **No encoding issues found**\n\n")
+                    # Sample issues from this batch
+                    f.write("**Sample Issues:**\n")
+                    for issue in batch_issues[:5]:  # Show first 5 issues
+                        f.write(f"- Row {issue['row']}: `{issue['character']}` at position {issue['position']}\n")
+                        f.write(f"  Context: `...{issue['context']}...`\n")
+                else:
+                    f.write("- **No encoding issues found**\n\n")
             
-            print(f"   Found {len(batch_issues)} encoding issues")
-            if batch_issues:
-                print(f"   Unique characters: {len(set(issue['character'] for issue in batch_issues))}")
+                print(f"   Found {len(batch_issues)} encoding issues")
+                if batch_issues:
+                    print(f"   Unique characters: {len(set(issue['character'] for issue in batch_issues))}")
         
         # Write summary
         f.write("\n---\n\n")
@@ -173,6 +239,27 @@ def main():
         if len(sorted_chars) > 50:
             f.write(f"\n*... and {len(sorted_chars) - 50} more unique characters*\n")
         
+        # All text columns, with mojibake classification
+        f.write("\n## Non-ASCII Runs by Column\n\n")
+        f.write("| Column | Runs | Affected Rows | Likely Mojibake |\n")
+        f.write("|--------|------|---------------|-----------------|\n")
+        for column, group in column_runs.groupby('column', sort=False):
+            f.write(f"| {column} | {len(group)} | {group['row'].nunique()} | {int(group['mojibake'].sum())} |\n")
+        
+        mojibake = column_runs[column_runs['mojibake']]
+        f.write("\n## Likely Mojibake Sequences\n\n")
+        if len(mojibake):
+            f.write("| Sequence | Suggested | Occurrences |\n")
+            f.write("|----------|-----------|-------------|\n")
+            for (sequence, suggested), count in mojibake.groupby(['sequence', 'suggested']).size().sort_values(ascending=False).items():
+                f.write(f"| `{sequence}` | `{suggested}` | {count} |\n")
+            f.write("\n**Sample Occurrences:**\n")
+            for issue in mojibake.head(20).itertuples():
+                f.write(f"- {issue.column}, Row {issue.row}: `{issue.sequence}` -> `{issue.suggested}`\n")
+                f.write(f"  Context: `...{issue.context}...`\n")
+        else:
+            f.write("- **No mojibake sequences found**\n")
+        
         # Affected rows list
         f.write("\n## Affected Rows\n\n")
         affected_rows = sorted(set(issue['row'] for issue in all_issues))
@@ -235,11 +322,13 @@ def main():
         'unique_characters': len(global_char_frequency),
         'character_frequency': {char: count for char, count in sorted_chars},
         'character_mapping': char_mapping,
-        'sample_issues': all_issues[:100]  # First 100 issues
+        'sample_issues': all_issues[:100],  # First 100 issues
+        'runs_by_column': column_runs.groupby('column', sort=False).size().to_dict(),
+        'mojibake': column_runs[column_runs['mojibake']].to_dict('records')
     }
     
     with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(json_data, f, ensure_ascii=False, indent=2)
+        json.dump(json_data, f, ensure_ascii=False, indent=2, default=str)
     
     print("\n" + "=" * 70)
     print("SCAN COMPLETE!")
@@ -248,11 +337,21 @@ def main():
     print(f"  Total issues found: {len(all_issues)}")
     print(f"  Affected rows: {len(affected_rows)} of {total_rows}")
     print(f"  Unique problematic characters: {len(global_char_frequency)}")
+    print(f"  Likely mojibake runs (all columns): {int(column_runs['mojibake'].sum())}")
     print(f"\nReports generated:")
     print(f"  - {report_file}")
     print(f"  - {json_file}")
+    print(f"  - {runs_file}")
+    
+    write_metrics('scan_encoding_issues', directory='../output/metrics')
     
     return json_data
 
 if __name__ == "__main__":
-    results = main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Scan text columns for non-ASCII characters and mojibake')
+    parser.add_argument('--input', default='../output/ig_arc_unmapped_FINAL_COMPLETE.csv',
+                        help='CSV file to scan')
+    parser.add_argument('--columns', nargs='+',
+                        help='Text columns to scan (default: all text columns)')
+    args = parser.parse_args()
+    results = main(args.input, args.columns)
\ No newline at end of file
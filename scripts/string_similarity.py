@@ -0,0 +1,66 @@
+"""
+Jaro-Winkler similarity, as used by Arcadia's company name validation
+(docs/01_arcadia_system.md: names at or above 0.89 need override_similar).
+Pure Python, no optional dependencies.
+"""
+
+ARCADIA_SIMILARITY_THRESHOLD = 0.89
+
+def jaro(s1, s2):
+    """Jaro similarity between two strings, 0.0 to 1.0"""
+    if s1 == s2:
+        return 1.0
+    len1, len2 = len(s1), len(s2)
+    if not len1 or not len2:
+        return 0.0
+
+    window = max(max(len1, len2) // 2 - 1, 0)
+    matched1 = [False] * len1
+    matched2 = [False] * len2
+    matches = 0
+
+    for i, ch in enumerate(s1):
+        start = max(0, i - window)
+        end = min(i + window + 1, len2)
+        for j in range(start, end):
+            if not matched2[j] and s2[j] == ch:
+                matched1[i] = matched2[j] = True
+                matches += 1
+                break
+
+    if not matches:
+        return 0.0
+
+    transpositions = 0
+    j = 0
+    for i in range(len1):
+        if matched1[i]:
+            while not matched2[j]:
+                j += 1
+            if s1[i] != s2[j]:
+                transpositions += 1
+            j += 1
+
+    transpositions //= 2
+    return (matches / len1 + matches / len2 + (matches - transpositions) / matches) / 3
+
+def jaro_winkler(s1, s2, prefix_weight=0.1, max_prefix=4):
+    """Jaro-Winkler similarity: Jaro boosted by the common prefix (up to 4 chars)"""
+    score = jaro(s1, s2)
+    prefix = 0
+    for a, b in zip(s1[:max_prefix], s2[:max_prefix]):
+        if a != b:
+            break
+        prefix += 1
+    return score + prefix * prefix_weight * (1 - score)
+
+def jaro_winkler_upper_bound(len1, len2, prefix_weight=0.1, max_prefix=4):
+    """
+    Highest Jaro-Winkler score two strings of these lengths can reach
+    (all characters of the shorter string matched, no transpositions, full prefix)
+    """
+    if not len1 or not len2:
+        return 0.0
+    shorter = min(len1, len2)
+    jaro_bound = (shorter / len1 + shorter / len2 + 1) / 3
+    return jaro_bound + min(shorter, max_prefix) * prefix_weight * (1 - jaro_bound)
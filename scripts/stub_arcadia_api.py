@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Local stub of the Arcadia company / transaction API
+Created: 2025-09-10
+Purpose: Offline load testing for upload_import_payloads.py. Mimics the documented
+API surface (docs/01_arcadia_system.md, sections 2.2, 4 and 8):
+  - JWT (HS256) bearer authentication on every request
+  - POST /api/companies/ and /api/transactions/ (one object or a JSON list = batch)
+  - GET on the same paths returns counts; PUT / PATCH / DELETE -> 405
+    {"detail": "Method 'PUT' not allowed."}
+  - Company names: exact (case-insensitive) match is rejected, Jaro-Winkler >= 0.89
+    against name / also_known_as is rejected unless override_similar is true
+  - Errors use the VALIDATION_ERROR format; a batch is created all-or-nothing
+  - Idempotency-Key: a repeated key replays the first response instead of creating again
+
+Existing companies are seeded from src/company-names-arcadia.csv so Arcadia IDs emitted by
+the import prep resolve. --latency-ms and --error-rate (503s) exercise the uploader's retries.
+
+Usage:
+    py scripts/stub_arcadia_api.py --port 8765
+    py scripts/stub_arcadia_api.py --latency-ms 25 --error-rate 0.05 --no-similarity-check
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import pandas as pd
+
+from check_name_collisions import SimilarNameIndex
+
+DEFAULT_PORT = 8765
+DEFAULT_SECRET = 'arcadia-stub-secret'
+ENDPOINTS = {'/api/companies/': 'companies', '/api/transactions/': 'transactions'}
+FIRST_NEW_ID = 100000  # above every real Arcadia company ID
+MAX_OTHER_INVESTORS = 10
+
+# ----------------------------------------------------------------------
+# JWT (HS256) - enough of simplejwt to issue and check bearer tokens
+# ----------------------------------------------------------------------
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+def _sign(secret, signing_input):
+    return _b64encode(hmac.new(secret.encode('utf-8'), signing_input.encode('ascii'), hashlib.sha256).digest())
+
+def issue_token(secret=DEFAULT_SECRET, subject='importer', ttl=12 * 3600):
+    header = _b64encode(json.dumps({'alg': 'HS256', 'typ': 'JWT'}).encode('utf-8'))
+    payload = _b64encode(json.dumps({'sub': subject, 'exp': int(time.time()) + ttl}).encode('utf-8'))
+    return f"{header}.{payload}.{_sign(secret, f'{header}.{payload}')}"
+
+def verify_token(token, secret=DEFAULT_SECRET):
+    try:
+        header, payload, signature = token.split('.')
+        if not hmac.compare_digest(signature, _sign(secret, f"{header}.{payload}")):
+            return False
+        claims = json.loads(_b64decode(payload))
+    except (ValueError, TypeError):
+        return False
+    return claims.get('exp', 0) > time.time()
+
+def validation_error(errors, message='Validation failed'):
+    return {'status': 'error', 'code': 'VALIDATION_ERROR', 'message': message, 'errors': errors}
+
+# ----------------------------------------------------------------------
+# In-memory Arcadia
+# ----------------------------------------------------------------------
+class ArcadiaStubState:
+    def __init__(self, companies_df=None, similarity_check=True):
+        self.lock = threading.Lock()
+        self.similarity_check = similarity_check
+        self.company_names = {}                    # id -> name
+        self.exact_names = set()                   # lowercased names
+        self.similarity_pool = SimilarNameIndex()  # names and also_known_as entries
+        self.transactions = {}
+        self.next_id = FIRST_NEW_ID
+        self.responses = {}                        # Idempotency-Key -> (status, body)
+        self.stats = Counter()
+
+        if companies_df is not None:
+            for company_id, name, aka in zip(companies_df['id'], companies_df['name'],
+                                             companies_df.get('also_known_as', pd.Series(index=companies_df.index))):
+                self._add_company(int(company_id), str(name), aka)
+
+    def _add_company(self, company_id, name, also_known_as=None):
+        self.company_names[company_id] = name
+        self.exact_names.add(name.lower())
+        aliases = [alias.strip() for alias in also_known_as.split(',')] if isinstance(also_known_as, str) else []
+        self.similarity_pool.add([name] + [alias for alias in aliases if alias])
+
+    def similar_names(self, name):
+        """(existing name, score %) at or above the Arcadia threshold"""
+        return [(other, round(score * 100)) for other, score, _ in self.similarity_pool.similar(name)]
+
+    def company_errors(self, item, batch_names):
+        name = str(item.get('name') or '').strip()
+        if len(name) < 2 or len(name) > 100:
+            return {'name': ['Ensure this field has between 2 and 100 characters.']}
+        if name.lower() in self.exact_names or name.lower() in batch_names:
+            return {'name': ['A company with this exact name already exists.']}
+        if self.similarity_check and not item.get('override_similar'):
+            similar = self.similar_names(name)
+            if similar:
+                similar_str = ', '.join(f"{other} ({score}%)" for other, score in similar[:5])
+                return {'name': [f"A company with a similar name already exists: {similar_str}. "
+                                 "Please check the Force creation or editing option if you wish to continue."]}
+        return {}
+
+    def transaction_errors(self, item):
+        errors = {}
+        for field in ('announcement_date', 'transaction_type', 'target_company'):
+            if item.get(field) in (None, ''):
+                errors[field] = ['This field is required.']
+        if item.get('target_company') not in (None, '') and item['target_company'] not in self.company_names:
+            errors['target_company'] = [f"Invalid pk \"{item['target_company']}\" - object does not exist."]
+        for field in ('lead_investors', 'other_investors'):
+            missing = [company_id for company_id in item.get(field) or [] if company_id not in self.company_names]
+            if missing:
+                errors[field] = [f"Invalid pk \"{company_id}\" - object does not exist." for company_id in missing]
+        if len(item.get('other_investors') or []) > MAX_OTHER_INVESTORS:
+            errors.setdefault('other_investors', []).append(f"Select at most {MAX_OTHER_INVESTORS} other investors.")
+        return errors
+
+    def create(self, resource, items):
+        """All-or-nothing batch create; returns (HTTP status, body)"""
+        with self.lock:
+            errors = {}
+            batch_names = set()
+            for position, item in enumerate(items):
+                if not isinstance(item, dict):
+                    errors[f"{position}"] = ['Expected an object.']
+                    continue
+                if resource == 'companies':
+                    item_errors = self.company_errors(item, batch_names)
+                    batch_names.add(str(item.get('name') or '').strip().lower())
+                else:
+                    item_errors = self.transaction_errors(item)
+                errors.update({f"{position}.{field}": messages for field, messages in item_errors.items()})
+            if errors:
+                self.stats[f'{resource}_rejected'] += len(items)
+                return 400, validation_error(errors)
+
+            results = []
+            for item in items:
+                new_id = self.next_id
+                self.next_id += 1
+                if resource == 'companies':
+                    self._add_company(new_id, str(item['name']).strip())
+                else:
+                    self.transactions[new_id] = item
+                results.append({'id': new_id, 'client_ref': item.get('client_ref')})
+            self.stats[f'{resource}_created'] += len(items)
+            return 201, {'status': 'created', 'results': results}
+
+    def count(self, resource):
+        with self.lock:
+            total = len(self.company_names) if resource == 'companies' else len(self.transactions)
+            return {'count': total, 'stats': dict(self.stats)}
+
+# ----------------------------------------------------------------------
+# HTTP handler
+# ----------------------------------------------------------------------
+class ArcadiaStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'ArcadiaStub/1.0'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _authorized(self):
+        auth = self.headers.get('Authorization', '')
+        if not auth.startswith('Bearer '):
+            self._send(401, {'detail': 'Authentication credentials were not provided.'})
+            return False
+        if not verify_token(auth[len('Bearer '):], self.server.secret):
+            self._send(401, {'detail': 'Given token not valid for any token type'})
+            return False
+        return True
+
+    def _resource(self):
+        resource = ENDPOINTS.get(urlparse(self.path).path)
+        if resource is None:
+            self._send(404, {'detail': 'Not found.'})
+        return resource
+
+    def _simulate_load(self):
+        """Latency and injected 503s; returns False when the request was failed"""
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.error_rate and self.server.random.random() < self.server.error_rate:
+            self.server.state.stats['injected_errors'] += 1
+            self._send(503, {'detail': 'Service temporarily unavailable.'}, {'Retry-After': '0'})
+            return False
+        return True
+
+    def do_GET(self):
+        if self._authorized() and (resource := self._resource()):
+            self._send(200, self.server.state.count(resource))
+
+    def do_POST(self):
+        body = self._read_body()
+        if not self._authorized() or not (resource := self._resource()) or not self._simulate_load():
+            return
+
+        key = self.headers.get('Idempotency-Key')
+        state = self.server.state
+        if key and key in state.responses:
+            state.stats['idempotent_replays'] += 1
+            status, response = state.responses[key]
+            self._send(status, response, {'Idempotent-Replayed': 'true'})
+            return
+
+        try:
+            payload = json.loads(body or b'null')
+        except ValueError:
+            self._send(400, validation_error({'non_field_errors': ['Invalid JSON body.']}))
+            return
+        items = payload if isinstance(payload, list) else [payload]
+
+        status, response = state.create(resource, items)
+        if key:
+            state.responses[key] = (status, response)
+        self._send(status, response)
+
+    def _method_not_allowed(self):
+        self._read_body()
+        if self._authorized():
+            self._send(405, {'detail': f"Method '{self.command}' not allowed."}, {'Allow': 'GET, POST, HEAD, OPTIONS'})
+
+    do_PUT = _method_not_allowed
+    do_PATCH = _method_not_allowed
+    do_DELETE = _method_not_allowed
+
+class ArcadiaStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, state, secret=DEFAULT_SECRET, latency_ms=0, error_rate=0.0, seed=0, verbose=False):
+        super().__init__(address, ArcadiaStubHandler)
+        self.state = state
+        self.secret = secret
+        self.latency = latency_ms / 1000
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.verbose = verbose
+
+def load_seed_companies(path='src/company-names-arcadia.csv'):
+    if not os.path.exists(path):
+        print(f"[WARNING] {path} not found - stub starts with no existing companies")
+        return None
+    return pd.read_csv(path, usecols=['id', 'name', 'also_known_as'])
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stub of the Arcadia company / transaction API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--secret', default=DEFAULT_SECRET, help='HS256 secret for bearer tokens')
+    parser.add_argument('--companies', default='src/company-names-arcadia.csv', help='Existing companies to seed')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Added latency per POST')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of POSTs answered with 503')
+    parser.add_argument('--no-similarity-check', action='store_true', help='Skip the Jaro-Winkler name check')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    state = ArcadiaStubState(load_seed_companies(args.companies), similarity_check=not args.no_similarity_check)
+    server = ArcadiaStubServer((args.host, args.port), state, secret=args.secret, latency_ms=args.latency_ms,
+                               error_rate=args.error_rate, seed=args.seed, verbose=args.verbose)
+
+    print(f"[STUB] Arcadia API on http://{args.host}:{args.port} ({len(state.company_names)} existing companies)")
+    print(f"[STUB] Token: {issue_token(args.secret)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n[STUB] Stats: {dict(state.stats)}")
+
+if __name__ == "__main__":
+    main()
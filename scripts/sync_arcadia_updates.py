@@ -11,6 +11,19 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import json
+import argparse
+
+from checkpoint_store import CheckpointStore
+from phase_metrics import timed_phase, write_metrics
+
+# Columns owned by Arcadia; arc_website, IG_ID and ig_role are ours and never overwritten
+ARCADIA_COLUMNS = [
+    'id', 'status', 'name', 'also_known_as', 'aliases', 'type',
+    'founded', 'hq_country', 'hq_region', 'ownership', 'sector',
+    'segment', 'features', 'specialization', 'aum', 'parent_company',
+    'transactions_count', 'was_added', 'created_by', 'was_changed',
+    'modified_by', 'search_index'
+]
 
 class ArcadiaSync:
     def __init__(self):
@@ -24,7 +37,28 @@ class ArcadiaSync:
             'issues_found': 0,
             'companies_without_id': 0
         }
-        
+        self.checkpoints = CheckpointStore('sync_arcadia_updates', input_files=[
+            'output/arcadia_company_unmapped.csv', 'src/company-names-arcadia.csv'
+        ])
+        
+    def checkpoint(self, phase):
+        """Checkpoint the pending write and logs after a completed phase"""
+        self.checkpoints.save(phase, {
+            'unmapped_df': self.unmapped_df,
+            'change_log': self.change_log,
+            'issues': self.issues,
+            'stats': self.stats
+        })
+    
+    def restore(self, phase):
+        """Restore state from a completed phase checkpoint"""
+        state = self.checkpoints.load(phase)
+        self.unmapped_df = state['unmapped_df']
+        self.change_log = state['change_log']
+        self.issues = state['issues']
+        self.stats = state['stats']
+    
+    @timed_phase('load_data')
     def load_data(self):
         """Load both CSV files"""
         print("[LOAD] Loading data files...")
@@ -41,10 +75,8 @@ class ArcadiaSync:
         
         self.stats['total_companies'] = len(self.unmapped_df)
         
-        # Create Arcadia lookup by ID
-        self.arcadia_lookup = {}
-        for _, row in self.arcadia_df.iterrows():
-            self.arcadia_lookup[row['id']] = row.to_dict()
+        # Create Arcadia lookup by ID (last row wins for duplicated IDs)
+        self.arcadia_by_id = self.arcadia_df.drop_duplicates('id', keep='last').set_index('id', drop=False)
         
         return True
     
@@ -86,26 +118,29 @@ class ArcadiaSync:
         """Validate IG_ID count matches ig_role count"""
         print("\n[VALIDATE] Checking IG_ID and ig_role count match...")
         
+        # Count IDs and roles by their separators instead of splitting every row
+        both = df[df['IG_ID'].notna() & df['ig_role'].notna()]
+        ig_counts = both['IG_ID'].astype(str).str.count(', ') + 1
+        role_counts = both['ig_role'].astype(str).str.count(', ') + 1
+        mismatched = both[ig_counts != role_counts]
+        
         mismatches = []
-        for idx, row in df.iterrows():
-            if pd.notna(row.get('IG_ID')) and pd.notna(row.get('ig_role')):
-                ig_ids = str(row['IG_ID']).split(', ')
-                roles = str(row['ig_role']).split(', ')
-                
-                if len(ig_ids) != len(roles):
-                    mismatches.append({
-                        'company': row['name'],
-                        'ig_count': len(ig_ids),
-                        'role_count': len(roles),
-                        'ig_ids': row['IG_ID'],
-                        'roles': row['ig_role']
-                    })
-                    self.issues.append({
-                        'type': 'count_mismatch',
-                        'company': row['name'],
-                        'ig_count': len(ig_ids),
-                        'role_count': len(roles)
-                    })
+        for name, ig_count, role_count, ig_ids, roles in zip(
+                mismatched['name'], ig_counts[mismatched.index], role_counts[mismatched.index],
+                mismatched['IG_ID'], mismatched['ig_role']):
+            mismatches.append({
+                'company': name,
+                'ig_count': int(ig_count),
+                'role_count': int(role_count),
+                'ig_ids': ig_ids,
+                'roles': roles
+            })
+            self.issues.append({
+                'type': 'count_mismatch',
+                'company': name,
+                'ig_count': int(ig_count),
+                'role_count': int(role_count)
+            })
         
         if mismatches:
             print(f"  [ERROR] Found {len(mismatches)} mismatches:")
@@ -126,16 +161,8 @@ class ArcadiaSync:
         }
         
         # Update with Arcadia data
-        arcadia_columns = [
-            'id', 'status', 'name', 'also_known_as', 'aliases', 'type',
-            'founded', 'hq_country', 'hq_region', 'ownership', 'sector',
-            'segment', 'features', 'specialization', 'aum', 'parent_company',
-            'transactions_count', 'was_added', 'created_by', 'was_changed',
-            'modified_by', 'search_index'
-        ]
-        
         updated = row.copy()
-        for col in arcadia_columns:
+        for col in ARCADIA_COLUMNS:
             if col in arcadia_data:
                 updated[col] = arcadia_data[col]
         
@@ -145,131 +172,136 @@ class ArcadiaSync:
         
         return updated
     
+    @timed_phase('merge_companies_by_id', rows=lambda self: len(self.unmapped_df))
     def merge_companies_by_id(self):
         """Merge companies with the same ID"""
         print("\n[MERGE] Merging companies with same IDs...")
         
-        # Group by ID (only for companies with IDs)
-        id_groups = self.unmapped_df[self.unmapped_df['id'].notna()].groupby('id')
-        
-        merged_rows = []
-        companies_to_remove = []
-        
-        for arc_id, group in id_groups:
-            if len(group) > 1:
-                print(f"\n  Merging ID {int(arc_id)} ({len(group)} entries):")
-                
-                # Get Arcadia data for this ID
-                if arc_id in self.arcadia_lookup:
-                    arcadia_data = self.arcadia_lookup[arc_id]
-                    
-                    # Collect all IG_IDs and roles maintaining order
-                    all_ig_ids = []
-                    all_roles = []
-                    
-                    for _, row in group.iterrows():
-                        print(f"    - {row['name']}: IG_ID={row.get('IG_ID', 'None')}")
-                        
-                        if pd.notna(row.get('IG_ID')):
-                            ig_ids = str(row['IG_ID']).split(', ')
-                            roles = str(row['ig_role']).split(', ') if pd.notna(row.get('ig_role')) else []
-                            
-                            all_ig_ids.extend(ig_ids)
-                            all_roles.extend(roles)
-                    
-                    # Create merged entry using Arcadia name
-                    merged = self.update_from_arcadia(group.iloc[0], arcadia_data)
-                    merged['name'] = arcadia_data['name']  # Use official Arcadia name
-                    
-                    # Concatenate IG_IDs and roles
-                    if all_ig_ids:
-                        merged['IG_ID'] = ', '.join(all_ig_ids)
-                    if all_roles:
-                        merged['ig_role'] = ', '.join(all_roles)
-                    
-                    # Preserve arc_website if any entry has it
-                    for _, row in group.iterrows():
-                        if pd.notna(row.get('arc_website')) and str(row['arc_website']).strip():
-                            merged['arc_website'] = row['arc_website']
-                            break
-                    
-                    print(f"    -> Merged as: {merged['name']} with {len(all_ig_ids)} IG_IDs")
-                    
-                    merged_rows.append(merged)
-                    companies_to_remove.extend(group.index.tolist())
-                    self.stats['merged_companies'] += 1
-                    
-                    # Log the merge
-                    self.change_log.append({
-                        'action': 'merge',
-                        'id': arc_id,
-                        'original_names': group['name'].tolist(),
-                        'new_name': merged['name'],
-                        'ig_ids': merged.get('IG_ID', '')
-                    })
-                else:
-                    self.issues.append({
-                        'type': 'missing_arcadia_id',
-                        'id': arc_id,
-                        'companies': group['name'].tolist()
-                    })
-                    print(f"    [ERROR] ID {arc_id} not found in Arcadia database")
+        # Rows whose ID appears more than once (only for companies with IDs)
+        with_id = self.unmapped_df[self.unmapped_df['id'].notna()]
+        duplicated = with_id[with_id['id'].duplicated(keep=False)]
+        if duplicated.empty:
+            return
+        
+        known = duplicated['id'].isin(self.arcadia_by_id.index)
+        
+        # IDs missing from Arcadia are reported and left as they are
+        for arc_id, names in duplicated[~known].groupby('id', sort=True)['name'].agg(list).items():
+            self.issues.append({
+                'type': 'missing_arcadia_id',
+                'id': arc_id,
+                'companies': names
+            })
+            print(f"    [ERROR] ID {arc_id} not found in Arcadia database")
+        
+        group_rows = duplicated[known]
+        if group_rows.empty:
+            return
+        
+        # One merged card per ID, starting from the first entry (groups in ID order)
+        merged = group_rows.drop_duplicates('id', keep='first').sort_values('id', kind='stable')
+        merged_ids = merged['id']
+        
+        # IG_IDs and roles concatenated in row order; roles only from rows that carry IG_IDs
+        with_ig = group_rows[group_rows['IG_ID'].notna()]
+        ig_ids = with_ig['IG_ID'].astype(str).groupby(with_ig['id']).agg(', '.join)
+        with_roles = with_ig[with_ig['ig_role'].notna()]
+        roles = with_roles['ig_role'].astype(str).groupby(with_roles['id']).agg(', '.join)
+        
+        # First non-blank arc_website of the group
+        websites = group_rows[group_rows['arc_website'].notna() &
+                              (group_rows['arc_website'].astype(str).str.strip() != '')]
+        websites = websites.drop_duplicates('id', keep='first').set_index('id')['arc_website']
+        
+        # Arcadia data with the official Arcadia name
+        arcadia_rows = self.arcadia_by_id.loc[merged_ids]
+        for col in ARCADIA_COLUMNS:
+            if col in arcadia_rows.columns:
+                merged[col] = arcadia_rows[col].to_numpy()
+        
+        merged_ig_ids = ig_ids.reindex(merged_ids).to_numpy()
+        merged_roles = roles.reindex(merged_ids).to_numpy()
+        merged_websites = websites.reindex(merged_ids).to_numpy()
+        merged['IG_ID'] = np.where(pd.notna(merged_ig_ids), merged_ig_ids, merged['IG_ID'].to_numpy())
+        merged['ig_role'] = np.where(pd.notna(merged_roles), merged_roles, merged['ig_role'].to_numpy())
+        merged['arc_website'] = np.where(pd.notna(merged_websites), merged_websites, merged['arc_website'].to_numpy())
+        
+        # Log the merges
+        original_names = group_rows.groupby('id', sort=True)['name'].agg(list)
+        merge_log = pd.DataFrame({
+            'action': 'merge',
+            'id': merged_ids.to_numpy(),
+            'original_names': original_names.reindex(merged_ids).to_numpy(),
+            'new_name': merged['name'].to_numpy(),
+            'ig_ids': merged['IG_ID'].to_numpy()
+        })
+        self.change_log.extend(merge_log.to_dict('records'))
+        self.stats['merged_companies'] += len(merged)
+        
+        for entry in self.change_log[-len(merged):][:10]:
+            print(f"  - ID {int(entry['id'])}: {', '.join(map(str, entry['original_names']))} -> {entry['new_name']}")
+        if len(merged) > 10:
+            print(f"  - ... and {len(merged) - 10} more")
         
         # Remove original rows and add merged ones
-        if companies_to_remove:
-            self.unmapped_df = self.unmapped_df.drop(companies_to_remove)
-            self.unmapped_df = pd.concat([self.unmapped_df, pd.DataFrame(merged_rows)], ignore_index=True)
-            print(f"\n  Total merges completed: {self.stats['merged_companies']}")
+        self.unmapped_df = self.unmapped_df.drop(group_rows.index)
+        self.unmapped_df = pd.concat([self.unmapped_df, merged], ignore_index=True)
+        print(f"\n  Total merges completed: {self.stats['merged_companies']}")
     
+    @timed_phase('update_all_with_ids', rows=lambda self: len(self.unmapped_df))
     def update_all_with_ids(self):
         """Update all companies that have IDs with latest Arcadia data"""
         print("\n[UPDATE] Refreshing all companies with IDs...")
         
-        companies_with_ids = self.unmapped_df[self.unmapped_df['id'].notna()]
-        updated_count = 0
-        
-        for idx, row in companies_with_ids.iterrows():
-            arc_id = row['id']
-            
-            if arc_id in self.arcadia_lookup:
-                arcadia_data = self.arcadia_lookup[arc_id]
-                
-                # Check if update needed
-                old_status = row['status']
-                old_name = row['name']
-                
-                # Update row
-                updated = self.update_from_arcadia(row, arcadia_data)
-                
-                # Update in dataframe
-                for col in updated.index:
-                    self.unmapped_df.at[idx, col] = updated[col]
-                
-                # Log if changed
-                if old_status != updated['status'] or old_name != updated['name']:
-                    updated_count += 1
-                    self.change_log.append({
-                        'action': 'update',
-                        'id': arc_id,
-                        'old_name': old_name,
-                        'new_name': updated['name'],
-                        'old_status': old_status,
-                        'new_status': updated['status']
-                    })
-                    
-                    if old_name != updated['name']:
-                        print(f"  - Updated name: {old_name} -> {updated['name']}")
-            else:
-                self.issues.append({
-                    'type': 'id_not_in_arcadia',
-                    'id': arc_id,
-                    'company': row['name']
-                })
-                print(f"  [ERROR] ID {int(arc_id)} not found in Arcadia for {row['name']}")
-        
+        ids = self.unmapped_df['id']
+        has_id = ids.notna()
+        in_arcadia = has_id & ids.isin(self.arcadia_by_id.index)
+        
+        # IDs that no longer exist in Arcadia
+        for idx in self.unmapped_df.index[has_id & ~in_arcadia]:
+            arc_id = self.unmapped_df.at[idx, 'id']
+            company = self.unmapped_df.at[idx, 'name']
+            self.issues.append({
+                'type': 'id_not_in_arcadia',
+                'id': arc_id,
+                'company': company
+            })
+            print(f"  [ERROR] ID {int(arc_id)} not found in Arcadia for {company}")
+        
+        # Arcadia rows aligned to the companies being refreshed
+        target_idx = self.unmapped_df.index[in_arcadia]
+        arcadia_rows = self.arcadia_by_id.loc[ids[in_arcadia]]
+        old_names = self.unmapped_df.loc[target_idx, 'name']
+        old_statuses = self.unmapped_df.loc[target_idx, 'status']
+        
+        # Overwrite Arcadia-owned columns in one step (arc_website, IG_ID, ig_role untouched)
+        for col in ARCADIA_COLUMNS:
+            if col in arcadia_rows.columns and col != 'id':
+                self.unmapped_df.loc[target_idx, col] = arcadia_rows[col].to_numpy()
+        
+        # Log if changed (NaN != NaN counts as a change, as before)
+        new_names = arcadia_rows['name'].to_numpy()
+        new_statuses = arcadia_rows['status'].to_numpy()
+        name_changed = old_names.to_numpy() != new_names
+        changed = name_changed | (old_statuses.to_numpy() != new_statuses)
+        
+        for pos in np.flatnonzero(changed):
+            self.change_log.append({
+                'action': 'update',
+                'id': ids.at[target_idx[pos]],
+                'old_name': old_names.iat[pos],
+                'new_name': new_names[pos],
+                'old_status': old_statuses.iat[pos],
+                'new_status': new_statuses[pos]
+            })
+            if name_changed[pos]:
+                print(f"  - Updated name: {old_names.iat[pos]} -> {new_names[pos]}")
+        
+        updated_count = int(changed.sum())
         self.stats['updated_companies'] = updated_count
         print(f"  - Total updates: {updated_count}")
     
+    @timed_phase('final_validation', rows=lambda self: len(self.unmapped_df))
     def final_validation(self):
         """Perform final validation checks"""
         print("\n[FINAL VALIDATION]")
@@ -288,13 +320,19 @@ class ArcadiaSync:
         print(f"    - Companies without ID: {self.stats['companies_without_id']}")
         print(f"    - Total issues found: {self.stats['issues_found']}")
     
+    @timed_phase('save_results')
     def save_results(self):
         """Save updated data and reports"""
         print("\n[SAVE] Saving results...")
         
         # Save updated companies
-        self.unmapped_df.to_csv('output/arcadia_company_unmapped.csv', index=False, encoding='utf-8')
-        print(f"  - Updated file saved: output/arcadia_company_unmapped.csv")
+        try:
+            self.unmapped_df.to_csv('output/arcadia_company_unmapped.csv', index=False, encoding='utf-8')
+            print(f"  - Updated file saved: output/arcadia_company_unmapped.csv")
+        except PermissionError:
+            print("  [ERROR] output/arcadia_company_unmapped.csv is locked (close it in Excel)")
+            print("  [INFO] Sync results are checkpointed - rerun with --resume to retry the save")
+            return False
         
         # Save change log
         if self.change_log:
@@ -310,6 +348,7 @@ class ArcadiaSync:
         
         # Generate summary report
         self.generate_report()
+        return True
     
     def generate_report(self):
         """Generate detailed markdown report"""
@@ -390,7 +429,7 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                     if update['old_name'] != update['new_name']:
                         report += f"- Name: {update['old_name']} -> {update['new_name']}\n"
                     if update['old_status'] != update['new_status']:
-                        report += f"- Status: {update['company']}: {update['old_status']} -> {update['new_status']}\n"
+                        report += f"- Status: {update['new_name']}: {update['old_status']} -> {update['new_status']}\n"
                 report += "\n"
         
         # Save report
@@ -405,7 +444,7 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         print(f"Companies without ID: {self.stats['companies_without_id']}")
         print(f"Issues requiring attention: {self.stats['issues_found']}")
 
-def main():
+def main(resume=False):
     print("[START] Arcadia Sync Process")
     print("="*60)
     
@@ -414,20 +453,44 @@ def main():
     # Load data
     syncer.load_data()
     
+    if resume:
+        syncer.checkpoints.resume()
+    else:
+        syncer.checkpoints.clear()
+    
     # Find manually mapped companies
     syncer.identify_manually_mapped()
     
     # Merge companies with same IDs
-    syncer.merge_companies_by_id()
+    if syncer.checkpoints.has('merge'):
+        syncer.restore('merge')
+    else:
+        syncer.merge_companies_by_id()
+        syncer.checkpoint('merge')
     
     # Update all companies with IDs
-    syncer.update_all_with_ids()
+    if syncer.checkpoints.has('update'):
+        syncer.restore('update')
+    else:
+        syncer.update_all_with_ids()
+        syncer.checkpoint('update')
     
     # Final validation
-    syncer.final_validation()
+    if syncer.checkpoints.has('validation'):
+        syncer.restore('validation')
+    else:
+        syncer.final_validation()
+        syncer.checkpoint('validation')
     
     # Save everything
-    syncer.save_results()
+    if syncer.save_results():
+        syncer.checkpoints.clear()
+    
+    write_metrics('sync_arcadia_updates')
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Sync company cards with the Arcadia database')
+    parser.add_argument('--resume', action='store_true',
+                        help='Pick up from the last completed phase of an interrupted run')
+    args = parser.parse_args()
+    main(resume=args.resume)
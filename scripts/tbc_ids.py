@@ -0,0 +1,66 @@
+"""
+Deterministic IDs for TO BE CREATED company cards
+The import prep used to number cards [1]TBC, [2]TBC, ... in row order, so IDs
+changed whenever the input changed and shards could not be processed separately.
+IDs are now derived from the normalized entity key (name + role): a blake2b hash
+of the key, base32-encoded to 8 characters, e.g. [K5QW3JXM]TBC.
+
+Two keys hashing to the same code are resolved by rehashing the later key (in
+sorted order) with a salt until the code is free, so allocate() gives the same
+IDs for the same set of keys whatever order they arrive in.
+
+Usage:
+    allocator = TbcIdAllocator()
+    ids = allocator.allocate([entity_key('BITKRAFT', 'lead'), ...])   # key -> [XXXXXXXX]TBC
+"""
+
+import base64
+import hashlib
+
+TBC_DIGEST_SIZE = 5  # 40 bits -> 8 base32 characters, no padding
+
+def entity_key(name, role):
+    """Normalized card key: casefolded name with collapsed whitespace, plus role"""
+    return f"{' '.join(str(name).split()).casefold()}_{role}"
+
+def tbc_code(key, salt=0):
+    data = key if not salt else f"{key}#{salt}"
+    digest = hashlib.blake2b(data.encode('utf-8'), digest_size=TBC_DIGEST_SIZE).digest()
+    return base64.b32encode(digest).decode('ascii')
+
+def format_tbc_id(code):
+    return f"[{code}]TBC"
+
+class TbcIdAllocator:
+    """Collision-checked key -> [XXXXXXXX]TBC assignment"""
+
+    def __init__(self):
+        self.ids = {}
+        self.owners = {}
+        self.collisions = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, key):
+        return key in self.ids
+
+    def get(self, key):
+        """ID for one key, assigned on first use (first come keeps the plain hash)"""
+        if key not in self.ids:
+            salt = 0
+            code = tbc_code(key)
+            while code in self.owners:
+                salt += 1
+                code = tbc_code(key, salt)
+            self.collisions += salt > 0
+            self.owners[code] = key
+            self.ids[key] = format_tbc_id(code)
+        return self.ids[key]
+
+    def allocate(self, keys):
+        """IDs for a batch of keys, new keys assigned in sorted order so the result is order-independent"""
+        keys = list(keys)
+        for key in sorted(set(keys) - self.ids.keys()):
+            self.get(key)
+        return {key: self.ids[key] for key in keys}
@@ -1,6 +1,8 @@
 import pandas as pd
 from datetime import datetime
 
+from id_resolver import IdResolver
+
 def update_to_be_created_companies():
     print("=" * 80)
     print("UPDATING TO BE CREATED COMPANIES WITH ARCADIA DATA")
@@ -27,16 +29,19 @@ def update_to_be_created_companies():
     
     updates_made = []
     
+    # Resolve all IDs against the Arcadia database in one batch
+    arcadia = IdResolver(arcadia_df, 'id')
+    found = arcadia.found(to_be_created_with_ids['id'])
+    arc_rows = arcadia.take(to_be_created_with_ids['id'])
+    arc_rows.index = to_be_created_with_ids.index[found]
+    
     for idx in to_be_created_with_ids.index:
         company_id = unmapped_df.loc[idx, 'id']
         original_name = unmapped_df.loc[idx, 'name']
         ig_id = unmapped_df.loc[idx, 'IG_ID']
         
-        # Find the company in Arcadia database
-        arc_match = arcadia_df[arcadia_df['id'] == company_id]
-        
-        if not arc_match.empty:
-            arc_row = arc_match.iloc[0]
+        if idx in arc_rows.index:
+            arc_row = arc_rows.loc[idx]
             
             # Update with Arcadia data
             unmapped_df.loc[idx, 'name'] = arc_row['name']
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Batched, concurrent upload of the import cards to the Arcadia API
+Created: 2025-09-10
+Purpose: Replace the manual import of TO BE CREATED companies and IMPORTED transactions.
+Reads the output of prepare_all_transactions_import.py, turns it into batched JSON payloads
+and POSTs them with bounded concurrency (asyncio + semaphore), retrying connection errors,
+429 and 5xx with exponential backoff and full jitter.
+
+Companies go first; the IDs Arcadia returns replace the [XXXXXXXX]TBC references before the
+transactions are sent. Every batch carries an Idempotency-Key derived from its content, so a
+rerun after a partial failure replays finished batches instead of creating duplicates.
+
+Arcadia creates a batch all-or-nothing and a 400 is final, so transactions that break a documented
+constraint (required fields, at most 10 other investors, size and date ranges - docs/01_arcadia_system.md
+section 3.1) are skipped before sending. A batch that still comes back 400 is resent without the items
+its errors name (split in half when they name none); the resent part has new content and so a new key,
+which also keeps a rerun from stopping at the cached 400.
+
+For offline throughput tests run stub_arcadia_api.py (restart it between runs - the same
+batches replay from its idempotency cache).
+
+Usage:
+    py scripts/upload_import_payloads.py --dry-run
+    py scripts/upload_import_payloads.py --stub-secret arcadia-stub-secret --batch-size 50 --concurrency 8
+    ARCADIA_TOKEN=... py scripts/upload_import_payloads.py --base-url https://arcadia.example --override-similar
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from datetime import date
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from date_parsing import parse_date_column
+from phase_metrics import track_phase, write_metrics
+
+DEFAULT_BASE_URL = 'http://127.0.0.1:8765'
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RETRIES = 5
+BACKOFF_BASE = 0.5   # seconds, doubled per attempt
+BACKOFF_CAP = 30.0
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+# Transaction constraints (docs/01_arcadia_system.md, 3.1)
+REQUIRED_TRANSACTION_FIELDS = ('announcement_date', 'transaction_type', 'target_company')
+MAX_OTHER_INVESTORS = 10
+MAX_TRANSACTION_SIZE = 100000.0  # $M
+EARLIEST_DATE = '2000-01-01'
+
+COMPANIES_ENDPOINT = '/api/companies/'
+TRANSACTIONS_ENDPOINT = '/api/transactions/'
+
+BATCH_COLUMNS = ['endpoint', 'batch', 'part', 'items', 'status', 'http_status', 'attempts', 'seconds', 'error']
+SKIPPED_COLUMNS = ['client_ref', 'reason']
+REJECTED_COLUMNS = ['endpoint', 'client_ref', 'error']
+
+# ----------------------------------------------------------------------
+# Payloads
+# ----------------------------------------------------------------------
+def company_payloads(companies_df, override_similar=False):
+    """
+    One payload per distinct name (cards are per name and role, Arcadia names are unique);
+    returns (payloads, {card id: card id that carries the name})
+    """
+    name_keys = companies_df['name'].astype(str).str.strip().str.lower()
+    first = ~name_keys.duplicated()
+    payloads = [
+        {'client_ref': company_id, 'name': name, 'override_similar': override_similar}
+        for company_id, name in zip(companies_df.loc[first, 'id'], companies_df.loc[first, 'name'])
+    ]
+    carrier = companies_df.loc[first].set_index(name_keys[first])['id']
+    same_name = dict(zip(companies_df.loc[~first, 'id'], carrier.loc[name_keys[~first]]))
+    return payloads, same_name
+
+def transaction_payloads(transactions_df, participants_df):
+    """One payload per transaction; company references are Arcadia IDs (int) or TBC IDs (str)"""
+    dates = parse_date_column(transactions_df['DATE'], label='DATE').dates
+    participants_df = participants_df.sort_values(['TRANSACTION_ID', 'ORDINAL'], kind='stable')
+    by_role = participants_df.groupby(['TRANSACTION_ID', 'ROLE'], sort=False)['COMPANY_ID'].agg(list)
+
+    payloads = []
+    for transaction_id, date, amount, round_type in zip(transactions_df['TRANSACTION_ID'], dates,
+                                                        transactions_df['AMOUNT'], transactions_df['ROUND']):
+        target = by_role.get((transaction_id, 'target'), [None])[0]
+        payloads.append({
+            'client_ref': transaction_id,
+            'announcement_date': date.strftime('%Y-%m-%d') if pd.notna(date) else None,
+            'transaction_type': round_type if pd.notna(round_type) else None,
+            'transaction_size': float(amount) if pd.notna(amount) else 0.0,
+            'target_company': company_ref(target),
+            'lead_investors': [company_ref(c) for c in by_role.get((transaction_id, 'lead'), [])],
+            'other_investors': [company_ref(c) for c in by_role.get((transaction_id, 'participant'), [])],
+        })
+    return payloads
+
+def transaction_problems(payload, today=None):
+    """Documented constraints the payload breaks (empty list = sendable)"""
+    today = today or date.today().isoformat()
+    problems = [f"{field} missing" for field in REQUIRED_TRANSACTION_FIELDS if payload[field] in (None, '')]
+    if len(payload['other_investors']) > MAX_OTHER_INVESTORS:
+        problems.append(f"{len(payload['other_investors'])} other investors (max {MAX_OTHER_INVESTORS})")
+    if not 0 <= payload['transaction_size'] <= MAX_TRANSACTION_SIZE:
+        problems.append(f"transaction_size {payload['transaction_size']} outside 0-{MAX_TRANSACTION_SIZE:,.0f}")
+    if payload['announcement_date'] and not EARLIEST_DATE <= payload['announcement_date'] <= today:
+        problems.append(f"announcement_date {payload['announcement_date']} outside {EARLIEST_DATE} to today")
+    return problems
+
+def company_ref(company_id):
+    """Arcadia IDs as int, TBC placeholders unchanged"""
+    if company_id is None or pd.isna(company_id):
+        return None
+    company_id = str(company_id)
+    return int(company_id) if company_id.isdigit() else company_id
+
+def resolve_tbc_refs(payload, id_map):
+    """Replace TBC references with created IDs; returns (payload, unresolved refs)"""
+    unresolved = []
+
+    def resolve(ref):
+        if isinstance(ref, str):
+            if ref in id_map:
+                return id_map[ref]
+            unresolved.append(ref)
+        return ref
+
+    resolved = dict(payload,
+                    target_company=resolve(payload['target_company']),
+                    lead_investors=[resolve(ref) for ref in payload['lead_investors']],
+                    other_investors=[resolve(ref) for ref in payload['other_investors']])
+    return resolved, unresolved
+
+def batched(items, batch_size):
+    return [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+
+def idempotency_key(endpoint, batch):
+    """Stable across runs: same endpoint + same batch content -> same key"""
+    body = json.dumps(batch, sort_keys=True, separators=(',', ':'))
+    return hashlib.blake2b(f"{endpoint}\n{body}".encode('utf-8'), digest_size=16).hexdigest()
+
+# ----------------------------------------------------------------------
+# Sending
+# ----------------------------------------------------------------------
+def rejected_positions(body, batch_size):
+    """{batch position: error messages} from a VALIDATION_ERROR body ("<position>.<field>" keys)"""
+    errors = body.get('errors') if isinstance(body, dict) else None
+    positions = {}
+    for key, messages in (errors if isinstance(errors, dict) else {}).items():
+        position, _, field = str(key).partition('.')
+        if position.isdigit() and int(position) < batch_size:
+            positions.setdefault(int(position), {})[field or 'non_field_errors'] = messages
+    return positions
+
+def _post_json(url, batch, token, key, timeout):
+    """Blocking POST (runs in the executor); returns (status, body, headers)"""
+    request = urllib.request.Request(
+        url, data=json.dumps(batch).encode('utf-8'), method='POST',
+        headers={'Content-Type': 'application/json', 'Authorization': f"Bearer {token}", 'Idempotency-Key': key})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read() or b'null'), dict(response.headers)
+    except urllib.error.HTTPError as e:
+        body = e.read()
+        try:
+            body = json.loads(body)
+        except ValueError:
+            body = body.decode('utf-8', 'replace')
+        return e.code, body, dict(e.headers)
+
+def backoff_delay(attempt, retry_after=None, rng=random):
+    """Full jitter: uniform(0, min(cap, base * 2^attempt)), never less than Retry-After"""
+    delay = rng.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+    if retry_after is not None:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass
+    return delay
+
+class BatchUploader:
+    def __init__(self, base_url, token, concurrency=DEFAULT_CONCURRENCY, retries=DEFAULT_RETRIES, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+        self.concurrency = concurrency
+        self.retries = retries
+        self.timeout = timeout
+        self.records = []
+        self.rejected = []
+
+    async def post_batch(self, semaphore, endpoint, batch_number, batch, part=''):
+        """Send one batch; a 400 drops the rejected items and resends the rest. Returns [(record, body)]"""
+        record, body = await self.send(semaphore, endpoint, batch_number, batch, part)
+        if record['http_status'] != 400:
+            return [(record, body)]
+
+        record['status'] = 'rejected'
+        positions = rejected_positions(body, len(batch))
+        if positions:
+            for position, errors in sorted(positions.items()):
+                self.rejected.append({'endpoint': endpoint, 'client_ref': batch[position].get('client_ref'),
+                                      'error': json.dumps(errors)[:500]})
+            parts = [[item for position, item in enumerate(batch) if position not in positions]]
+        elif len(batch) > 1:
+            middle = len(batch) // 2
+            parts = [batch[:middle], batch[middle:]]
+        else:
+            self.rejected.append({'endpoint': endpoint, 'client_ref': batch[0].get('client_ref'), 'error': record['error']})
+            parts = []
+
+        results = [(record, body)]
+        for number, items in enumerate((items for items in parts if items), 1):
+            results += await self.post_batch(semaphore, endpoint, batch_number, items,
+                                             f"{part}.{number}" if part else str(number))
+        return results
+
+    async def send(self, semaphore, endpoint, batch_number, batch, part):
+        """POST with retries; returns (record, body)"""
+        key = idempotency_key(endpoint, batch)
+        record = {'endpoint': endpoint, 'batch': batch_number, 'part': part, 'items': len(batch), 'status': 'failed',
+                  'http_status': None, 'attempts': 0, 'seconds': 0.0, 'error': ''}
+        body = None
+        start = time.perf_counter()
+
+        for attempt in range(self.retries + 1):
+            record['attempts'] = attempt + 1
+            retry_after = None
+            async with semaphore:
+                try:
+                    status, body, headers = await asyncio.to_thread(
+                        _post_json, self.base_url + endpoint, batch, self.token, key, self.timeout)
+                    record['http_status'] = status
+                    retry_after = headers.get('Retry-After')
+                except (urllib.error.URLError, OSError) as e:
+                    status, body = None, None
+                    record['http_status'] = None
+                    record['error'] = str(getattr(e, 'reason', e))
+
+            if status in (200, 201):
+                record['status'] = 'ok'
+                record['error'] = ''
+                break
+            if status is not None:
+                record['error'] = json.dumps(body)[:500] if not isinstance(body, str) else body[:500]
+                if status not in RETRYABLE_STATUS:
+                    break
+            if attempt < self.retries:
+                await asyncio.sleep(backoff_delay(attempt, retry_after))
+
+        record['seconds'] = round(time.perf_counter() - start, 4)
+        self.records.append(record)
+        return record, body
+
+    async def post_all(self, endpoint, batches):
+        """All batches for one endpoint; returns [(record, body)] in batch order, resent parts after their batch"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=self.concurrency))
+        results = await asyncio.gather(*(self.post_batch(semaphore, endpoint, number, batch)
+                                         for number, batch in enumerate(batches, 1)))
+        return [result for batch_results in results for result in batch_results]
+
+    def run(self, endpoint, batches):
+        return asyncio.run(self.post_all(endpoint, batches))
+
+def created_ids(results):
+    """client_ref -> new Arcadia ID from successful batch responses"""
+    id_map = {}
+    for record, body in results:
+        if record['status'] == 'ok' and isinstance(body, dict):
+            for created in body.get('results', []):
+                id_map[created.get('client_ref')] = created['id']
+    return id_map
+
+def print_throughput(label, records, seconds):
+    if not records:
+        print(f"  {label}: nothing to send")
+        return
+    records_df = pd.DataFrame(records)
+    ok = records_df[records_df['status'] == 'ok']
+    items = records_df.loc[records_df['part'] == '', 'items'].sum()  # resent parts repeat items of their batch
+    latencies = records_df['seconds'].to_numpy()
+    print(f"  {label}: {ok['items'].sum()}/{items} items in {len(ok)}/{len(records_df)} batches, "
+          f"{seconds:.2f}s ({items / max(seconds, 1e-9):,.0f} items/s)")
+    print(f"    retries: {int((records_df['attempts'] - 1).sum())}, "
+          f"batch latency p50 {np.percentile(latencies, 50):.3f}s / p95 {np.percentile(latencies, 95):.3f}s")
+
+# ----------------------------------------------------------------------
+# Main
+# ----------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description='Upload import companies and transactions to the Arcadia API')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL)
+    parser.add_argument('--token', default=os.environ.get('ARCADIA_TOKEN'), help='JWT access token (default: $ARCADIA_TOKEN)')
+    parser.add_argument('--stub-secret', help='Issue a token for stub_arcadia_api.py with this secret')
+    parser.add_argument('--companies', default='output/companies_import_FINAL_ALL.csv')
+    parser.add_argument('--transactions', default='output/transaction_import_transactions.csv')
+    parser.add_argument('--participants', default='output/transaction_import_participants.csv')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES)
+    parser.add_argument('--timeout', type=float, default=30, help='Seconds per request')
+    parser.add_argument('--override-similar', action='store_true',
+                        help='Send override_similar=true (names >= 89%% similar to an existing company)')
+    parser.add_argument('--dry-run', action='store_true', help='Write the payloads to output/upload_payloads.jsonl only')
+    args = parser.parse_args()
+
+    print("=== Arcadia Import Upload ===")
+    companies_df = pd.read_csv(args.companies, dtype={'id': str})
+    transactions_df = pd.read_csv(args.transactions, dtype={'TRANSACTION_ID': str})
+    participants_df = pd.read_csv(args.participants, dtype={'TRANSACTION_ID': str, 'COMPANY_ID': str})
+    print(f"Loaded {len(companies_df)} company cards, {len(transactions_df)} transactions, "
+          f"{len(participants_df)} participants")
+
+    with track_phase('build_payloads', rows=len(companies_df) + len(transactions_df)):
+        companies, same_name = company_payloads(companies_df, args.override_similar)
+        transactions = transaction_payloads(transactions_df, participants_df)
+
+    # A batch is all-or-nothing: keep transactions Arcadia would reject out of it
+    skipped_file = 'output/upload_skipped_transactions.csv'
+    skipped, sendable = [], []
+    for payload in transactions:
+        problems = transaction_problems(payload)
+        if problems:
+            skipped.append({'client_ref': payload['client_ref'], 'reason': '; '.join(problems)})
+        else:
+            sendable.append(payload)
+    transactions = sendable
+    if skipped:
+        print(f"Skipping {len(skipped)} transactions that break Arcadia constraints (see {skipped_file})")
+
+    if args.dry_run:
+        output_file = 'output/upload_payloads.jsonl'
+        with open(output_file, 'w', encoding='utf-8') as f:
+            for endpoint, items in ((COMPANIES_ENDPOINT, companies), (TRANSACTIONS_ENDPOINT, transactions)):
+                for batch in batched(items, args.batch_size):
+                    f.write(json.dumps({'endpoint': endpoint, 'idempotency_key': idempotency_key(endpoint, batch),
+                                        'items': batch}) + '\n')
+        pd.DataFrame(skipped, columns=SKIPPED_COLUMNS).to_csv(skipped_file, index=False)
+        print(f"[DRY RUN] Payloads saved to: {output_file}")
+        return 0
+
+    token = args.token
+    if token is None and args.stub_secret:
+        from stub_arcadia_api import issue_token
+        token = issue_token(args.stub_secret)
+    if not token:
+        print("[ERROR] No token - pass --token, set ARCADIA_TOKEN or use --stub-secret with the stub API")
+        return 1
+
+    uploader = BatchUploader(args.base_url, token, args.concurrency, args.retries, args.timeout)
+    print(f"Uploading to {args.base_url} (batch size {args.batch_size}, concurrency {args.concurrency})")
+
+    start = time.perf_counter()
+    with track_phase('upload_companies', rows=len(companies)):
+        company_results = uploader.run(COMPANIES_ENDPOINT, batched(companies, args.batch_size))
+    company_seconds = time.perf_counter() - start
+    id_map = created_ids(company_results)
+    id_map.update({card_id: id_map[carrier] for card_id, carrier in same_name.items() if carrier in id_map})
+
+    # Only transactions whose TBC companies were created can be sent
+    ready, constraint_skips = [], len(skipped)
+    for payload in transactions:
+        resolved, unresolved = resolve_tbc_refs(payload, id_map)
+        if unresolved:
+            skipped.append({'client_ref': payload['client_ref'], 'reason': f"company not created: {', '.join(unresolved)}"})
+        else:
+            ready.append(resolved)
+
+    start = time.perf_counter()
+    with track_phase('upload_transactions', rows=len(ready)):
+        transaction_results = uploader.run(TRANSACTIONS_ENDPOINT, batched(ready, args.batch_size))
+    transaction_seconds = time.perf_counter() - start
+    id_map.update(created_ids(transaction_results))
+
+    batches_file = 'output/upload_batches.csv'
+    id_map_file = 'output/upload_id_map.csv'
+    rejected_file = 'output/upload_rejected_items.csv'
+    pd.DataFrame(uploader.records, columns=BATCH_COLUMNS).sort_values(['endpoint', 'batch', 'part']).to_csv(batches_file, index=False)
+    pd.DataFrame(list(id_map.items()), columns=['client_ref', 'arcadia_id']).to_csv(id_map_file, index=False)
+    pd.DataFrame(skipped, columns=SKIPPED_COLUMNS).to_csv(skipped_file, index=False)
+    pd.DataFrame(uploader.rejected, columns=REJECTED_COLUMNS).to_csv(rejected_file, index=False)
+
+    print(f"\n=== THROUGHPUT ===")
+    print_throughput('companies', [r for r, _ in company_results], company_seconds)
+    print_throughput('transactions', [r for r, _ in transaction_results], transaction_seconds)
+    print(f"\nTransactions skipped: {len(skipped)} ({constraint_skips} constraint, "
+          f"{len(skipped) - constraint_skips} company not created)")
+    print(f"Items rejected by the API: {len(uploader.rejected)}")
+    print(f"Saved batch log to: {batches_file}")
+    print(f"Saved ID map to: {id_map_file}")
+    if skipped:
+        print(f"Saved skipped transactions to: {skipped_file}")
+    if uploader.rejected:
+        print(f"Saved rejected items to: {rejected_file}")
+
+    failed = [r for r in uploader.records if r['status'] == 'failed']
+    if failed:
+        print(f"\n[WARNING] {len(failed)} batch(es) failed - see {batches_file}")
+    if uploader.rejected:
+        print(f"[WARNING] {len(uploader.rejected)} item(s) rejected - see {rejected_file}")
+    write_metrics('upload_import_payloads')
+    return 1 if failed or uploader.rejected else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
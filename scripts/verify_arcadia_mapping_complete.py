@@ -17,6 +17,8 @@ from pathlib import Path
 from datetime import datetime
 import json
 
+from date_parsing import parse_date_column
+
 def load_data():
     """Load both databases."""
     print("\n" + "="*80)
@@ -101,30 +103,11 @@ def find_unmapped_arcadia(df_arcadia, mapped_ids_set):
     
     return df_unmapped
 
-def parse_date(date_str):
-    """Parse date in YYYY-MM-DD or DD/MM/YYYY format."""
-    if pd.isna(date_str) or date_str == '':
-        return None
-    
-    # Try YYYY-MM-DD format first
-    try:
-        return datetime.strptime(str(date_str), '%Y-%m-%d')
-    except:
-        pass
-    
-    # Try DD/MM/YYYY format
-    try:
-        return datetime.strptime(str(date_str), '%d/%m/%Y')
-    except:
-        pass
-    
-    # Try YYYY-DD-MM (in case of confusion)
-    try:
-        return datetime.strptime(str(date_str), '%Y-%d-%m')
-    except:
-        pass
-        
-    return None
+def parse_dates(df, column):
+    """Parsed dates for an optional date column (all NaT when the column is missing)."""
+    if column not in df.columns:
+        return pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+    return parse_date_column(df[column], label=column).dates
 
 def verify_unmapped_criteria(df_unmapped):
     """Verify unmapped transactions meet criteria (pre-2020 or DISABLED)."""
@@ -134,36 +117,21 @@ def verify_unmapped_criteria(df_unmapped):
     
     cutoff_date = datetime(2020, 1, 1)
     
-    # Initialize categories
-    pre_2020 = []
-    disabled = []
-    unexpected = []
+    # Check status
+    if 'Status*' in df_unmapped.columns:
+        is_disabled = df_unmapped['Status*'].astype(str).str.upper() == 'DISABLED'
+    else:
+        is_disabled = pd.Series(False, index=df_unmapped.index)
     
-    for idx, row in df_unmapped.iterrows():
-        is_pre_2020 = False
-        is_disabled = False
-        
-        # Check status
-        if 'Status*' in row and str(row['Status*']).upper() == 'DISABLED':
-            is_disabled = True
-            disabled.append(row)
-        
-        # Check dates
-        announcement_date = parse_date(row.get('Announcement date*', ''))
-        closed_date = parse_date(row.get('closed date', ''))
-        
-        if announcement_date and announcement_date < cutoff_date:
-            is_pre_2020 = True
-            if not is_disabled:
-                pre_2020.append(row)
-        elif closed_date and closed_date < cutoff_date:
-            is_pre_2020 = True
-            if not is_disabled:
-                pre_2020.append(row)
-        
-        # Check if neither criteria is met
-        if not is_pre_2020 and not is_disabled:
-            unexpected.append(row)
+    # Check dates (announcement first, closed date as fallback)
+    announcement_date = parse_dates(df_unmapped, 'Announcement date*')
+    closed_date = parse_dates(df_unmapped, 'closed date')
+    is_pre_2020 = (announcement_date < cutoff_date) | (closed_date < cutoff_date)
+    
+    pre_2020 = [row for _, row in df_unmapped[is_pre_2020 & ~is_disabled].iterrows()]
+    disabled = [row for _, row in df_unmapped[is_disabled].iterrows()]
+    # Neither criteria is met
+    unexpected = [row for _, row in df_unmapped[~is_pre_2020 & ~is_disabled].iterrows()]
     
     print(f"\nUnmapped Transaction Categories:")
     print(f"  Pre-2020 dates: {len(pre_2020)}")